@@ -2,33 +2,182 @@
  * Basic Platform Controller Receiver
  * Receives and displays serial commands
  * Use to verify communication before connecting servos
+ *
+ * Input is parsed a byte at a time into a fixed buffer, so loop() never
+ * waits on a partial line. Frames that arrive faster than they can be
+ * printed are skipped (counted in "skipped") - only the newest is shown.
  */
 
+// The link starts at BASE_BAUD; the host may ask for a faster rate up to
+// MAX_BAUD (1000000 works on 16 MHz AVR boards - lower it for others)
+const long BASE_BAUD = 9600;
+const long MAX_BAUD = 1000000;
+
+// A baud switch is undone unless the host talks to us at the new rate
+const unsigned long BAUD_REVERT_MS = 1000;
+bool baudPending = false;
+unsigned long baudSwitchTime = 0;
+
+// Streaming frame parser: lines start with '<' or '{' (frames), '?' or 'B'
+const int LINE_BUFFER_SIZE = 64;
+char lineBuffer[LINE_BUFFER_SIZE];   // Line being received
+char frameBuffer[LINE_BUFFER_SIZE];  // Newest complete frame
+int lineLength = 0;
+bool discarding = false;  // Overlong or unknown line - skip to the next '\n'
+
+unsigned long skippedFrames = 0;  // Frames replaced by a newer one before use
+
+// Reply to "?" so the host can auto-detect this board:
+// PLATFORM,<sketch>,<protocol>,<max baud>
+void sendIdentify() {
+  Serial.print("PLATFORM,basic_receiver,2,");
+  Serial.println(MAX_BAUD);
+}
+
+// Feed one byte; returns true when it completes a line in lineBuffer
+bool parseByte(char c) {
+  if (c == '\r') {
+    return false;
+  }
+  if (c == '\n') {
+    bool complete = !discarding && lineLength > 0;
+    lineBuffer[lineLength] = '\0';
+    lineLength = 0;
+    discarding = false;
+    return complete;
+  }
+  if (c == '<' || c == '{') {
+    // A frame start always begins a new line - resyncs after a lost '\n'
+    lineLength = 0;
+    discarding = false;
+  } else if (lineLength == 0 && c != '?' && c != 'B') {
+    discarding = true;
+  }
+  if (discarding) {
+    return false;
+  }
+  if (lineLength >= LINE_BUFFER_SIZE - 1) {
+    discarding = true;  // Too long to be a frame - drop the whole line
+    lineLength = 0;
+    return false;
+  }
+  lineBuffer[lineLength++] = c;
+  return false;
+}
+
+// Answer "?" (identify) or "B<baud>" (baud change); true if the rate changed
+bool handleControl(const char* line) {
+  if (line[0] == '?') {
+    sendIdentify();
+    baudPending = false;  // Host reached us - keep the current rate
+    return false;
+  }
+  long baud = atol(line + 1);
+  if (baud > 0 && baud <= MAX_BAUD) {
+    // Acknowledge at the old rate, then switch
+    Serial.print("BAUD,");
+    Serial.println(baud);
+    Serial.flush();
+    Serial.begin(baud);
+    baudPending = true;
+    baudSwitchTime = millis();
+    lineLength = 0;
+    discarding = false;
+    return true;
+  }
+  return false;
+}
+
+// Consume the bytes that have arrived without waiting for more. Control
+// lines are answered at once; of the frames only the newest is kept.
+// Returns true if frameBuffer holds a new frame.
+bool pollSerial() {
+  bool frameReady = false;
+  int count = Serial.available();  // Later bytes wait for the next pass
+  while (count-- > 0) {
+    if (!parseByte(Serial.read())) {
+      continue;
+    }
+    if (lineBuffer[0] == '?' || lineBuffer[0] == 'B') {
+      if (handleControl(lineBuffer)) {
+        break;
+      }
+    } else {
+      if (frameReady) {
+        skippedFrames++;
+      }
+      strcpy(frameBuffer, lineBuffer);
+      frameReady = true;
+    }
+  }
+  return frameReady;
+}
+
+// Parse "<a,b,...[@ms]>" without heap allocation; false if malformed
+bool parseFrame(const char* text, char open, char close, float* values, int count,
+                unsigned long* duration) {
+  if (text[0] != open) {
+    return false;
+  }
+  const char* p = text + 1;
+  char* end;
+  for (int i = 0; i < count; i++) {
+    values[i] = strtod(p, &end);
+    if (end == p) {
+      return false;
+    }
+    p = end;
+    if (i < count - 1) {
+      if (*p != ',') {
+        return false;
+      }
+      p++;
+    }
+  }
+  *duration = 0;  // No '@' = jump
+  if (*p == '@') {
+    p++;
+    *duration = strtoul(p, &end, 10);
+    if (end == p) {
+      return false;
+    }
+    p = end;
+  }
+  return p[0] == close && p[1] == '\0';
+}
+
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(BASE_BAUD);
   Serial.println("Platform Controller - Basic Receiver");
   Serial.println("Waiting for commands...");
 }
 
 void loop() {
-  if (Serial.available()) {
-    String command = Serial.readStringUntil('\n');
-
-    // Remove < and > characters
-    command.remove(0, 1);  // Remove '<'
-    command.remove(command.length() - 1);  // Remove '>'
-
-    // Parse roll and pitch
-    int commaIndex = command.indexOf(',');
-    if (commaIndex > 0) {
-      float roll = command.substring(0, commaIndex).toFloat();
-      float pitch = command.substring(commaIndex + 1).toFloat();
+  // Host never confirmed the new baud rate - fall back so it can retry
+  if (baudPending && millis() - baudSwitchTime > BAUD_REVERT_MS) {
+    Serial.begin(BASE_BAUD);
+    baudPending = false;
+  }
 
+  if (pollSerial()) {
+    float angles[2];
+    unsigned long duration;
+    if (parseFrame(frameBuffer, '<', '>', angles, 2, &duration)) {
       // Print received values
       Serial.print("Roll: ");
-      Serial.print(roll);
+      Serial.print(angles[0]);
       Serial.print(" | Pitch: ");
-      Serial.println(pitch);
+      Serial.print(angles[1]);
+      if (duration > 0) {
+        Serial.print(" | Glide: ");
+        Serial.print(duration);
+        Serial.print(" ms");
+      }
+      Serial.print(" | Skipped: ");
+      Serial.println(skippedFrames);
+    } else {
+      Serial.print("Malformed frame: ");
+      Serial.println(frameBuffer);
     }
   }
 }
@@ -0,0 +1,232 @@
+/*
+ * Platform Controller - Multi-Servo Control
+ * Drives 3-servo or 6-servo (Stewart) platforms from per-servo frames
+ *
+ * Run the host with:  python main.py --platform 3servo   (NUM_SERVOS = 3)
+ *                     python main.py --platform stewart  (NUM_SERVOS = 6)
+ *
+ * Frame format: {a1,a2,...,an}\n - servo angles from neutral in degrees.
+ * The host solves the inverse kinematics and already accounts for
+ * mirrored servos, so each angle is simply added to SERVO_CENTER.
+ * {a1,...,an@ms}\n glides to the angles, arriving ms milliseconds after
+ * the frame (servos are refreshed every SERVO_REFRESH_MS).
+ *
+ * Input is parsed a byte at a time into a fixed buffer, so loop() never
+ * waits on a partial line, and only the newest frame in a backlog is used.
+ *
+ * Wiring:
+ * - Servo signals -> pins in SERVO_PINS (same order as the host's servos)
+ * - Servo GND -> Arduino GND
+ * - Servo VCC -> External 5-6V supply (6 servos draw several amps)
+ */
+
+#include <Servo.h>
+
+const int NUM_SERVOS = 6;
+const int SERVO_PINS[NUM_SERVOS] = {3, 5, 6, 9, 10, 11};
+const float SERVO_CENTER = 90.0;
+
+// The link starts at BASE_BAUD; the host may ask for a faster rate up to
+// MAX_BAUD (1000000 works on 16 MHz AVR boards - lower it for others)
+const long BASE_BAUD = 9600;
+const long MAX_BAUD = 1000000;
+
+// A baud switch is undone unless the host talks to us at the new rate
+const unsigned long BAUD_REVERT_MS = 1000;
+bool baudPending = false;
+unsigned long baudSwitchTime = 0;
+
+Servo servos[NUM_SERVOS];
+
+// Interpolation toward the latest target (angles from neutral)
+const unsigned long SERVO_REFRESH_MS = 20;  // One servo pulse period
+const unsigned long MAX_GLIDE_MS = 2000;
+float startAngles[NUM_SERVOS];   // Where the current glide began
+float targetAngles[NUM_SERVOS];
+float nowAngles[NUM_SERVOS];
+unsigned long glideStart = 0;
+unsigned long glideDuration = 0;
+unsigned long lastRefresh = 0;
+
+// Streaming frame parser: lines start with '<' or '{' (frames), '?' or 'B'
+const int LINE_BUFFER_SIZE = 64;
+char lineBuffer[LINE_BUFFER_SIZE];   // Line being received
+char frameBuffer[LINE_BUFFER_SIZE];  // Newest complete frame
+int lineLength = 0;
+bool discarding = false;  // Overlong or unknown line - skip to the next '\n'
+
+// Reply to "?" so the host can auto-detect this board:
+// PLATFORM,<sketch>,<protocol>,<max baud> (protocol 3 = timed frames)
+void sendIdentify() {
+  Serial.print("PLATFORM,multi_servo_control,3,");
+  Serial.println(MAX_BAUD);
+}
+
+// Servo pulse for an angle - microseconds give finer steps than write()
+int angleToMicros(float angle) {
+  angle = constrain(angle, 0, 180);
+  return MIN_PULSE_WIDTH + (int)(angle * (MAX_PULSE_WIDTH - MIN_PULSE_WIDTH) / 180.0);
+}
+
+void refreshServos(unsigned long now) {
+  unsigned long elapsed = now - glideStart;
+  float fraction = elapsed >= glideDuration ? 1.0 : (float)elapsed / glideDuration;
+  for (int i = 0; i < NUM_SERVOS; i++) {
+    nowAngles[i] = startAngles[i] + (targetAngles[i] - startAngles[i]) * fraction;
+    servos[i].writeMicroseconds(angleToMicros(SERVO_CENTER + nowAngles[i]));
+  }
+}
+
+// Feed one byte; returns true when it completes a line in lineBuffer
+bool parseByte(char c) {
+  if (c == '\r') {
+    return false;
+  }
+  if (c == '\n') {
+    bool complete = !discarding && lineLength > 0;
+    lineBuffer[lineLength] = '\0';
+    lineLength = 0;
+    discarding = false;
+    return complete;
+  }
+  if (c == '<' || c == '{') {
+    // A frame start always begins a new line - resyncs after a lost '\n'
+    lineLength = 0;
+    discarding = false;
+  } else if (lineLength == 0 && c != '?' && c != 'B') {
+    discarding = true;
+  }
+  if (discarding) {
+    return false;
+  }
+  if (lineLength >= LINE_BUFFER_SIZE - 1) {
+    discarding = true;  // Too long to be a frame - drop the whole line
+    lineLength = 0;
+    return false;
+  }
+  lineBuffer[lineLength++] = c;
+  return false;
+}
+
+// Answer "?" (identify) or "B<baud>" (baud change); true if the rate changed
+bool handleControl(const char* line) {
+  if (line[0] == '?') {
+    sendIdentify();
+    baudPending = false;  // Host reached us - keep the current rate
+    return false;
+  }
+  long baud = atol(line + 1);
+  if (baud > 0 && baud <= MAX_BAUD) {
+    // Acknowledge at the old rate, then switch
+    Serial.print("BAUD,");
+    Serial.println(baud);
+    Serial.flush();
+    Serial.begin(baud);
+    baudPending = true;
+    baudSwitchTime = millis();
+    lineLength = 0;
+    discarding = false;
+    return true;
+  }
+  return false;
+}
+
+// Consume the bytes that have arrived without waiting for more. Control
+// lines are answered at once; of the frames only the newest is kept.
+// Returns true if frameBuffer holds a new frame.
+bool pollSerial() {
+  bool frameReady = false;
+  int count = Serial.available();  // Later bytes wait for the next pass
+  while (count-- > 0) {
+    if (!parseByte(Serial.read())) {
+      continue;
+    }
+    if (lineBuffer[0] == '?' || lineBuffer[0] == 'B') {
+      if (handleControl(lineBuffer)) {
+        break;
+      }
+    } else {
+      strcpy(frameBuffer, lineBuffer);
+      frameReady = true;
+    }
+  }
+  return frameReady;
+}
+
+// Parse "{a1,...,an[@ms]}" without heap allocation; false if malformed
+bool parseFrame(const char* text, char open, char close, float* values, int count,
+                unsigned long* duration) {
+  if (text[0] != open) {
+    return false;
+  }
+  const char* p = text + 1;
+  char* end;
+  for (int i = 0; i < count; i++) {
+    values[i] = strtod(p, &end);
+    if (end == p) {
+      return false;
+    }
+    p = end;
+    if (i < count - 1) {
+      if (*p != ',') {
+        return false;
+      }
+      p++;
+    }
+  }
+  *duration = 0;  // No '@' = jump
+  if (*p == '@') {
+    p++;
+    *duration = strtoul(p, &end, 10);
+    if (end == p) {
+      return false;
+    }
+    p = end;
+  }
+  return p[0] == close && p[1] == '\0';
+}
+
+void setup() {
+  Serial.begin(BASE_BAUD);
+
+  for (int i = 0; i < NUM_SERVOS; i++) {
+    servos[i].attach(SERVO_PINS[i]);
+    servos[i].write(SERVO_CENTER);
+    startAngles[i] = targetAngles[i] = nowAngles[i] = 0.0;
+  }
+
+  Serial.println("Platform Controller - Multi-Servo Mode");
+}
+
+void loop() {
+  // Host never confirmed the new baud rate - fall back so it can retry
+  if (baudPending && millis() - baudSwitchTime > BAUD_REVERT_MS) {
+    Serial.begin(BASE_BAUD);
+    baudPending = false;
+  }
+
+  unsigned long now = millis();
+  if (now - lastRefresh >= SERVO_REFRESH_MS) {
+    lastRefresh = now;
+    refreshServos(now);
+  }
+
+  // Only per-servo frames drive this sketch; "<roll,pitch>" lines are ignored
+  if (pollSerial()) {
+    // Parse every angle first so a short frame never moves some servos only
+    float angles[NUM_SERVOS];
+    unsigned long duration;
+    if (parseFrame(frameBuffer, '{', '}', angles, NUM_SERVOS, &duration)) {
+      // Glide from wherever the servos are now
+      now = millis();
+      for (int i = 0; i < NUM_SERVOS; i++) {
+        startAngles[i] = nowAngles[i];
+        targetAngles[i] = angles[i];
+      }
+      glideStart = now;
+      glideDuration = min(duration, MAX_GLIDE_MS);
+      lastRefresh = now;
+      refreshServos(now);
+    }
+  }
+}
@@ -2,6 +2,17 @@
  * Platform Controller - Servo Control
  * Controls two servos based on roll/pitch commands
  *
+ * Frames:
+ *   <roll,pitch>\n      - jump to the angles
+ *   <roll,pitch@ms>\n   - glide from the current position to the angles,
+ *                         arriving ms milliseconds after the frame
+ * Servos are refreshed every SERVO_REFRESH_MS, so the host can send
+ * sparse timed targets and still get smooth motion.
+ *
+ * Input is parsed a byte at a time into a fixed buffer, so loop() never
+ * waits on a partial line, and only the newest frame in a backlog is used.
+ * frame_parser.py in the project root is a Python port of the parser.
+ *
  * Wiring:
  * - Roll Servo Signal -> Pin 9
  * - Pitch Servo Signal -> Pin 10
@@ -18,8 +29,181 @@ const float ROLL_CENTER = 90.0;
 const float PITCH_CENTER = 90.0;
 const float ANGLE_SCALE = 1.0;
 
+// The link starts at BASE_BAUD; the host may ask for a faster rate up to
+// MAX_BAUD (1000000 works on 16 MHz AVR boards - lower it for others)
+const long BASE_BAUD = 9600;
+const long MAX_BAUD = 1000000;
+
+// A baud switch is undone unless the host talks to us at the new rate
+const unsigned long BAUD_REVERT_MS = 1000;
+bool baudPending = false;
+unsigned long baudSwitchTime = 0;
+
+// Interpolation toward the latest target (angles relative to center)
+const unsigned long SERVO_REFRESH_MS = 20;  // One servo pulse period
+const unsigned long MAX_GLIDE_MS = 2000;
+float rollStart = 0.0, pitchStart = 0.0;    // Where the current glide began
+float rollTarget = 0.0, pitchTarget = 0.0;
+float rollNow = 0.0, pitchNow = 0.0;
+unsigned long glideStart = 0;
+unsigned long glideDuration = 0;
+unsigned long lastRefresh = 0;
+
+// Streaming frame parser: lines start with '<' or '{' (frames), '?' or 'B'
+const int LINE_BUFFER_SIZE = 64;
+char lineBuffer[LINE_BUFFER_SIZE];   // Line being received
+char frameBuffer[LINE_BUFFER_SIZE];  // Newest complete frame
+int lineLength = 0;
+bool discarding = false;  // Overlong or unknown line - skip to the next '\n'
+
+// Reply to "?" so the host can auto-detect this board:
+// PLATFORM,<sketch>,<protocol>,<max baud> (protocol 3 = timed frames)
+void sendIdentify() {
+  Serial.print("PLATFORM,servo_control,3,");
+  Serial.println(MAX_BAUD);
+}
+
+// Servo pulse for an angle - microseconds give finer steps than write()
+int angleToMicros(float angle) {
+  angle = constrain(angle, 0, 180);
+  return MIN_PULSE_WIDTH + (int)(angle * (MAX_PULSE_WIDTH - MIN_PULSE_WIDTH) / 180.0);
+}
+
+// Start a glide from wherever the platform is now
+void setTarget(float roll, float pitch, unsigned long duration, unsigned long now) {
+  rollStart = rollNow;
+  pitchStart = pitchNow;
+  rollTarget = roll;
+  pitchTarget = pitch;
+  glideStart = now;
+  glideDuration = min(duration, MAX_GLIDE_MS);
+}
+
+void refreshServos(unsigned long now) {
+  unsigned long elapsed = now - glideStart;
+  if (elapsed >= glideDuration) {
+    rollNow = rollTarget;
+    pitchNow = pitchTarget;
+  } else {
+    float fraction = (float)elapsed / glideDuration;
+    rollNow = rollStart + (rollTarget - rollStart) * fraction;
+    pitchNow = pitchStart + (pitchTarget - pitchStart) * fraction;
+  }
+  rollServo.writeMicroseconds(angleToMicros(ROLL_CENTER + rollNow * ANGLE_SCALE));
+  pitchServo.writeMicroseconds(angleToMicros(PITCH_CENTER + pitchNow * ANGLE_SCALE));
+}
+
+// Feed one byte; returns true when it completes a line in lineBuffer
+bool parseByte(char c) {
+  if (c == '\r') {
+    return false;
+  }
+  if (c == '\n') {
+    bool complete = !discarding && lineLength > 0;
+    lineBuffer[lineLength] = '\0';
+    lineLength = 0;
+    discarding = false;
+    return complete;
+  }
+  if (c == '<' || c == '{') {
+    // A frame start always begins a new line - resyncs after a lost '\n'
+    lineLength = 0;
+    discarding = false;
+  } else if (lineLength == 0 && c != '?' && c != 'B') {
+    discarding = true;
+  }
+  if (discarding) {
+    return false;
+  }
+  if (lineLength >= LINE_BUFFER_SIZE - 1) {
+    discarding = true;  // Too long to be a frame - drop the whole line
+    lineLength = 0;
+    return false;
+  }
+  lineBuffer[lineLength++] = c;
+  return false;
+}
+
+// Answer "?" (identify) or "B<baud>" (baud change); true if the rate changed
+bool handleControl(const char* line) {
+  if (line[0] == '?') {
+    sendIdentify();
+    baudPending = false;  // Host reached us - keep the current rate
+    return false;
+  }
+  long baud = atol(line + 1);
+  if (baud > 0 && baud <= MAX_BAUD) {
+    // Acknowledge at the old rate, then switch
+    Serial.print("BAUD,");
+    Serial.println(baud);
+    Serial.flush();
+    Serial.begin(baud);
+    baudPending = true;
+    baudSwitchTime = millis();
+    lineLength = 0;
+    discarding = false;
+    return true;
+  }
+  return false;
+}
+
+// Consume the bytes that have arrived without waiting for more. Control
+// lines are answered at once; of the frames only the newest is kept.
+// Returns true if frameBuffer holds a new frame.
+bool pollSerial() {
+  bool frameReady = false;
+  int count = Serial.available();  // Later bytes wait for the next pass
+  while (count-- > 0) {
+    if (!parseByte(Serial.read())) {
+      continue;
+    }
+    if (lineBuffer[0] == '?' || lineBuffer[0] == 'B') {
+      if (handleControl(lineBuffer)) {
+        break;
+      }
+    } else {
+      strcpy(frameBuffer, lineBuffer);
+      frameReady = true;
+    }
+  }
+  return frameReady;
+}
+
+// Parse "<a,b,...[@ms]>" without heap allocation; false if malformed
+bool parseFrame(const char* text, char open, char close, float* values, int count,
+                unsigned long* duration) {
+  if (text[0] != open) {
+    return false;
+  }
+  const char* p = text + 1;
+  char* end;
+  for (int i = 0; i < count; i++) {
+    values[i] = strtod(p, &end);
+    if (end == p) {
+      return false;
+    }
+    p = end;
+    if (i < count - 1) {
+      if (*p != ',') {
+        return false;
+      }
+      p++;
+    }
+  }
+  *duration = 0;  // No '@' = jump
+  if (*p == '@') {
+    p++;
+    *duration = strtoul(p, &end, 10);
+    if (end == p) {
+      return false;
+    }
+    p = end;
+  }
+  return p[0] == close && p[1] == '\0';
+}
+
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(BASE_BAUD);
 
   rollServo.attach(9);
   pitchServo.attach(10);
@@ -31,22 +215,26 @@ void setup() {
 }
 
 void loop() {
-  if (Serial.available()) {
-    String command = Serial.readStringUntil('\n');
-
-    command.remove(0, 1);
-    command.remove(command.length() - 1);
-
-    int commaIndex = command.indexOf(',');
-    if (commaIndex > 0) {
-      float roll = command.substring(0, commaIndex).toFloat();
-      float pitch = command.substring(commaIndex + 1).toFloat();
+  // Host never confirmed the new baud rate - fall back so it can retry
+  if (baudPending && millis() - baudSwitchTime > BAUD_REVERT_MS) {
+    Serial.begin(BASE_BAUD);
+    baudPending = false;
+  }
 
-      int rollServoAngle = constrain(ROLL_CENTER + (roll * ANGLE_SCALE), 0, 180);
-      int pitchServoAngle = constrain(PITCH_CENTER + (pitch * ANGLE_SCALE), 0, 180);
+  unsigned long now = millis();
+  if (now - lastRefresh >= SERVO_REFRESH_MS) {
+    lastRefresh = now;
+    refreshServos(now);
+  }
 
-      rollServo.write(rollServoAngle);
-      pitchServo.write(pitchServoAngle);
+  if (pollSerial()) {
+    float angles[2];
+    unsigned long duration;
+    if (parseFrame(frameBuffer, '<', '>', angles, 2, &duration)) {
+      now = millis();
+      setTarget(angles[0], angles[1], duration, now);
+      lastRefresh = now;
+      refreshServos(now);
     }
   }
 }
@@ -0,0 +1,424 @@
+"""
+Parameter sweep autotuner
+
+Sweeps the velocity-mode acceleration settings (or the response curve
+parameters in position mode) across the ranges defined in config.py,
+runs every candidate against a recorded or synthetic session through a
+servo plant model, and ranks the results by tracking error, overshoot
+and jerk. Candidates are evaluated on a process pool using every core;
+results are streamed to a JSON-lines file as they finish and the best
+settings are written as a loadable profile.
+
+Usage:
+    python autotune.py                              # synthetic session, velocity mode
+    python autotune.py --session run.csv --steps 6
+    python autotune.py --mode position --output position_profile.json
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+from config import *
+from control_engine import ControlEngine, clamp_angle
+from profiles import curve_from_dict, make_profile, save_profile
+from recordings import load_session, synthetic_session
+
+
+# Swept parameters and their (min, max) bounds
+CONTROL_PARAMETER_RANGES = {
+    "control_speed": (MIN_CONTROL_SPEED, MAX_CONTROL_SPEED),
+    "acceleration_rate": (MIN_ACCELERATION_RATE, MAX_ACCELERATION_RATE),
+    "acceleration_exponent": (MIN_ACCELERATION_EXPONENT, MAX_ACCELERATION_EXPONENT),
+    "max_multiplier": (MIN_MAX_MULTIPLIER, MAX_MAX_MULTIPLIER),
+}
+
+CURVE_PARAMETER_RANGES = {
+    "exponent": (MIN_EXPONENT, MAX_EXPONENT),
+    "max_velocity": (MIN_MAX_VELOCITY, MAX_MAX_VELOCITY),
+    "curve_strength": (MIN_CURVE_STRENGTH, MAX_CURVE_STRENGTH),
+    "center_bias": (MIN_CENTER_BIAS, MAX_CENTER_BIAS),
+}
+
+MODE_ALIASES = {
+    "velocity": CONTROL_MODES[0],
+    "position": CONTROL_MODES[1],
+}
+
+
+class ServoPlant:
+    """First-order servo model with a slew rate limit"""
+
+    def __init__(self, time_constant=0.08, slew_rate=400.0):
+        """
+        Args:
+            time_constant: Response time constant in seconds
+            slew_rate: Maximum angular speed in degrees per second
+        """
+        self.time_constant = time_constant
+        self.slew_rate = slew_rate
+        self.angle = 0.0
+
+    def step(self, command, dt):
+        """Advance the plant towards the commanded angle and return the new angle"""
+        alpha = 1.0 - math.exp(-dt / self.time_constant) if self.time_constant > 0 else 1.0
+        change = (command - self.angle) * alpha
+        max_change = self.slew_rate * dt
+        self.angle += max(-max_change, min(max_change, change))
+        return self.angle
+
+
+class PilotModel:
+    """
+    Simple human operator model used for closed-loop synthetic sessions
+
+    The pilot sees the platform angle after a reaction delay and pushes
+    the stick towards the target: proportionally to the error in
+    velocity mode, and by nudging the stick position in position mode.
+    """
+
+    def __init__(self, control_mode, max_angle, reaction_time=0.15, full_deflection_error=10.0,
+                 position_gain=4.0, tolerance=0.5):
+        self.control_mode = control_mode
+        self.max_angle = max_angle
+        self.reaction_time = reaction_time
+        self.full_deflection_error = full_deflection_error  # Error (deg) that gets full stick
+        self.position_gain = position_gain  # Stick units per second per unit error
+        self.tolerance = tolerance  # Errors below this (deg) are ignored
+        self.history = []
+        self.stick = 0.0
+
+    def step(self, t, target, observed, dt):
+        """
+        Return stick deflection for one axis
+
+        Args:
+            t: Current time in seconds
+            target: Target angle in degrees
+            observed: Current platform angle in degrees
+            dt: Time step in seconds
+        """
+        self.history.append((t, observed))
+        # Use the newest observation that is at least reaction_time old
+        while len(self.history) > 1 and self.history[1][0] <= t - self.reaction_time:
+            self.history.pop(0)
+        seen = self.history[0][1]
+
+        error = target - seen
+        if abs(error) < self.tolerance:
+            error = 0.0
+
+        if self.control_mode == "Velocity Control (Rate)":
+            self.stick = error / self.full_deflection_error
+        else:
+            self.stick += self.position_gain * (error / self.max_angle) * dt
+        self.stick = max(-1.0, min(1.0, self.stick))
+        return self.stick
+
+
+class TrackingMetrics:
+    """Accumulates tracking error, overshoot and jerk for one axis"""
+
+    def __init__(self, step_threshold=0.5):
+        self.step_threshold = step_threshold  # Target change (deg) that counts as a new step
+        self.count = 0
+        self.squared_error = 0.0
+        self.overshoot = 0.0
+        self.jerk_total = 0.0
+        self.jerk_count = 0
+        self.direction = 0
+        self.last_target = None
+        self.last_angle = None
+        self.last_velocity = None
+        self.last_acceleration = None
+
+    def add(self, target, angle, dt):
+        """Record one sample"""
+        self.count += 1
+        error = angle - target
+        self.squared_error += error * error
+
+        # Overshoot: travel past the target in the direction of the last target step
+        if self.last_target is not None and abs(target - self.last_target) > self.step_threshold:
+            self.direction = 1 if target > self.last_target else -1
+        self.last_target = target
+        if self.direction:
+            self.overshoot = max(self.overshoot, error * self.direction)
+
+        # Jerk from successive finite differences
+        velocity = None
+        if self.last_angle is not None:
+            velocity = (angle - self.last_angle) / dt
+        self.last_angle = angle
+        if velocity is not None and self.last_velocity is not None:
+            acceleration = (velocity - self.last_velocity) / dt
+            if self.last_acceleration is not None:
+                self.jerk_total += abs((acceleration - self.last_acceleration) / dt)
+                self.jerk_count += 1
+            self.last_acceleration = acceleration
+        self.last_velocity = velocity
+
+    def result(self):
+        """Return dict of rms_error, overshoot and mean_jerk"""
+        return {
+            "rms_error": math.sqrt(self.squared_error / self.count) if self.count else 0.0,
+            "overshoot": self.overshoot,
+            "mean_jerk": self.jerk_total / self.jerk_count if self.jerk_count else 0.0,
+        }
+
+
+def simulate(candidate, samples, options):
+    """
+    Run one candidate settings dict through the session
+
+    Args:
+        candidate: Dict with "control" settings and optional "curve"
+        samples: List of (t, x, y, target_roll, target_pitch) tuples
+        options: Dict of simulation options (see parse_args)
+
+    Returns:
+        Dict of combined roll/pitch metrics
+    """
+    control_mode = candidate["control"]["control_mode"]
+    max_angle = options["max_angle"]
+    sim_time = [0.0]
+
+    engine = ControlEngine(control_mode=control_mode, max_angle=max_angle)
+    engine.apply_settings(candidate["control"])
+    if "curve" in candidate:
+        curve = curve_from_dict(candidate["curve"])
+        if hasattr(curve, "clock"):
+            curve.clock = lambda: sim_time[0]
+        engine.set_curve(curve)
+
+    roll_plant = ServoPlant(options["time_constant"], options["slew_rate"])
+    pitch_plant = ServoPlant(options["time_constant"], options["slew_rate"])
+    closed_loop = options["closed_loop"]
+    if closed_loop:
+        roll_pilot = PilotModel(control_mode, max_angle, options["reaction_time"])
+        pitch_pilot = PilotModel(control_mode, max_angle, options["reaction_time"])
+
+    roll_metrics = TrackingMetrics()
+    pitch_metrics = TrackingMetrics()
+    last_t = None
+
+    for t, x, y, target_roll, target_pitch in samples:
+        dt = 1.0 / CONTROLLER_UPDATE_RATE if last_t is None else t - last_t
+        last_t = t
+        if dt <= 0:
+            continue
+        sim_time[0] = t
+
+        if closed_loop:
+            x = roll_pilot.step(t, target_roll, roll_plant.angle, dt)
+            y = -pitch_pilot.step(t, target_pitch, pitch_plant.angle, dt)
+        elif target_roll is None:
+            # No recorded targets - treat the stick position as the intent
+            target_roll = clamp_angle(x * max_angle, max_angle)
+            target_pitch = clamp_angle(-y * max_angle, max_angle)
+
+        roll, pitch = engine.step(x, y, dt)
+        roll_metrics.add(target_roll, roll_plant.step(roll, dt), dt)
+        pitch_metrics.add(target_pitch, pitch_plant.step(pitch, dt), dt)
+
+    roll_result = roll_metrics.result()
+    pitch_result = pitch_metrics.result()
+    return {name: (roll_result[name] + pitch_result[name]) / 2.0 for name in roll_result}
+
+
+def score(metrics, options):
+    """Combine metrics into a single ranking score (lower is better)"""
+    return (metrics["rms_error"]
+            + options["overshoot_weight"] * metrics["overshoot"]
+            + options["jerk_weight"] * metrics["mean_jerk"])
+
+
+def _linspace(low, high, steps):
+    """Evenly spaced values from low to high inclusive"""
+    if steps <= 1:
+        return [(low + high) / 2.0]
+    return [low + (high - low) * i / (steps - 1) for i in range(steps)]
+
+
+def build_grid(control_mode, steps):
+    """
+    Generate candidate settings for a sweep
+
+    Args:
+        control_mode: One of config.CONTROL_MODES
+        steps: Number of values per swept parameter
+
+    Yields:
+        Candidate dicts with "control" and (position mode) "curve" entries
+    """
+    if control_mode == "Velocity Control (Rate)":
+        names = list(CONTROL_PARAMETER_RANGES)
+        axes = [_linspace(*CONTROL_PARAMETER_RANGES[name], steps) for name in names]
+        for values in itertools.product(*axes):
+            control = dict(zip(names, values))
+            control["control_mode"] = control_mode
+            yield {"control": control}
+    else:
+        from response_curves import create_curve
+
+        for curve_type in CURVE_TYPES:
+            names = [name for name in create_curve(curve_type).get_parameters()
+                     if name in CURVE_PARAMETER_RANGES]
+            axes = [_linspace(*CURVE_PARAMETER_RANGES[name], steps) for name in names]
+            for values in itertools.product(*axes):
+                yield {
+                    "control": {"control_mode": control_mode},
+                    "curve": {"type": curve_type, "parameters": dict(zip(names, values))},
+                }
+
+
+# Worker process state, set once per process by _init_worker
+_worker_samples = None
+_worker_options = None
+
+
+def _init_worker(samples, options):
+    global _worker_samples, _worker_options
+    _worker_samples = samples
+    _worker_options = options
+
+
+def _evaluate(candidate):
+    metrics = simulate(candidate, _worker_samples, _worker_options)
+    return {"candidate": candidate, "metrics": metrics, "score": score(metrics, _worker_options)}
+
+
+def run_sweep(samples, options, results_file=None, progress=True):
+    """
+    Evaluate every candidate on a process pool
+
+    Args:
+        samples: Session samples
+        options: Simulation and sweep options
+        results_file: Open text file to stream JSON-lines results into
+        progress: Print progress to stdout
+
+    Returns:
+        List of the top_n result dicts, best first
+    """
+    control_mode = options["control_mode"]
+    total = sum(1 for _ in build_grid(control_mode, options["steps"]))
+    workers = options["workers"] or os.cpu_count() or 1
+    chunksize = max(1, total // (workers * 8))
+
+    top = []  # Heap of (-score, index, result) keeping the best top_n
+    start = last_print = time.time()
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(samples, options)) as pool:
+        results = pool.imap_unordered(_evaluate, build_grid(control_mode, options["steps"]), chunksize)
+        for index, result in enumerate(results, 1):
+            if results_file:
+                results_file.write(json.dumps(result) + "\n")
+                results_file.flush()
+
+            entry = (-result["score"], index, result)
+            if len(top) < options["top_n"]:
+                heapq.heappush(top, entry)
+            else:
+                heapq.heappushpop(top, entry)
+
+            if progress and (time.time() - last_print > 0.2 or index == total):
+                last_print = time.time()
+                best = max(top)[2]["score"]
+                print(f"\r[{index}/{total}] best score {best:.3f} "
+                      f"({index / (time.time() - start):.0f}/s)", end='', flush=True)
+
+    if progress:
+        print()
+    return [entry[2] for entry in sorted(top, reverse=True)]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep controller settings and write the best as a profile")
+    parser.add_argument("--session", help="Recorded session CSV (default: synthetic closed-loop session)")
+    parser.add_argument("--mode", choices=sorted(MODE_ALIASES), default="velocity",
+                        help="Control mode to tune")
+    parser.add_argument("--steps", type=int, default=5, help="Values per swept parameter")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: all cores)")
+    parser.add_argument("--max-angle", type=float, default=DEFAULT_MAX_ANGLE)
+    parser.add_argument("--duration", type=float, default=20.0, help="Synthetic session length (s)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic session seed")
+    parser.add_argument("--time-constant", type=float, default=0.08, help="Servo plant time constant (s)")
+    parser.add_argument("--slew-rate", type=float, default=400.0, help="Servo plant slew rate (deg/s)")
+    parser.add_argument("--reaction-time", type=float, default=0.15, help="Pilot model reaction time (s)")
+    parser.add_argument("--overshoot-weight", type=float, default=0.5)
+    parser.add_argument("--jerk-weight", type=float, default=0.0005)
+    parser.add_argument("--top", type=int, default=5, help="Number of results to print")
+    parser.add_argument("--results", default="autotune_results.jsonl", help="Streamed results file")
+    parser.add_argument("--output", default="tuned_profile.json", help="Best settings profile")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    control_mode = MODE_ALIASES[args.mode]
+
+    if args.session:
+        samples = load_session(args.session)
+        closed_loop = False
+        print(f"Loaded {len(samples)} samples from {args.session}")
+    else:
+        samples = synthetic_session(duration=args.duration, rate=CONTROLLER_UPDATE_RATE,
+                                    max_angle=min(args.max_angle, 30.0), seed=args.seed)
+        closed_loop = True
+        print(f"Generated {len(samples)}-sample synthetic session (closed-loop pilot model)")
+
+    if not samples:
+        print("Session is empty")
+        return 1
+
+    options = {
+        "control_mode": control_mode,
+        "steps": args.steps,
+        "workers": args.workers,
+        "top_n": max(1, args.top),
+        "max_angle": args.max_angle,
+        "closed_loop": closed_loop,
+        "time_constant": args.time_constant,
+        "slew_rate": args.slew_rate,
+        "reaction_time": args.reaction_time,
+        "overshoot_weight": args.overshoot_weight,
+        "jerk_weight": args.jerk_weight,
+    }
+
+    with open(args.results, 'w') as results_file:
+        best = run_sweep(samples, options, results_file)
+
+    print(f"\nTop {len(best)} of sweep ({control_mode}):")
+    for rank, result in enumerate(best, 1):
+        m = result["metrics"]
+        settings = dict(result["candidate"]["control"])
+        settings.pop("control_mode")
+        if "curve" in result["candidate"]:
+            settings = {"curve": result["candidate"]["curve"]["type"],
+                        **result["candidate"]["curve"]["parameters"]}
+        described = ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                              for k, v in settings.items())
+        print(f"{rank}. score {result['score']:.3f} | rms {m['rms_error']:.2f}° | "
+              f"overshoot {m['overshoot']:.2f}° | jerk {m['mean_jerk']:.0f}°/s³ | {described}")
+
+    winner = best[0]
+    profile = make_profile(
+        control=dict(winner["candidate"]["control"], max_angle=args.max_angle),
+        curve=winner["candidate"].get("curve"),
+        autotune={"metrics": winner["metrics"], "score": winner["score"],
+                  "session": args.session or "synthetic"},
+    )
+    save_profile(args.output, profile)
+    print(f"\nBest settings written to {args.output} (results in {args.results})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Auto balance - closed-loop control on an external marble position feed
+
+The third control mode. A tracker (camera, touch panel, or the stand-in
+publisher in marble_feed.py) sends the marble position as UDP datagrams
+to BALANCE_FEED_PORT, and a PID controller tilts the plate to bring the
+marble back to the center. Positions are normalized: the plate center
+is 0 and its edges are -1 and +1 on each axis.
+
+Each datagram is FEED_PACKET: sequence number, send time (time.time(),
+so the publisher must share the clock - run it on the same machine),
+x, y. The feed is drained without blocking once per control tick:
+
+    - Datagrams older than BALANCE_MAX_AGE on arrival are dropped as late.
+    - A sequence number at or behind the newest one is a duplicate or
+      arrived out of order and is dropped - unless it is far behind
+      (BALANCE_REORDER_WINDOW) or the feed had gone stale, which means
+      the publisher restarted.
+    - Without a position for BALANCE_STALE_TIMEOUT the controller levels
+      the plate, clears its integral and leaves the stick in charge.
+
+The feed is also this mode's safety: when the gamepad is lost the
+control loops level the stick modes, but auto balance keeps running
+(a lost controller reads as a centered stick - no override) until the
+feed goes stale (ControlEngine.controller_lost()).
+
+The PID runs at the control-loop rate. Velocity comes from the position
+samples and their send times (so network jitter does not reach the D
+term), and the position is extrapolated over the sample's age. The
+stick is a blended override: its deflection (0..1) is the share of the
+command taken from the stick, read as a position-mode angle, and the
+integral pauses while the stick has control.
+"""
+
+import math
+import socket
+import struct
+import time
+
+from config import *
+from input_filter import smoothing_factor
+
+
+FEED_PACKET = struct.Struct('<Qdff')  # sequence, send time (s), x, y
+
+
+def encode_position(sequence, timestamp, x, y):
+    """Build one position datagram"""
+    return FEED_PACKET.pack(sequence, timestamp, x, y)
+
+
+class PositionFeed:
+    """Non-blocking receiver for marble position datagrams"""
+
+    def __init__(self, host=BALANCE_FEED_HOST, port=BALANCE_FEED_PORT, max_age=BALANCE_MAX_AGE,
+                 stale_timeout=BALANCE_STALE_TIMEOUT, reorder_window=BALANCE_REORDER_WINDOW,
+                 clock=time.time):
+        """
+        Args:
+            host: Address to listen on
+            port: UDP port to listen on
+            max_age: Positions older than this on arrival are dropped (s)
+            stale_timeout: Age after which the feed counts as lost (s)
+            reorder_window: Largest backwards sequence jump treated as reordering
+            clock: Wall clock shared with the publisher
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+        self.address = (host, port)
+        self.max_age = max_age
+        self.stale_timeout = stale_timeout
+        self.reorder_window = reorder_window
+        self.clock = clock
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(self.address)
+        self.sock.setblocking(False)
+
+        # Newest accepted position
+        self.sequence = None
+        self.timestamp = None
+        self.x = 0.0
+        self.y = 0.0
+
+        # Counters
+        self.received = 0
+        self.accepted = 0
+        self.reordered = 0  # Duplicates and out-of-order datagrams
+        self.late = 0
+        self.malformed = 0
+        self.restarts = 0
+
+    def poll(self):
+        """
+        Drain the datagrams that have arrived (never blocks)
+
+        Returns:
+            Number of positions accepted
+        """
+        accepted = 0
+        now = self.clock()
+        while True:
+            try:
+                data = self.sock.recv(64)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break  # e.g. ICMP port unreachable echoes on Windows - nothing to read
+            self.received += 1
+            if len(data) != FEED_PACKET.size:
+                self.malformed += 1
+                continue
+            sequence, timestamp, x, y = FEED_PACKET.unpack(data)
+            if not (math.isfinite(timestamp) and math.isfinite(x) and math.isfinite(y)):
+                self.malformed += 1
+                continue
+            if now - timestamp > self.max_age:
+                self.late += 1
+                continue
+            if self.sequence is not None and sequence <= self.sequence:
+                if self.sequence - sequence <= self.reorder_window and not self.stale(now):
+                    self.reordered += 1
+                    continue
+                self.restarts += 1  # Publisher started over
+            self.sequence = sequence
+            self.timestamp = timestamp
+            self.x = x
+            self.y = y
+            self.accepted += 1
+            accepted += 1
+        return accepted
+
+    def age(self, now=None):
+        """Seconds since the newest position was sent (None before the first one)"""
+        if self.timestamp is None:
+            return None
+        return (self.clock() if now is None else now) - self.timestamp
+
+    def stale(self, now=None):
+        """True if there is no usable position"""
+        age = self.age(now)
+        return age is None or age > self.stale_timeout
+
+    def close(self):
+        self.sock.close()
+
+
+class BalanceController:
+    """Two-axis PID on the marble position, blended with the stick"""
+
+    def __init__(self, kp=DEFAULT_BALANCE_KP, ki=DEFAULT_BALANCE_KI, kd=DEFAULT_BALANCE_KD,
+                 d_cutoff=DEFAULT_BALANCE_D_CUTOFF, signs=BALANCE_AXIS_SIGNS, feed=None):
+        """
+        Args:
+            kp: Degrees of tilt per unit of position
+            ki: Degrees per unit-second of accumulated position
+            kd: Degrees per unit/s of marble velocity
+            d_cutoff: Cutoff of the velocity estimate (Hz)
+            signs: Per-axis sign of the command (see BALANCE_AXIS_SIGNS)
+            feed: PositionFeed to read (default: opened on the first step())
+        """
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.d_cutoff = d_cutoff
+        self.signs = signs
+        self.feed = feed
+        self.feed_failed = False
+
+        # Estimates from the feed (measurements - kept across reset())
+        self.position = [0.0, 0.0]
+        self.velocity = [0.0, 0.0]
+        self.sample_time = None
+
+        # Control state
+        self.integral = [0.0, 0.0]
+        self.auto = [0.0, 0.0]  # Controller output before blending (degrees)
+        self.override = 1.0  # Share of the command taken from the stick (1 = no feed)
+
+    def get_parameters(self):
+        """Return dict of the tunable parameters"""
+        return {"kp": self.kp, "ki": self.ki, "kd": self.kd, "d_cutoff": self.d_cutoff}
+
+    def set_parameters(self, parameters):
+        """
+        Update tunable parameters (unknown keys are ignored); state is kept
+
+        Args:
+            parameters: Dict as returned by get_parameters()
+        """
+        for name in ("kp", "ki", "kd", "d_cutoff"):
+            if name in parameters:
+                setattr(self, name, float(parameters[name]))
+
+    def reset(self):
+        """Level the output and clear the integral (position estimates are kept)"""
+        self.integral = [0.0, 0.0]
+        self.auto = [0.0, 0.0]
+
+    def open_feed(self):
+        """Bind the position feed once; a failure is reported and not retried"""
+        if self.feed is not None or self.feed_failed:
+            return
+        try:
+            self.feed = PositionFeed()
+            print(f"Listening for marble positions on UDP port {BALANCE_FEED_PORT}")
+        except OSError as e:
+            self.feed_failed = True
+            print(f"Cannot listen for marble positions on UDP port {BALANCE_FEED_PORT}: {e}")
+
+    def close(self):
+        """Release the feed socket"""
+        if self.feed is not None:
+            self.feed.close()
+            self.feed = None
+
+    def _update_estimate(self, feed):
+        """Take the newest feed position and update the velocity estimate"""
+        position = (feed.x, feed.y)
+        if self.sample_time is not None and feed.timestamp > self.sample_time:
+            dt = feed.timestamp - self.sample_time
+            alpha = smoothing_factor(self.d_cutoff, dt)
+            for i in range(2):
+                speed = (position[i] - self.position[i]) / dt
+                self.velocity[i] += alpha * (speed - self.velocity[i])
+        else:
+            self.velocity = [0.0, 0.0]  # First sample or publisher restart
+        self.position = list(position)
+        self.sample_time = feed.timestamp
+
+    def step(self, x, y, dt, max_angle):
+        """
+        Advance one control tick
+
+        Args:
+            x, y: Stick deflection in [-1, 1] (y up = positive pitch, as in position mode)
+            dt: Time since the last tick (s)
+            max_angle: Platform angle limit in degrees
+
+        Returns:
+            Tuple of (roll, pitch) in degrees, before clamping
+        """
+        self.open_feed()
+        feed = self.feed
+        manual = (x * max_angle, y * max_angle)
+
+        if feed is not None and feed.poll():
+            self._update_estimate(feed)
+        now = feed.clock() if feed is not None else None
+        if feed is None or feed.stale(now):
+            self.reset()
+            self.override = 1.0
+            return manual
+
+        self.override = min(1.0, max(abs(x), abs(y)))
+        age = min(max(0.0, now - feed.timestamp), feed.max_age)
+        limit = BALANCE_INTEGRAL_LIMIT * max_angle
+        for i in range(2):
+            position = self.position[i] + self.velocity[i] * age  # Where the marble is now
+            integral = self.integral[i] + position * dt * (1.0 - self.override)
+            if self.ki > 0:
+                integral = max(-limit / self.ki, min(limit / self.ki, integral))
+            command = self.signs[i] * (self.kp * position + self.ki * integral + self.kd * self.velocity[i])
+            if abs(command) < max_angle or abs(integral) < abs(self.integral[i]):
+                self.integral[i] = integral  # Hold the integral while saturated (anti-windup)
+            self.auto[i] = command
+
+        blend = self.override
+        return (self.auto[0] * (1.0 - blend) + manual[0] * blend,
+                self.auto[1] * (1.0 - blend) + manual[1] * blend)
+
+    def status(self):
+        """
+        Feed and controller state for display
+
+        Returns:
+            Dict with the feed counters, position age (s, None without a
+            feed position) and the stick's share of the command
+        """
+        feed = self.feed
+        result = {"override": self.override, "age": None, "listening": feed is not None}
+        if feed is not None:
+            result.update(age=feed.age(), received=feed.received, accepted=feed.accepted,
+                          reordered=feed.reordered, late=feed.late, malformed=feed.malformed,
+                          restarts=feed.restarts)
+        return result
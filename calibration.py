@@ -0,0 +1,354 @@
+"""
+Servo linkage calibration
+
+The servo sketches assume platform tilt = servo angle, but a horn and
+pushrod linkage is not linear: the same servo step tilts the platform
+less near the ends of travel, and often differently on each side.
+
+Workflow:
+    1. Measure - step one servo through its range and type in the tilt
+       actually measured (inclinometer, phone level app):
+
+           python calibration.py measure --axis roll --port COM3
+           python calibration.py measure --axis pitch --port COM3
+
+       Points are stored in calibration.json as [servo angle, measured tilt].
+    2. Run with the calibration:
+
+           python main.py --calibration calibration.json
+
+       Each axis is fitted with a monotone cubic through the measured points
+       (tilt -> servo angle) and compiled into a uniform lookup table, cached
+       next to the JSON file. Per frame the correction is one table index
+       and a linear blend - no trig, no spline evaluation. Only the serial
+       output is corrected; mirrors and logs keep the commanded roll/pitch.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from frame_parser import parse_frame
+from output_sinks import OutputSink, add_arrival_time, encode_command
+from response_curves import monotone_slope
+
+
+CALIBRATION_VERSION = 1
+TABLE_VERSION = 2  # Part of the cache key - bump when the fit changes
+AXES = ("roll", "pitch")
+DEFAULT_TABLE_STEP = 0.05  # degrees of tilt between table entries
+
+
+def fit_monotone(xs, ys, grid):
+    """
+    Evaluate a Fritsch-Carlson monotone cubic through (xs, ys) on a grid
+
+    Uses the same slopes as the Spline response curve
+    (response_curves.monotone_slope), evaluated on the whole grid at once.
+
+    Args:
+        xs: Strictly increasing knot positions
+        ys: Knot values, monotone in xs (either direction)
+        grid: Positions to evaluate (inside [xs[0], xs[-1]])
+
+    Returns:
+        numpy array of interpolated values
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    h = np.diff(xs)
+    d = np.diff(ys) / h
+    deltas = d.tolist()
+    m = np.array([monotone_slope(deltas, i) for i in range(len(xs))])
+
+    grid = np.asarray(grid, dtype=float)
+    k = np.clip(np.searchsorted(xs, grid, side='right') - 1, 0, len(d) - 1)
+    t = (grid - xs[k]) / h[k]
+    t2 = t * t
+    t3 = t2 * t
+    return ((2 * t3 - 3 * t2 + 1) * ys[k] + (t3 - 2 * t2 + t) * h[k] * m[k]
+            + (-2 * t3 + 3 * t2) * ys[k + 1] + (t3 - t2) * h[k] * m[k + 1])
+
+
+class CalibrationTable:
+    """Uniform lookup table from platform tilt to servo angle for one axis"""
+
+    def __init__(self, lo, step, values):
+        """
+        Args:
+            lo: Tilt of the first entry (degrees)
+            step: Tilt between entries (degrees)
+            values: Servo angle for each entry
+        """
+        self.lo = float(lo)
+        self.step = float(step)
+        self.values = [float(v) for v in values]  # Plain floats - fastest to index per frame
+        self.hi = self.lo + self.step * (len(self.values) - 1)
+        self._inv_step = 1.0 / self.step
+        self._last = len(self.values) - 1
+
+    @classmethod
+    def from_points(cls, points, step=DEFAULT_TABLE_STEP):
+        """
+        Compile measured points into a table
+
+        Args:
+            points: [servo angle, measured tilt] pairs
+            step: Table resolution in degrees of tilt
+
+        Returns:
+            CalibrationTable covering the measured tilt range
+        """
+        points = sorted((float(tilt), float(servo)) for servo, tilt in points)
+        if len(points) < 2:
+            raise ValueError("Need at least two measured points per axis")
+        tilts = [tilt for tilt, _ in points]
+        servos = [servo for _, servo in points]
+        if any(b <= a for a, b in zip(tilts, tilts[1:])):
+            raise ValueError("Measured tilts must all differ")
+        steps = np.sign(np.diff(servos))
+        if not (np.all(steps > 0) or np.all(steps < 0)):
+            raise ValueError("Tilt must change monotonically with servo angle - re-measure the outliers")
+
+        count = int(round((tilts[-1] - tilts[0]) / step)) + 1
+        grid = tilts[0] + step * np.arange(count)
+        return cls(tilts[0], step, fit_monotone(tilts, servos, np.minimum(grid, tilts[-1])))
+
+    def lookup(self, tilt):
+        """
+        Servo angle for a desired tilt (clamped to the calibrated range)
+
+        Args:
+            tilt: Desired platform tilt in degrees
+
+        Returns:
+            Servo angle in degrees
+        """
+        position = (tilt - self.lo) * self._inv_step
+        if position <= 0.0:
+            return self.values[0]
+        index = int(position)
+        if index >= self._last:
+            return self.values[self._last]
+        low = self.values[index]
+        return low + (self.values[index + 1] - low) * (position - index)
+
+
+class LinkageCalibration:
+    """Per-axis tilt corrections; axes without a table pass through unchanged"""
+
+    def __init__(self, tables):
+        """
+        Args:
+            tables: Dict of axis name -> CalibrationTable
+        """
+        self.roll = tables.get("roll")
+        self.pitch = tables.get("pitch")
+
+    def map(self, roll, pitch):
+        """
+        Servo angles that produce the requested platform tilt
+
+        Returns:
+            Tuple of (roll servo angle, pitch servo angle)
+        """
+        if self.roll is not None:
+            roll = self.roll.lookup(roll)
+        if self.pitch is not None:
+            pitch = self.pitch.lookup(pitch)
+        return roll, pitch
+
+
+def load_points(path):
+    """Read measured points ({"roll": [[servo, tilt], ...], ...}); missing file = none"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    return {axis: data[axis] for axis in AXES if data.get(axis)}
+
+
+def save_points(path, points):
+    """Write measured points as JSON"""
+    data = {"version": CALIBRATION_VERSION}
+    data.update(points)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def table_cache_path(path):
+    """Where the compiled tables for a calibration file are cached"""
+    return os.path.splitext(path)[0] + ".table.npz"
+
+
+def load_calibration(path, step=DEFAULT_TABLE_STEP):
+    """
+    Load a calibration, compiling its tables or reusing the disk cache
+
+    The cache is keyed by a hash of the measured points and the table
+    step, so editing the JSON file recompiles automatically.
+
+    Args:
+        path: calibration.json written by `calibration.py measure`
+        step: Table resolution in degrees of tilt
+
+    Returns:
+        LinkageCalibration
+    """
+    points = load_points(path)
+    if not points:
+        raise ValueError(f"{path} has no calibration points")
+    key = hashlib.sha1(json.dumps([points, step, TABLE_VERSION], sort_keys=True).encode('utf-8')).hexdigest()
+
+    cache = table_cache_path(path)
+    if os.path.exists(cache):
+        try:
+            with np.load(cache, allow_pickle=False) as data:
+                if str(data["key"]) == key:
+                    return LinkageCalibration({
+                        axis: CalibrationTable(data[f"{axis}_range"][0], data[f"{axis}_range"][1],
+                                               data[f"{axis}_values"])
+                        for axis in points
+                    })
+        except (OSError, KeyError, ValueError):
+            pass  # Unreadable or stale cache - rebuild it
+
+    tables = {axis: CalibrationTable.from_points(axis_points, step) for axis, axis_points in points.items()}
+    arrays = {"key": np.array(key)}
+    for axis, table in tables.items():
+        arrays[f"{axis}_range"] = np.array([table.lo, table.step])
+        arrays[f"{axis}_values"] = np.array(table.values)
+    try:
+        np.savez(cache, **arrays)
+    except OSError as e:
+        print(f"Could not cache calibration tables: {e}")
+    return LinkageCalibration(tables)
+
+
+class CalibratedOutput(OutputSink):
+    """
+    Applies a LinkageCalibration to the frames one sink receives
+
+    Wrap only the sink that drives the servos (the serial output): the
+    other sinks in the FanOut - UDP/TCP mirrors, the command log - keep
+    receiving the commanded roll/pitch, not servo angles.
+    """
+
+    name = "calibrated"
+
+    def __init__(self, sink, calibration):
+        """
+        Args:
+            sink: Sink driving the servos (usually the SerialOutput)
+            calibration: LinkageCalibration
+        """
+        self.sink = sink
+        self.calibration = calibration
+
+    def send_command(self, roll, pitch):
+        return self.sink.write(encode_command(*self.calibration.map(roll, pitch)))
+
+    def write(self, data):
+        parsed = parse_frame(data.rstrip(b"\r\n"), 2)
+        if parsed is None:
+            return self.sink.write(data)  # Not a roll/pitch frame - pass it on untouched
+        (roll, pitch), arrival_ms = parsed
+        frame = encode_command(*self.calibration.map(roll, pitch))
+        if arrival_ms:
+            frame = add_arrival_time(frame, arrival_ms)
+        return self.sink.write(frame)
+
+    def close(self):
+        self.sink.close()
+
+
+def measure(args):
+    """Interactive measurement of one axis"""
+    from serial_output import SerialOutput
+
+    serial_output = SerialOutput()
+    if args.port:
+        if not serial_output.connect(args.port):
+            return 1
+        if not serial_output.wait_connected():
+            # Frames would only be held - the measurements would not match any servo angle
+            serial_output.disconnect()
+            return 1
+    else:
+        print("No --port given - running in test mode")
+        serial_output.enable_mock_mode()
+
+    points = load_points(args.output)
+    measured = []
+    angles = np.arange(args.min, args.max + args.step / 2, args.step)
+    print(f"Measuring {args.axis}: enter the measured platform {args.axis} for each servo angle")
+    print("(blank line skips a point, 'q' stops early)\n")
+    try:
+        for servo in angles:
+            servo = float(servo)
+            if args.axis == "roll":
+                serial_output.send_command(servo, 0.0)
+            else:
+                serial_output.send_command(0.0, servo)
+            answer = input(f"Servo {servo:+6.1f}°  measured {args.axis}: ").strip()
+            if answer.lower() == "q":
+                break
+            if answer:
+                measured.append([servo, float(answer)])
+    finally:
+        serial_output.send_command(0.0, 0.0)
+        serial_output.disconnect()
+
+    if len(measured) < 2:
+        print("Not enough points - calibration unchanged")
+        return 1
+    CalibrationTable.from_points(measured)  # Reject non-monotone data before saving
+    points[args.axis] = measured
+    save_points(args.output, points)
+    print(f"Saved {len(measured)} {args.axis} points to {args.output}")
+    return 0
+
+
+def compile_tables(args):
+    """Compile (or refresh the cache of) a calibration and summarize it"""
+    calibration = load_calibration(args.path)
+    for axis in AXES:
+        table = getattr(calibration, axis)
+        if table is None:
+            print(f"{axis:<6} not calibrated")
+            continue
+        grid = np.arange(table.lo, table.hi, 1.0)
+        correction = max(abs(table.lookup(t) - t) for t in grid) if len(grid) else 0.0
+        print(f"{axis:<6} {table.lo:+.1f}° .. {table.hi:+.1f}°  {len(table.values)} entries  "
+              f"max correction {correction:.2f}°")
+    print(f"Tables cached in {table_cache_path(args.path)}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servo linkage calibration")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    measure_parser = commands.add_parser("measure", help="Step a servo and record measured tilt")
+    measure_parser.add_argument("--axis", choices=AXES, required=True)
+    measure_parser.add_argument("--port", help="Serial port (omit for test mode)")
+    measure_parser.add_argument("--min", type=float, default=-30.0, help="First servo angle")
+    measure_parser.add_argument("--max", type=float, default=30.0, help="Last servo angle")
+    measure_parser.add_argument("--step", type=float, default=5.0, help="Servo angle step")
+    measure_parser.add_argument("--output", default="calibration.json")
+
+    compile_parser = commands.add_parser("compile", help="Build the lookup tables and show a summary")
+    compile_parser.add_argument("path", nargs="?", default="calibration.json")
+
+    args = parser.parse_args()
+    if args.command == "measure":
+        return measure(args)
+    return compile_tables(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
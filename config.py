@@ -12,14 +12,27 @@ MIN_MAX_ANGLE = 0.0
 MAX_MAX_ANGLE = 90.0
 
 # Serial settings
-SERIAL_BAUDRATE = 9600
+SERIAL_BAUDRATE = 9600  # Base rate; raised by negotiation with firmware that supports it
+SERIAL_MAX_BAUDRATE = 1000000  # Upper limit for baud negotiation
 SERIAL_TIMEOUT = 1.0
+SERIAL_DETECT_TIMEOUT = 3.0  # seconds per auto-detect probe (covers the Arduino reset delay)
+SERIAL_TARGET_RATE = None  # Hz - timed targets for interpolating firmware (None = send every frame)
 
 # GUI settings
 GUI_UPDATE_RATE = 20  # Hz (50ms)
+GUI_HIDDEN_RENDER_RATE = 2  # Hz - redraw rate while minimized (control keeps full rate)
+CONTROL_LOOP_RATE = 20  # Hz - headless control loop when the GUI runs as a viewer (--split-gui)
+SESSION_RATE = 50  # Hz - frames per second sent by a platform_session.PlatformSession
+SESSION_QUEUE_SECONDS = 10.0  # Trajectory queue capacity of a PlatformSession
+PLAYBACK_SPIN = 0.001  # seconds - trajectory playback spins (instead of sleeping) this close to a deadline
 WINDOW_WIDTH = 600
 WINDOW_HEIGHT = 700
 
+# Response curve preview plot
+CURVE_PREVIEW_WIDTH = 120
+CURVE_PREVIEW_HEIGHT = 80
+CURVE_PREVIEW_SAMPLES = 65
+
 # Platform visualization
 PLATFORM_WIDTH = 200
 PLATFORM_HEIGHT = 150
@@ -31,14 +44,52 @@ MIN_EXPONENT = 1.0
 MAX_EXPONENT = 3.0
 
 DEFAULT_MAX_VELOCITY = 100.0  # degrees per second
+MIN_MAX_VELOCITY = 10.0
+MAX_MAX_VELOCITY = 500.0
 DEFAULT_ACCELERATION = 200.0  # degrees per second squared
 
+DEFAULT_CURVE_STRENGTH = 1.5
+MIN_CURVE_STRENGTH = 0.5
+MAX_CURVE_STRENGTH = 3.0
+
+DEFAULT_CENTER_BIAS = 0.5
+MIN_CENTER_BIAS = 0.1
+MAX_CENTER_BIAS = 0.9
+
+# Input smoothing (One-Euro filter on the stick, off unless enabled)
+DEFAULT_FILTER_MIN_CUTOFF = 1.0  # Hz - cutoff for a still stick
+DEFAULT_FILTER_BETA = 1.0  # Cutoff increase per unit/s of stick speed
+DEFAULT_FILTER_D_CUTOFF = 1.0  # Hz - smoothing of the speed estimate
+DEFAULT_FILTER_LAG_BUDGET = 0.1  # seconds - most lag the filter may add
+MIN_FILTER_LAG_BUDGET = 0.01
+MAX_FILTER_LAG_BUDGET = 0.25
+
 # Control modes
 CONTROL_MODES = [
     "Velocity Control (Rate)",  # Joystick controls speed of change - BEST FOR MARBLE
-    "Position Control (Direct)"  # Joystick controls angle directly
+    "Position Control (Direct)",  # Joystick controls angle directly
+    "Auto Balance (Position Feed)"  # PID on an external marble position feed, stick blends in
 ]
 
+# Auto balance (closed loop on marble positions received over UDP - see balance.py)
+BALANCE_FEED_HOST = "127.0.0.1"
+BALANCE_FEED_PORT = 5005
+BALANCE_MAX_AGE = 0.1  # seconds - positions older than this on arrival are dropped as late
+BALANCE_STALE_TIMEOUT = 0.5  # seconds without a position before the mode levels and hands over to the stick
+BALANCE_REORDER_WINDOW = 1000  # A sequence number further back than this means the publisher restarted
+BALANCE_AXIS_SIGNS = (1.0, 1.0)  # Flip an axis if positive roll/pitch rolls the marble towards +x/+y
+DEFAULT_BALANCE_KP = 20.0  # degrees per unit of position (plate center to edge = 1)
+MIN_BALANCE_KP = 0.0
+MAX_BALANCE_KP = 60.0
+DEFAULT_BALANCE_KI = 1.0  # degrees per unit-second
+MIN_BALANCE_KI = 0.0
+MAX_BALANCE_KI = 10.0
+DEFAULT_BALANCE_KD = 7.0  # degrees per unit/s
+MIN_BALANCE_KD = 0.0
+MAX_BALANCE_KD = 20.0
+DEFAULT_BALANCE_D_CUTOFF = 5.0  # Hz - smoothing of the velocity estimate
+BALANCE_INTEGRAL_LIMIT = 0.25  # Largest integral contribution, as a fraction of max angle
+
 # Velocity control settings (for marble balancing)
 DEFAULT_CONTROL_SPEED = 30.0  # degrees per second at full stick deflection
 MIN_CONTROL_SPEED = 5.0
@@ -50,7 +101,12 @@ MIN_ACCELERATION_RATE = 0.1
 MAX_ACCELERATION_RATE = 2.0
 
 DEFAULT_ACCELERATION_EXPONENT = 1.5  # Exponential curve strength (>1 = exponential growth)
+MIN_ACCELERATION_EXPONENT = 1.0
+MAX_ACCELERATION_EXPONENT = 3.0
+
 DEFAULT_MAX_MULTIPLIER = 3.0  # Maximum speed multiplier (3x base speed)
+MIN_MAX_MULTIPLIER = 1.0
+MAX_MAX_MULTIPLIER = 5.0
 
 # Curve presets (only used in Position Control mode)
 CURVE_TYPES = [
@@ -60,5 +116,6 @@ CURVE_TYPES = [
     "Ease-Out",
     "Ease-In-Out",
     "Velocity-Based",
-    "Custom Power"
+    "Custom Power",
+    "Spline"
 ]
@@ -0,0 +1,273 @@
+"""
+Control engine - turns normalized stick values into roll/pitch angles
+
+Holds the velocity (rate) and position control math so it can be driven
+by the GUI update loop or by offline tools without a Tk window. An
+optional input filter (input_filter.OneEuroFilter) smooths the stick
+before any mode sees it. Auto balance mode hands the tick to a
+balance.BalanceController, created when the mode is first selected.
+"""
+
+from config import *
+from response_curves import create_curve
+
+
+def clamp_angle(angle, max_angle):
+    """Clamp an angle to the symmetric range [-max_angle, max_angle]"""
+    return max(-max_angle, min(max_angle, angle))
+
+
+class ControlEngine:
+    """Stateful roll/pitch controller for all control modes"""
+
+    def __init__(self, control_mode=CONTROL_MODES[0], max_angle=DEFAULT_MAX_ANGLE):
+        """
+        Initialize control engine
+
+        Args:
+            control_mode: One of config.CONTROL_MODES
+            max_angle: Maximum platform angle in degrees
+        """
+        self.control_mode = control_mode
+        self.max_angle = max_angle
+        self.curve = create_curve("Linear")
+        self.applied_curve_parameters = {}  # Curve parameters from the last apply_curve_settings()
+        self.input_filter = None  # Optional OneEuroFilter applied to the stick (None = off)
+        self.balance = None  # BalanceController for auto balance mode (created on first use)
+
+        # Current output
+        self.roll = 0.0
+        self.pitch = 0.0
+        self.multiplier = 1.0
+        self.curve_x = 0.0  # Curve output (position) or stick deflection (velocity)
+        self.curve_y = 0.0
+
+        # Velocity control parameters (user-adjustable)
+        self.control_speed = DEFAULT_CONTROL_SPEED
+        self.acceleration_rate = DEFAULT_ACCELERATION_RATE
+        self.acceleration_exponent = DEFAULT_ACCELERATION_EXPONENT
+        self.max_multiplier = DEFAULT_MAX_MULTIPLIER
+
+        # Velocity acceleration state
+        self.roll_hold_time = 0.0  # How long roll has been held in current direction
+        self.pitch_hold_time = 0.0  # How long pitch has been held in current direction
+        self.last_roll_sign = 0  # Track direction changes (0, 1, -1)
+        self.last_pitch_sign = 0
+
+    def get_settings(self):
+        """Return dict of the user-adjustable control settings"""
+        return {
+            "control_mode": self.control_mode,
+            "max_angle": self.max_angle,
+            "control_speed": self.control_speed,
+            "acceleration_rate": self.acceleration_rate,
+            "acceleration_exponent": self.acceleration_exponent,
+            "max_multiplier": self.max_multiplier,
+            "input_filter": self.input_filter.get_parameters() if self.input_filter is not None else None,
+            "balance": self.balance.get_parameters() if self.balance is not None else None,
+        }
+
+    def apply_settings(self, settings):
+        """
+        Apply control settings from a dict (unknown keys are ignored)
+
+        Args:
+            settings: Dict as returned by get_settings()
+        """
+        for name in ("control_speed", "acceleration_rate",
+                     "acceleration_exponent", "max_multiplier", "max_angle"):
+            if name in settings:
+                setattr(self, name, float(settings[name]))
+        if settings.get("control_mode") in CONTROL_MODES:
+            self.set_control_mode(settings["control_mode"])
+        if "input_filter" in settings:
+            self.set_input_filter(settings["input_filter"])
+        if settings.get("balance"):
+            self._get_balance().set_parameters(settings["balance"])
+
+    def set_input_filter(self, parameters):
+        """
+        Turn the stick filter on, retune it, or turn it off
+
+        Args:
+            parameters: Dict of OneEuroFilter parameters, or None to disable
+        """
+        if not parameters:
+            self.input_filter = None
+            return
+        if self.input_filter is None:
+            from input_filter import OneEuroFilter
+
+            self.input_filter = OneEuroFilter()
+        self.input_filter.set_parameters(parameters)
+
+    def set_control_mode(self, control_mode):
+        """Switch control mode and reset acceleration state"""
+        self.control_mode = control_mode
+        self.reset_acceleration()
+        if self.balance is not None:
+            self.balance.reset()
+
+    def _get_balance(self):
+        """Return the auto balance controller, creating it on first use"""
+        if self.balance is None:
+            from balance import BalanceController
+
+            self.balance = BalanceController()
+        return self.balance
+
+    def set_curve(self, curve):
+        """Set the response curve used in position mode"""
+        self.curve = curve
+
+    def apply_curve_settings(self, curve):
+        """
+        Apply curve settings, keeping the current curve when only parameters changed
+
+        Args:
+            curve: Dict with "type" and "parameters" (profiles.curve_to_dict form)
+        """
+        applied = self.applied_curve_parameters
+        if curve["type"] != self.curve.curve_type or not curve["parameters"]:
+            # New curve selected - start from its defaults
+            self.set_curve(create_curve(curve["type"]))
+            applied = {}
+        # Only pass on parameters that changed (spline edits stay local)
+        for name, value in curve["parameters"].items():
+            if applied.get(name) != value:
+                self.curve.set_parameter(name, value)
+        self.applied_curve_parameters = dict(curve["parameters"])
+
+    def filter_lag(self):
+        """Lag the input filter currently adds in seconds (worst axis, 0 when off)"""
+        if self.input_filter is None:
+            return 0.0
+        return max(self.input_filter.lag())
+
+    def reset_acceleration(self):
+        """Reset velocity acceleration state"""
+        self.roll_hold_time = 0.0
+        self.pitch_hold_time = 0.0
+        self.last_roll_sign = 0
+        self.last_pitch_sign = 0
+        self.multiplier = 1.0
+
+    def reset(self):
+        """Return to neutral and clear all state"""
+        self.roll = 0.0
+        self.pitch = 0.0
+        self.reset_acceleration()
+        self.curve.reset()
+        if self.input_filter is not None:
+            self.input_filter.reset()
+        if self.balance is not None:
+            self.balance.reset()
+
+    def controller_lost(self):
+        """
+        Handle a tick without a controller
+
+        Stick modes level the platform (reset()). Auto balance keeps running
+        on its position feed: a lost controller reads as a centered stick,
+        i.e. no manual override, and the integral is kept. Its safety is
+        the feed itself - without positions for BALANCE_STALE_TIMEOUT it
+        levels the platform.
+        """
+        if self.control_mode != "Auto Balance (Position Feed)":
+            self.reset()
+
+    def close(self):
+        """Release the auto balance position feed, if it was opened"""
+        if self.balance is not None:
+            self.balance.close()
+
+    def step(self, x, y, dt):
+        """
+        Advance the controller by one tick
+
+        Args:
+            x: Normalized stick X in range [-1, 1]
+            y: Normalized stick Y in range [-1, 1] (as returned by
+               ControllerMapper.get_normalized_values)
+            dt: Time since last tick in seconds
+
+        Returns:
+            Tuple of (roll, pitch) in degrees
+        """
+        if self.input_filter is not None:
+            x, y = self.input_filter.apply(x, y, dt)
+        if self.control_mode == "Velocity Control (Rate)":
+            self._step_velocity(x, -y, dt)  # Invert Y axis for correct pitch direction
+        elif self.control_mode == "Auto Balance (Position Feed)":
+            self._step_balance(x, -y, dt)
+        else:
+            self._step_position(x, -y)
+        return self.roll, self.pitch
+
+    def _step_velocity(self, x_deflection, y_deflection, dt):
+        """Velocity control - joystick controls rate of change"""
+        # Track direction changes for roll
+        current_roll_sign = 1 if x_deflection > 0 else (-1 if x_deflection < 0 else 0)
+        if current_roll_sign != self.last_roll_sign and current_roll_sign != 0:
+            # Direction changed - reset acceleration
+            self.roll_hold_time = 0.0
+        self.last_roll_sign = current_roll_sign
+
+        # Track direction changes for pitch
+        current_pitch_sign = 1 if y_deflection > 0 else (-1 if y_deflection < 0 else 0)
+        if current_pitch_sign != self.last_pitch_sign and current_pitch_sign != 0:
+            self.pitch_hold_time = 0.0
+        self.last_pitch_sign = current_pitch_sign
+
+        # Update hold times if stick is deflected beyond deadzone
+        if abs(x_deflection) > 0.01:  # Small threshold to avoid jitter
+            self.roll_hold_time += dt
+        else:
+            self.roll_hold_time = 0.0  # Reset when centered
+
+        if abs(y_deflection) > 0.01:
+            self.pitch_hold_time += dt
+        else:
+            self.pitch_hold_time = 0.0
+
+        # Calculate acceleration multipliers
+        # Formula: multiplier = 1.0 + (hold_time^exponent * deflection_factor * accel_rate)
+        # deflection_factor: larger stick movements accelerate faster
+        roll_time_factor = self.roll_hold_time ** self.acceleration_exponent
+        pitch_time_factor = self.pitch_hold_time ** self.acceleration_exponent
+
+        roll_multiplier = 1.0 + (roll_time_factor * abs(x_deflection) * self.acceleration_rate)
+        pitch_multiplier = 1.0 + (pitch_time_factor * abs(y_deflection) * self.acceleration_rate)
+
+        # Clamp to max multiplier
+        roll_multiplier = min(roll_multiplier, self.max_multiplier)
+        pitch_multiplier = min(pitch_multiplier, self.max_multiplier)
+
+        # Apply acceleration multiplier to base velocity
+        roll_rate = x_deflection * self.control_speed * roll_multiplier
+        pitch_rate = y_deflection * self.control_speed * pitch_multiplier
+
+        # Update angles, clamped to max angle (GLOBAL LIMIT - applies to both modes)
+        self.roll = clamp_angle(self.roll + roll_rate * dt, self.max_angle)
+        self.pitch = clamp_angle(self.pitch + pitch_rate * dt, self.max_angle)
+
+        self.multiplier = max(roll_multiplier, pitch_multiplier)
+        self.curve_x = x_deflection
+        self.curve_y = y_deflection
+
+    def _step_position(self, x, y):
+        """Position control - joystick position = angle directly"""
+        self.curve_x = self.curve.apply(x)
+        self.curve_y = self.curve.apply(y)
+        self.roll = self.curve_x * self.max_angle
+        self.pitch = self.curve_y * self.max_angle
+        self.multiplier = 1.0
+
+    def _step_balance(self, x, y, dt):
+        """Auto balance - PID on the marble position feed, stick blended in as position control"""
+        roll, pitch = self._get_balance().step(x, y, dt, self.max_angle)
+        self.roll = clamp_angle(roll, self.max_angle)
+        self.pitch = clamp_angle(pitch, self.max_angle)
+        self.multiplier = 1.0
+        self.curve_x = x
+        self.curve_y = y
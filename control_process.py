@@ -0,0 +1,560 @@
+"""
+Split-process mode - control loop and GUI viewer in separate processes
+
+Tk redraws and the control loop share one GIL when they run in the same
+process, so every canvas redraw delays the next control tick. With
+`main.py --split-gui` the controller reader, control engine and outputs
+run headless in the main process, and PlatformGUI runs in a spawned
+viewer process:
+
+    control process                               viewer process
+    ControlLoop --> SharedState (shared memory) --> ControlLink --> PlatformGUI
+         ^                                                              |
+         +--------------- Pipe (settings, serial requests) -------------+
+
+Once per tick the control loop publishes a fixed-layout state record. A
+sequence counter guards it instead of a lock: the writer makes the
+counter odd before writing and even again after, and the reader retries
+when it saw an odd counter or the counter moved while it copied.
+
+The control loop never waits for the viewer - it only polls the pipe -
+so a frozen or crashed viewer leaves the servo stream untouched.
+"""
+
+import collections
+import multiprocessing
+import signal
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+from config import *
+from control_engine import ControlEngine
+from scheduler import FrameScheduler
+
+
+SEQUENCE = struct.Struct('<Q')
+
+# Record layout - keep STATE and STATE_FIELDS in step
+STATE = struct.Struct('<d13f4I4B64s')
+STATE_FIELDS = (
+    'timestamp',             # time.time() of the tick
+    'x', 'y',                # Normalized stick after deadzone
+    'roll', 'pitch',         # Commanded angles in degrees
+    'multiplier',            # Velocity-mode speed multiplier
+    'curve_x', 'curve_y',    # Curve output (position mode) or deflection (velocity mode)
+    'max_angle',
+    'filter_lag',            # Lag added by the stick filter (s)
+    'feed_age',              # Age of the newest marble position in auto balance (s, -1 = none)
+    'override',              # Stick share of the auto balance command (0-1)
+    'utilization',           # Serial link utilization (0-1)
+    'max_send_rate',         # Serial link budget in Hz
+    'baudrate',
+    'link_version',          # SerialOutput.state_version
+    'reconnect_attempts',
+    'detections',            # Finished auto-detect requests
+    'link_state',            # SerialOutput.link_state (decoded from LINK_STATES)
+    'mock_mode',
+    'controller_connected',
+    'detect_found',          # Last auto-detect found a board
+    'port',                  # Serial port name (decoded)
+)
+LINK_STATES = ("disconnected", "handshake", "connected", "reconnecting")
+
+StateSnapshot = collections.namedtuple("StateSnapshot", STATE_FIELDS)
+
+# Serial requests the viewer may forward, by SerialOutput method name
+SERIAL_COMMANDS = ("connect", "disconnect", "enable_mock_mode", "disable_mock_mode")
+MAX_COMMANDS_PER_TICK = 32
+
+
+def _decode(values):
+    """Turn a raw STATE tuple into a StateSnapshot"""
+    values = list(values)
+    values[-5] = LINK_STATES[values[-5]] if values[-5] < len(LINK_STATES) else "disconnected"
+    values[-4:-1] = [bool(value) for value in values[-4:-1]]
+    values[-1] = values[-1].rstrip(b'\0').decode('utf-8', 'replace')
+    return StateSnapshot(*values)
+
+
+EMPTY_STATE = _decode(STATE.unpack(bytes(STATE.size)))
+
+
+class SharedState:
+    """Fixed-layout state record in shared memory, guarded by a sequence counter"""
+
+    def __init__(self, name=None):
+        """
+        Args:
+            name: Name of an existing segment to attach to (None = create one)
+        """
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=SEQUENCE.size + STATE.size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self._buf = self.memory.buf
+        self._sequence = 0
+        self.torn_reads = 0  # Reads retried because the writer was mid-update
+
+    def publish(self, *values):
+        """
+        Write one record (single writer only)
+
+        Args:
+            values: Field values in STATE order (link_state as an index,
+                port as bytes)
+        """
+        sequence = self._sequence + 1
+        SEQUENCE.pack_into(self._buf, 0, sequence)  # Odd: write in progress
+        STATE.pack_into(self._buf, SEQUENCE.size, *values)
+        self._sequence = sequence + 1
+        SEQUENCE.pack_into(self._buf, 0, self._sequence)
+
+    def read(self, attempts=100):
+        """
+        Read the latest complete record without locking
+
+        Returns:
+            Tuple of (sequence, StateSnapshot), or None if nothing has been
+            published yet or every attempt overlapped a write
+        """
+        buf = self._buf
+        for _ in range(attempts):
+            sequence = SEQUENCE.unpack_from(buf, 0)[0]
+            if sequence == 0:
+                return None
+            if sequence & 1:
+                continue
+            values = STATE.unpack_from(buf, SEQUENCE.size)
+            if SEQUENCE.unpack_from(buf, 0)[0] == sequence:
+                return sequence, _decode(values)
+            self.torn_reads += 1
+        return None
+
+    def close(self):
+        """Detach (and remove the segment if this side created it)"""
+        self._buf = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+class ControlLoop:
+    """Headless control loop: controller -> engine -> outputs, publishing state"""
+
+    def __init__(self, controller_mapper, serial_output, output, state, commands,
+                 telemetry=None, metrics=None, rate=CONTROL_LOOP_RATE, startup=None):
+        """
+        Args:
+            controller_mapper: ControllerMapper (reader thread already started)
+            serial_output: SerialOutput inside `output`
+            output: FanOut (or wrapper) that commands are sent to
+            state: SharedState created by this process
+            commands: Receiving end of the viewer pipe
+            telemetry: Optional started TelemetryRecorder
+            metrics: Optional metrics.Metrics updated every tick
+            rate: Control rate in Hz
+            startup: Optional profiling.StartupTimer, told about the first tick
+        """
+        self.controller = controller_mapper
+        self.serial = serial_output
+        self.output = output
+        self.state = state
+        self.commands = commands
+        self.telemetry = telemetry
+        self.metrics = metrics
+        self.startup = startup
+        self.scheduler = FrameScheduler(rate)
+        self.engine = ControlEngine(max_angle=self.controller.max_angle)
+        self.running = True
+        self.viewer_attached = True
+        self.last_update_time = None
+
+        # Auto-detect runs off the control thread; the result is published
+        self.detect_executor = None  # Created on the first request
+        self.detect_future = None
+        self.detections = 0
+        self.detect_found = False
+
+    def run(self):
+        """Run ticks on absolute deadlines until stop() or the viewer asks to quit"""
+        while self.running:
+            self.tick()
+            time.sleep(self.scheduler.next_delay() / 1000.0)
+
+    def tick(self):
+        """One control tick"""
+        frame_start = time.perf_counter()
+        self.scheduler.start_frame(frame_start)
+        if self.metrics is not None:
+            self.metrics.loop.tick(frame_start)
+
+        current_time = time.time()
+        if self.last_update_time is None:
+            dt = 1.0 / CONTROL_LOOP_RATE
+        else:
+            dt = current_time - self.last_update_time
+        self.last_update_time = current_time
+        dt = max(0.001, min(0.2, dt))
+
+        self.poll_commands()
+        if self.detect_future is not None and self.detect_future.done():
+            self.finish_detect()
+
+        x, y = self.controller.get_normalized_values()
+        if not self.controller.connected:
+            self.engine.controller_lost()
+        self.engine.max_angle = self.controller.max_angle
+        roll, pitch = self.engine.step(x, y, dt)
+        sent = self.output.send_command(roll, pitch)
+        self.publish(current_time, x, y)
+
+        if self.telemetry is not None:
+            engine = self.engine
+            self.telemetry.record(
+                current_time, int(self.controller.right_stick_x), int(self.controller.right_stick_y),
+                x, y, engine.curve_x, engine.curve_y, engine.multiplier, roll, pitch, sent
+            )
+        if self.metrics is not None:
+            self.metrics.roll = roll
+            self.metrics.pitch = pitch
+            self.metrics.input_filter_lag = self.engine.filter_lag()
+            self.metrics.loop.work_done(time.perf_counter() - frame_start)
+
+        if self.startup is not None:
+            self.startup.first_tick()
+            if self.startup.exit_after:
+                self.running = False
+            self.startup = None
+
+    def publish(self, current_time, x, y):
+        """Write this tick's state record"""
+        engine = self.engine
+        serial = self.serial
+        feed_age, override = -1.0, 0.0
+        if engine.balance is not None:
+            status = engine.balance.status()
+            feed_age = status["age"] if status["age"] is not None else -1.0
+            override = status["override"]
+        self.state.publish(
+            current_time, x, y, engine.roll, engine.pitch, engine.multiplier,
+            engine.curve_x, engine.curve_y, engine.max_angle, engine.filter_lag(), feed_age, override,
+            serial.utilization, serial.max_send_rate,
+            serial.link_baudrate or 0, serial.state_version, serial.reconnect_attempts, self.detections,
+            LINK_STATES.index(serial.link_state), serial.mock_mode, self.controller.connected,
+            self.detect_found, (serial.port or "").encode('utf-8')[:64]
+        )
+
+    def poll_commands(self):
+        """Apply requests from the viewer without ever blocking on it"""
+        if not self.viewer_attached:
+            return
+        try:
+            for _ in range(MAX_COMMANDS_PER_TICK):
+                if not self.commands.poll():
+                    break
+                self.handle_command(self.commands.recv())
+        except (EOFError, OSError):
+            self.viewer_attached = False
+            if self.running:
+                print("\nViewer exited - control loop keeps running (Ctrl+C to stop)")
+
+    def handle_command(self, message):
+        """
+        Apply one viewer request
+
+        Args:
+            message: Tuple of (kind, *args)
+        """
+        kind, args = message[0], message[1:]
+        if kind == "settings":
+            self.apply_settings(args[0])
+        elif kind == "auto_connect":
+            if self.detect_future is None:
+                if self.detect_executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self.detect_executor = ThreadPoolExecutor(max_workers=1)
+                self.detect_future = self.detect_executor.submit(self.serial.detect_device, *args)
+        elif kind in SERIAL_COMMANDS:
+            getattr(self.serial, kind)(*args)
+        elif kind == "quit":
+            self.running = False
+        else:
+            print(f"Ignoring unknown viewer request {kind!r}")
+
+    def apply_settings(self, changes):
+        """
+        Apply settings changes forwarded from the viewer's parameter bus
+
+        Args:
+            changes: Dict of changed settings as returned by ParameterBus.poll()
+        """
+        self.engine.apply_settings(changes)
+        if "max_angle" in changes:
+            self.controller.set_max_angle(changes["max_angle"])
+        if "deadzone" in changes:
+            self.controller.set_deadzone(changes["deadzone"])
+        if "curve" in changes:
+            self.engine.apply_curve_settings(changes["curve"])
+
+    def finish_detect(self):
+        """Adopt the device found by an auto-detect request"""
+        future = self.detect_future
+        self.detect_future = None
+        try:
+            device = future.result()
+        except Exception as e:
+            print(f"Auto-detect failed: {e}")
+            device = None
+        if device is not None:
+            self.serial.adopt(device)
+        self.detect_found = device is not None
+        self.detections += 1
+
+    def stop(self):
+        """Ask run() to return after the current tick"""
+        self.running = False
+
+    def close(self):
+        """Send neutral, close outputs and stop telemetry"""
+        self.running = False
+        if self.detect_executor is not None:
+            self.detect_executor.shutdown(wait=False)
+        self.output.send_command(0.0, 0.0)
+        self.output.close()
+        self.engine.close()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+
+
+class ControlLink:
+    """Viewer side of the split: reads published state and sends requests"""
+
+    def __init__(self, state_name, commands):
+        """
+        Args:
+            state_name: SharedState segment name
+            commands: Sending end of the control pipe
+        """
+        self.state = SharedState(state_name)
+        self.commands = commands
+        self.snapshot = EMPTY_STATE
+        self.sequence = 0
+        self.closed = False
+        self._send_lock = threading.Lock()  # GUI thread and detect thread both send
+
+    def read(self):
+        """
+        Refresh and return the latest snapshot (keeps the previous one if
+        the read kept overlapping writes)
+        """
+        result = self.state.read()
+        if result is not None:
+            self.sequence, self.snapshot = result
+        return self.snapshot
+
+    def send(self, *message):
+        """Send a request to the control process (dropped once it is gone)"""
+        with self._send_lock:
+            if self.closed:
+                return
+            try:
+                self.commands.send(message)
+            except (OSError, ValueError):
+                self.closed = True
+
+    def close(self):
+        """Ask the control process to quit and detach"""
+        self.send("quit")
+        with self._send_lock:
+            self.closed = True
+            self.commands.close()
+        self.state.close()
+
+
+class RemoteController:
+    """Stands in for ControllerMapper in the viewer (settings go over the link)"""
+
+    def __init__(self, link):
+        self.link = link
+        self.deadzone = DEFAULT_DEADZONE
+        self.max_angle = DEFAULT_MAX_ANGLE
+
+    @property
+    def connected(self):
+        return self.link.snapshot.controller_connected
+
+    def get_normalized_values(self):
+        snapshot = self.link.snapshot
+        return snapshot.x, snapshot.y
+
+    def set_deadzone(self, deadzone):
+        self.deadzone = max(0.0, min(1.0, deadzone))
+
+    def set_max_angle(self, max_angle):
+        self.max_angle = max(0.0, min(90.0, max_angle))
+
+
+class RemoteSerial:
+    """
+    Stands in for SerialOutput in the viewer
+
+    Reads link state from the published snapshot and forwards connection
+    requests to the control process, which owns the port.
+    """
+
+    def __init__(self, link):
+        self.link = link
+        self._requested_port = None
+
+    @property
+    def link_state(self):
+        return self.link.snapshot.link_state
+
+    @property
+    def state_version(self):
+        return self.link.snapshot.link_version
+
+    @property
+    def port(self):
+        return self.link.snapshot.port or self._requested_port
+
+    @property
+    def mock_mode(self):
+        return self.link.snapshot.mock_mode
+
+    @property
+    def is_connected(self):
+        return self.link_state == "connected" or self.mock_mode
+
+    @property
+    def reconnect_attempts(self):
+        return self.link.snapshot.reconnect_attempts
+
+    @property
+    def link_baudrate(self):
+        return self.link.snapshot.baudrate
+
+    @property
+    def max_send_rate(self):
+        return self.link.snapshot.max_send_rate
+
+    @property
+    def utilization(self):
+        return self.link.snapshot.utilization
+
+    def connect(self, port):
+        """Request a connection (progress shows up in link_state)"""
+        self._requested_port = port
+        self.link.send("connect", port)
+        return True
+
+    def disconnect(self):
+        self.link.send("disconnect")
+
+    def enable_mock_mode(self):
+        self.link.send("enable_mock_mode")
+
+    def disable_mock_mode(self):
+        self.link.send("disable_mock_mode")
+
+    def detect_device(self, candidates=None, timeout=3.0):
+        """
+        Have the control process probe and connect, and wait for the result
+
+        Blocks like SerialOutput.detect_device(), so call it off the Tk
+        thread. The control process adopts the device itself; the returned
+        DetectedDevice only carries the port.
+        """
+        from serial_output import DetectedDevice
+
+        detections = self.link.snapshot.detections
+        self.link.send("auto_connect", candidates, timeout)
+        deadline = time.monotonic() + timeout + 5.0  # Probe timeout plus baud negotiation
+        while time.monotonic() < deadline and not self.link.closed:
+            snapshot = self.link.snapshot
+            if snapshot.detections != detections:
+                return DetectedDevice(snapshot.port, None, None) if snapshot.detect_found else None
+            time.sleep(0.05)
+        return None
+
+    def adopt(self, device):
+        """Nothing to do - the control process already connected"""
+
+
+def run_viewer(state_name, commands, profile_path=None, auto_connect=False):
+    """
+    Viewer process entry point: PlatformGUI driven by a ControlLink
+
+    Args:
+        state_name: SharedState segment name
+        commands: Sending end of the control pipe
+        profile_path: Optional settings profile to apply at startup
+        auto_connect: Start auto-detection at startup
+    """
+    import tkinter as tk
+    from platform_gui import PlatformGUI
+    from profiles import load_profile
+
+    # Ctrl+C in the terminal is handled by the control process, which shuts us down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    link = ControlLink(state_name, commands)
+    root = tk.Tk()
+    gui = PlatformGUI(root, RemoteController(link), RemoteSerial(link), link=link)
+    if profile_path:
+        gui.apply_profile(load_profile(profile_path))
+    if auto_connect:
+        gui.start_auto_detect()
+
+    def on_closing():
+        gui.cleanup()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    root.mainloop()
+
+
+def run_split(controller_mapper, serial_output, output, telemetry=None, metrics=None,
+              profile_path=None, auto_connect=False, startup=None):
+    """
+    Run the control loop here and the GUI in a viewer process
+
+    Returns when the viewer window is closed or on Ctrl+C - or right after
+    the first tick, without starting the viewer, when startup.exit_after
+    is set.
+    """
+    state = SharedState()
+    context = multiprocessing.get_context("spawn")  # No forking of the reader threads
+    receiver, sender = context.Pipe(duplex=False)
+    viewer = context.Process(target=run_viewer, name="platform-viewer", daemon=True,
+                             args=(state.name, sender, profile_path, auto_connect))
+
+    serial_output.enable_mock_mode()  # Same startup state as the single-process GUI
+    loop = ControlLoop(controller_mapper, serial_output, output, state, receiver, telemetry, metrics,
+                       startup=startup)
+    if startup is not None:
+        startup.mark("shared state")
+    exit_after = startup is not None and startup.exit_after
+    try:
+        loop.tick()  # First tick before paying for the viewer process start
+        if exit_after:
+            return  # Startup measurement only - no window to open
+        viewer.start()
+        sender.close()  # Only the viewer writes; EOF then means it has gone
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("\nShutting down...")
+        loop.close()
+        if viewer.pid is not None:
+            viewer.join(1.0)
+            if viewer.is_alive():
+                viewer.terminate()
+        sender.close()
+        receiver.close()
+        state.close()
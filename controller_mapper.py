@@ -1,28 +1,43 @@
 """
 Xbox Controller Joystick Mapper
 Reads the right stick from an Xbox controller and maps to roll/pitch angles
+
+The inputs library enumerates every input device when it is imported, so
+it is imported on the reader thread instead of at startup.
 """
 
-from inputs import get_gamepad
 import sys
 import threading
 import time
 
 
 class ControllerMapper:
-    def __init__(self, deadzone=0.08, max_angle=45.0):
+    def __init__(self, deadzone=0.08, max_angle=45.0, stall_timeout=1.0):
         """
         Initialize controller mapper
 
         Args:
             deadzone: Deadzone threshold (0.0 to 1.0)
             max_angle: Maximum angle in degrees
+            stall_timeout: Seconds without events (while the stick is held
+                off-center) before the reader is considered stalled
         """
         self.right_stick_x = 0.0  # Raw value
         self.right_stick_y = 0.0  # Raw value
         self.running = True
         self.deadzone = deadzone
         self.max_angle = max_angle
+        self.metrics = None  # Optional metrics.ControllerStats
+
+        # Reader supervision
+        self.stall_timeout = stall_timeout
+        self.check_interval = 0.1  # Supervisor poll period (s)
+        self.connected = False  # False while input is forced to neutral
+        self.generation = 0  # Id of the current reader thread; older readers exit
+        self.last_event_time = time.monotonic()
+        self.reconnect_latency = None  # Fault to first event of the new reader (s)
+        self._failed_generation = None
+        self._fault_time = None
 
         # For thread safety
         self._lock = threading.Lock()
@@ -94,10 +109,57 @@ class ControllerMapper:
         self.max_angle = max(0.0, min(90.0, max_angle))
 
     def read_controller(self):
-        """Background thread to continuously read controller input"""
+        """
+        Background thread to continuously read controller input
+
+        Supervises a reader thread rather than reading directly. If the
+        reader dies, or stalls (no events for stall_timeout while the stick
+        is off-center - a centered stick may legitimately be quiet), the
+        stick is forced to neutral, devices are re-enumerated and a new
+        reader generation is started, backing off between attempts. A
+        reader stuck inside get_gamepad() cannot be interrupted, so it is
+        simply superseded and exits on its next event.
+        """
+        self._start_reader()
+        delay = 0.5
+        next_attempt = 0.0
+        while self.running:
+            time.sleep(self.check_interval)
+            now = time.monotonic()
+            if self.connected:
+                failed = self._failed_generation == self.generation
+                if not failed and not (self._off_center() and now - self.last_event_time > self.stall_timeout):
+                    continue
+                if self._fault_time is None:
+                    # Healthy until now - retry straight away; repeated faults keep backing off
+                    delay = 0.5
+                    next_attempt = now
+                self._fault("reader stopped" if failed else "no events")
+
+            if now >= next_attempt:
+                if self._restart_reader():
+                    continue
+                next_attempt = now + delay
+                delay = min(5.0, delay * 2)
+
+    def _read_events(self, generation):
+        """Reader thread for one generation"""
         try:
-            while self.running:
+            from inputs import get_gamepad
+
+            while self.running and generation == self.generation:
                 events = get_gamepad()
+                if generation != self.generation:
+                    return  # Superseded while blocked in get_gamepad()
+                self.last_event_time = now = time.monotonic()
+                if self._fault_time is not None:
+                    self.reconnect_latency = now - self._fault_time
+                    self._fault_time = None
+                    if self.metrics is not None:
+                        self.metrics.reconnect_latency = self.reconnect_latency
+                    print(f"\nController back after {self.reconnect_latency * 1000:.0f} ms")
+                if self.metrics is not None:
+                    self.metrics.events += len(events)
                 for event in events:
                     with self._lock:
                         # Right stick X-axis (RX)
@@ -107,8 +169,56 @@ class ControllerMapper:
                         elif event.code == 'ABS_RY':
                             self.right_stick_y = event.state
         except Exception as e:
-            print(f"\nError reading controller: {e}")
-            self.running = False
+            if generation == self.generation:
+                print(f"\nError reading controller: {e}")
+                self._failed_generation = generation
+
+    def _start_reader(self):
+        """Start a new reader generation"""
+        self.generation += 1
+        self.last_event_time = time.monotonic()
+        self.connected = True
+        if self.metrics is not None:
+            self.metrics.connected = True
+            if self.generation > 1:
+                self.metrics.restarts += 1
+        threading.Thread(target=self._read_events, args=(self.generation,), daemon=True).start()
+
+    def _restart_reader(self):
+        """
+        Re-enumerate input devices and restart reading if a gamepad is present
+
+        Returns:
+            True if a new reader was started
+        """
+        try:
+            import inputs
+
+            inputs.devices = inputs.DeviceManager()
+        except Exception as e:
+            print(f"\nError enumerating controllers: {e}")
+            return False
+        if not inputs.devices.gamepads:
+            return False
+        self._start_reader()
+        return True
+
+    def _off_center(self):
+        """True if the last known stick position is outside the deadzone"""
+        x, y = self.get_normalized_values()
+        return x != 0.0 or y != 0.0
+
+    def _fault(self, reason):
+        """Force neutral input and mark the controller as lost"""
+        print(f"\nController lost ({reason}) - holding neutral, waiting for controller...")
+        self.connected = False
+        if self._fault_time is None:
+            self._fault_time = time.monotonic()
+        with self._lock:
+            self.right_stick_x = 0.0
+            self.right_stick_y = 0.0
+        if self.metrics is not None:
+            self.metrics.connected = False
 
     def stop(self):
         """Stop the controller reading thread"""
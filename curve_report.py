@@ -0,0 +1,235 @@
+"""
+Offline curve comparison report
+
+Runs a recorded input session through every curve in config.CURVE_TYPES
+(position mode) and through velocity mode, then writes summary stats for
+each combination:
+
+- range_usage / mean_usage: peak and mean |angle| as a fraction of max angle
+- mean_abs_jerk: mean |d³angle/dt³| in degrees per second cubed
+- serial_updates: frames whose <roll,pitch> command changes after the
+  0.1° quantization used by SerialOutput
+- center_time: fraction of time both axes are within the center band
+
+The session is processed in fixed-size chunks, so memory use does not
+grow with recording length. Position-mode curves are applied with their
+vectorized apply_batch() forms; velocity mode integrates sample by
+sample because every output depends on the previous one.
+
+Usage:
+    python curve_report.py session.csv
+    python curve_report.py session.csv --output report.csv --chunk-size 8192
+"""
+
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from config import *
+from control_engine import ControlEngine
+from recordings import iter_session_chunks
+from response_curves import create_curve
+
+
+REPORT_FIELDS = ["mode", "curve", "samples", "duration", "range_usage", "mean_usage",
+                 "mean_abs_jerk", "serial_updates", "center_time"]
+
+
+class AngleStats:
+    """Streaming summary statistics for a roll/pitch output sequence"""
+
+    def __init__(self, max_angle, center_threshold):
+        self.max_angle = max_angle
+        self.center_threshold = center_threshold
+        self.samples = 0
+        self.duration = 0.0
+        self.peak = 0.0
+        self.abs_total = 0.0
+        self.jerk_total = 0.0
+        self.jerk_count = 0
+        self.serial_updates = 0
+        self.center_time = 0.0
+        # Tail of the previous chunk (for differences across chunk boundaries)
+        self.tail_t = np.empty(0)
+        self.tail_roll = np.empty(0)
+        self.tail_pitch = np.empty(0)
+        self.last_command = None
+
+    def update(self, t, roll, pitch):
+        """
+        Add one chunk of output
+
+        Args:
+            t: Array of timestamps in seconds
+            roll: Array of roll angles in degrees
+            pitch: Array of pitch angles in degrees
+        """
+        if len(t) == 0:
+            return
+        self.samples += len(t)
+        magnitude = np.maximum(np.abs(roll), np.abs(pitch))
+        self.peak = max(self.peak, float(magnitude.max()))
+        self.abs_total += float((np.abs(roll) + np.abs(pitch)).sum()) / 2.0
+
+        # Join with the previous tail so every difference is counted once
+        all_t = np.concatenate((self.tail_t, t))
+        all_roll = np.concatenate((self.tail_roll, roll))
+        all_pitch = np.concatenate((self.tail_pitch, pitch))
+        dt = np.maximum(np.diff(all_t), 1e-6)
+
+        if len(self.tail_t):
+            self.duration += float(all_t[-1] - self.tail_t[-1])
+        else:
+            self.duration += float(t[-1] - t[0])
+
+        # Time near center, weighted by each sample's interval
+        centered = magnitude <= self.center_threshold
+        intervals = dt[-len(t):] if len(dt) >= len(t) else np.concatenate(([0.0], dt))
+        self.center_time += float(intervals[centered].sum())
+
+        # Jerk for both axes - needs four consecutive samples
+        for angles in (all_roll, all_pitch):
+            if len(angles) >= 4:
+                velocity = np.diff(angles) / dt
+                acceleration = np.diff(velocity) / dt[1:]
+                jerk = np.diff(acceleration) / dt[2:]
+                # Only the differences ending in this chunk are new
+                new = jerk[-len(t):] if len(self.tail_t) else jerk
+                self.jerk_total += float(np.abs(new).sum())
+                self.jerk_count += len(new)
+
+        # Serial updates after 0.1° quantization
+        quantized = np.stack((np.round(roll * 10.0), np.round(pitch * 10.0)), axis=1).astype(np.int64)
+        changed = np.any(quantized[1:] != quantized[:-1], axis=1)
+        updates = int(changed.sum())
+        if self.last_command is None or tuple(quantized[0]) != self.last_command:
+            updates += 1
+        self.serial_updates += updates
+        self.last_command = tuple(quantized[-1])
+
+        self.tail_t = all_t[-3:]
+        self.tail_roll = all_roll[-3:]
+        self.tail_pitch = all_pitch[-3:]
+
+    def result(self):
+        """Return dict of summary stats"""
+        return {
+            "samples": self.samples,
+            "duration": self.duration,
+            "range_usage": self.peak / self.max_angle if self.max_angle else 0.0,
+            "mean_usage": (self.abs_total / self.samples / self.max_angle
+                           if self.samples and self.max_angle else 0.0),
+            "mean_abs_jerk": self.jerk_total / self.jerk_count if self.jerk_count else 0.0,
+            "serial_updates": self.serial_updates,
+            "center_time": self.center_time / self.duration if self.duration else 0.0,
+        }
+
+
+class PositionRunner:
+    """Position mode with one curve instance per axis"""
+
+    def __init__(self, curve_type, max_angle):
+        self.max_angle = max_angle
+        self.roll_curve = create_curve(curve_type)
+        self.pitch_curve = create_curve(curve_type)
+
+    def run(self, t, x, y):
+        roll = self.roll_curve.apply_batch(x, t) * self.max_angle
+        pitch = self.pitch_curve.apply_batch(-y, t) * self.max_angle  # Invert Y for pitch
+        return roll, pitch
+
+
+class VelocityRunner:
+    """Velocity mode - sequential integration through ControlEngine"""
+
+    def __init__(self, max_angle):
+        self.engine = ControlEngine(control_mode="Velocity Control (Rate)", max_angle=max_angle)
+        self.last_t = None
+
+    def run(self, t, x, y):
+        roll = np.empty(len(t))
+        pitch = np.empty(len(t))
+        step = self.engine.step
+        last_t = self.last_t
+        for i, (ti, xi, yi) in enumerate(zip(t.tolist(), x.tolist(), y.tolist())):
+            dt = 1.0 / CONTROLLER_UPDATE_RATE if last_t is None else ti - last_t
+            last_t = ti
+            roll[i], pitch[i] = step(xi, yi, max(0.0, min(0.2, dt)))
+        self.last_t = last_t
+        return roll, pitch
+
+
+def build_runners(max_angle):
+    """Return list of (mode, curve, runner) for every combination"""
+    runners = [(CONTROL_MODES[0], "-", VelocityRunner(max_angle))]
+    for curve_type in CURVE_TYPES:
+        runners.append((CONTROL_MODES[1], curve_type, PositionRunner(curve_type, max_angle)))
+    return runners
+
+
+def compare_curves(path, max_angle=DEFAULT_MAX_ANGLE, center_threshold=1.0, chunk_size=4096):
+    """
+    Run a recorded session through every mode/curve combination
+
+    Args:
+        path: Session CSV path
+        max_angle: Maximum platform angle in degrees
+        center_threshold: Half-width of the center band in degrees
+        chunk_size: Samples per processing chunk
+
+    Returns:
+        List of report row dicts (see REPORT_FIELDS)
+    """
+    runners = build_runners(max_angle)
+    stats = [AngleStats(max_angle, center_threshold) for _ in runners]
+
+    for t, x, y in iter_session_chunks(path, chunk_size):
+        t = np.asarray(t, dtype=float)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        for (_, _, runner), stat in zip(runners, stats):
+            stat.update(t, *runner.run(t, x, y))
+
+    return [dict(mode=mode, curve=curve, **stat.result())
+            for (mode, curve, _), stat in zip(runners, stats)]
+
+
+def write_report(rows, path):
+    """Write report rows to a CSV file"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_report(rows):
+    """Print report rows as a table"""
+    print(f"{'Mode':<28}{'Curve':<16}{'Range':>7}{'Mean':>7}{'Jerk':>10}{'Serial':>9}{'Center':>8}")
+    for row in rows:
+        print(f"{row['mode']:<28}{row['curve']:<16}"
+              f"{row['range_usage']:>6.0%} {row['mean_usage']:>6.0%}"
+              f"{row['mean_abs_jerk']:>10.0f}{row['serial_updates']:>9d}{row['center_time']:>7.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare every response curve on a recorded session")
+    parser.add_argument("session", help="Recorded session CSV (t,x,y)")
+    parser.add_argument("--output", help="Write the report to this CSV file")
+    parser.add_argument("--max-angle", type=float, default=DEFAULT_MAX_ANGLE)
+    parser.add_argument("--center-threshold", type=float, default=1.0,
+                        help="Center band half-width in degrees")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Samples per chunk")
+    args = parser.parse_args(argv)
+
+    rows = compare_curves(args.session, args.max_angle, args.center_threshold, args.chunk_size)
+    print_report(rows)
+    if args.output:
+        write_report(rows, args.output)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Python port of the sketches' streaming frame parser
+
+The example sketches read serial input one byte at a time into a fixed
+buffer instead of Serial.readStringUntil(), which blocks on a partial
+line and allocates a String per command. FrameParser follows the
+sketch code line by line so byte streams can be checked on the host:
+
+    - Lines start with '<' or '{' (frames), '?' (identify) or 'B' (baud
+      change); anything else is skipped up to the next '\\n'.
+    - '<' or '{' always starts a new line, so a lost '\\n' costs one
+      frame instead of corrupting the next.
+    - Lines longer than the buffer are dropped whole.
+    - Each poll answers every control line but keeps only the newest
+      complete frame - older ones in the same backlog are stale.
+
+Run the self-check against the examples below:
+
+    python frame_parser.py
+"""
+
+import random
+import re
+import sys
+
+
+LINE_BUFFER_SIZE = 64  # Must match the sketches (including the terminating NUL)
+FRAME_STARTS = b"<{"
+CONTROL_STARTS = b"?B"
+
+_FLOAT = re.compile(rb"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")  # What strtod() accepts
+_UNSIGNED = re.compile(rb"\s*\+?\d+")  # What strtoul() accepts
+
+
+class FrameParser:
+    """Byte-at-a-time line parser with a fixed buffer, like the sketches"""
+
+    def __init__(self, buffer_size=LINE_BUFFER_SIZE):
+        """
+        Args:
+            buffer_size: Line buffer size in bytes (the sketch's LINE_BUFFER_SIZE)
+        """
+        self.buffer_size = buffer_size
+        self.line = bytearray()
+        self.discarding = False
+        self.skipped_frames = 0  # Complete frames replaced by a newer one before use
+        self.dropped_lines = 0  # Overlong lines
+
+    def parse_byte(self, byte):
+        """
+        Feed one byte (parseByte() in the sketches)
+
+        Returns:
+            The completed line (without '\\n') or None
+        """
+        if byte == 0x0D:  # '\r'
+            return None
+        if byte == 0x0A:  # '\n'
+            complete = not self.discarding and len(self.line) > 0
+            line = bytes(self.line)
+            self.line.clear()
+            self.discarding = False
+            return line if complete else None
+        if byte in FRAME_STARTS:
+            self.line.clear()
+            self.discarding = False
+        elif not self.line and byte not in CONTROL_STARTS:
+            self.discarding = True
+        if self.discarding:
+            return None
+        if len(self.line) >= self.buffer_size - 1:
+            self.discarding = True
+            self.line.clear()
+            self.dropped_lines += 1
+            return None
+        self.line.append(byte)
+        return None
+
+    def poll(self, data, on_control=None):
+        """
+        Consume the bytes that have arrived (pollSerial() in the sketches)
+
+        Args:
+            data: Bytes available this pass
+            on_control: Called with each '?'/'B' line; a True return (baud
+                        change) stops the pass like the sketch does
+
+        Returns:
+            The newest complete frame line, or None
+        """
+        frame = None
+        for byte in data:
+            line = self.parse_byte(byte)
+            if line is None:
+                continue
+            if line[0] in CONTROL_STARTS:
+                if on_control is not None and on_control(line):
+                    self.line.clear()  # Baud changed - drop whatever was half received
+                    self.discarding = False
+                    break
+            else:
+                if frame is not None:
+                    self.skipped_frames += 1
+                frame = line
+        return frame
+
+
+def parse_frame(line, count, open_char=b"<", close_char=b">"):
+    """
+    Parse a frame line the way parseFrame() in the sketches does
+
+    Args:
+        line: Frame without '\\n', e.g. b"<12.5,-8.3@100>"
+        count: Number of angles the sketch expects
+        open_char, close_char: b"<", b">" or b"{", b"}"
+
+    Returns:
+        Tuple of (angles list, duration ms - 0 means jump), or None if malformed
+    """
+    if isinstance(line, str):
+        line = line.encode('ascii', 'replace')
+    if line[:1] != open_char:
+        return None
+    position = 1
+    angles = []
+    for i in range(count):
+        match = _FLOAT.match(line, position)
+        if match is None:
+            return None
+        angles.append(float(match.group(0)))
+        position = match.end()
+        if i < count - 1:
+            if line[position:position + 1] != b",":
+                return None
+            position += 1
+    duration = 0
+    if line[position:position + 1] == b"@":
+        match = _UNSIGNED.match(line, position + 1)
+        if match is None:
+            return None
+        duration = int(match.group(0))
+        position = match.end()
+    if line[position:] != close_char:
+        return None
+    return angles, duration
+
+
+# Byte streams and what the sketches must make of them: (name, stream,
+# frames a poll per chunk should return, control lines seen)
+EXAMPLES = [
+    ("single frame", [b"<12.5,-8.3>\n"], [b"<12.5,-8.3>"], []),
+    ("split across reads", [b"<12", b".5,-8", b".3>\n"], [None, None, b"<12.5,-8.3>"], []),
+    ("backlog keeps newest", [b"<1.0,1.0>\n<2.0,2.0>\n<3.0,3.0>\n"], [b"<3.0,3.0>"], []),
+    ("CRLF line endings", [b"<1.0,2.0>\r\n"], [b"<1.0,2.0>"], []),
+    ("noise before frame", [b"xx\x00garbage\n<1.0,2.0>\n"], [b"<1.0,2.0>"], []),
+    ("lost newline resyncs", [b"<1.0,2.<3.0,4.0>\n"], [b"<3.0,4.0>"], []),
+    ("overlong line dropped", [b"<" + b"1" * 100 + b">\n<5.0,6.0>\n"], [b"<5.0,6.0>"], []),
+    ("controls answered, frames coalesced", [b"<1.0,1.0>\n?\n<2.0,2.0>\nB115200\n"], [b"<2.0,2.0>"],
+     [b"?", b"B115200"]),
+    ("timed frame", [b"<1.5,-2.0@100>\n"], [b"<1.5,-2.0@100>"], []),
+    ("servo frame", [b"{1.0,2.0,3.0}\n"], [b"{1.0,2.0,3.0}"], []),
+]
+
+PARSE_EXAMPLES = [
+    (b"<12.5,-8.3>", 2, ([12.5, -8.3], 0)),
+    (b"<12.5,-8.3@100>", 2, ([12.5, -8.3], 100)),
+    (b"<1,2,3>", 2, None),
+    (b"<1.0>", 2, None),
+    (b"<1.0,x>", 2, None),
+    (b"<1.0,2.0@>", 2, None),
+    (b"<1.0,2.0", 2, None),
+    (b"{1.0,2.0,3.0@20}", 3, ([1.0, 2.0, 3.0], 20)),
+]
+
+
+def self_check(fuzz_runs=200, seed=1):
+    """
+    Run the examples plus a chunking fuzz test
+
+    Returns:
+        Number of failures
+    """
+    failures = 0
+    for name, chunks, expected_frames, expected_controls in EXAMPLES:
+        parser = FrameParser()
+        controls = []
+        frames = [parser.poll(chunk, lambda line: controls.append(line)) for chunk in chunks]
+        ok = frames == expected_frames and controls == expected_controls
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name}" + ("" if ok else f": got {frames} {controls}"))
+
+    for line, count, expected in PARSE_EXAMPLES:
+        open_char, close_char = (b"{", b"}") if line.startswith(b"{") else (b"<", b">")
+        result = parse_frame(line, count, open_char, close_char)
+        ok = result == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} parse {line.decode()}" + ("" if ok else f": got {result}"))
+
+    # However a stream is split into reads, the last frame must match the
+    # newest complete frame, and nothing complete may be lost or invented
+    rng = random.Random(seed)
+    fuzz_failures = 0
+    for _ in range(fuzz_runs):
+        frames = [f"<{rng.uniform(-45, 45):.1f},{rng.uniform(-45, 45):.1f}>\n".encode() for _ in range(20)]
+        stream = b"".join(frames)
+        cuts = sorted(rng.sample(range(1, len(stream)), 15))
+        chunks = [stream[a:b] for a, b in zip([0] + cuts, cuts + [len(stream)])]
+        parser = FrameParser()
+        seen = [frame for frame in (parser.poll(chunk) for chunk in chunks) if frame is not None]
+        if not seen or seen[-1] != frames[-1].rstrip(b"\n") or len(seen) + parser.skipped_frames != len(frames):
+            fuzz_failures += 1
+    failures += fuzz_failures
+    print(f"{'ok  ' if not fuzz_failures else 'FAIL'} {fuzz_runs} randomly split streams"
+          + ("" if not fuzz_failures else f": {fuzz_failures} failed"))
+    return failures
+
+
+if __name__ == "__main__":
+    failed = self_check()
+    print("\nAll checks passed" if not failed else f"\n{failed} check(s) failed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,219 @@
+"""
+One-Euro input filter - speed-adaptive low-pass for the stick
+
+A stick resting near the deadzone edge flickers by a few hundredths,
+and every flicker becomes a serial frame and a servo twitch. A fixed
+low-pass removes it but makes fast moves sluggish. The One-Euro filter
+(Casiez et al., CHI 2012) adapts its cutoff to the stick speed:
+
+    cutoff = min_cutoff + beta * |filtered speed|
+
+Slow or resting input is smoothed hard, fast moves pass almost
+unfiltered. A first-order low-pass delays the signal by about
+1 / (2 pi cutoff), which is the lag reported by lag(); lag_budget caps
+it by raising the minimum cutoff.
+
+The filter runs on the normalized stick values, between
+ControllerMapper.get_normalized_values() and the control math
+(ControlEngine.input_filter). filter_batch() runs the same recursion
+over a whole recording, for many parameter sets at once.
+"""
+
+import math
+
+import numpy as np
+
+from config import *
+
+
+TWO_PI = 2.0 * math.pi
+SNAP_THRESHOLD = 1e-3  # Filtered values this close to a centered stick become exactly 0
+MIN_DT = 0.001  # Shortest time step (s) - like the control loops' dt clamp; covers duplicate timestamps
+
+
+def smoothing_factor(cutoff, dt):
+    """Exponential smoothing weight for a cutoff (Hz) and time step (s)"""
+    return 1.0 / (1.0 + 1.0 / (TWO_PI * cutoff * dt))
+
+
+class OneEuroFilter:
+    """Per-axis One-Euro filter with preallocated state"""
+
+    def __init__(self, min_cutoff=DEFAULT_FILTER_MIN_CUTOFF, beta=DEFAULT_FILTER_BETA,
+                 d_cutoff=DEFAULT_FILTER_D_CUTOFF, lag_budget=DEFAULT_FILTER_LAG_BUDGET, channels=2):
+        """
+        Args:
+            min_cutoff: Cutoff for a still stick (Hz) - lower = smoother at rest
+            beta: Cutoff increase per unit of stick speed - higher = less lag when moving
+            d_cutoff: Cutoff of the speed estimate (Hz)
+            lag_budget: Largest lag the filter may add (s), None for no limit
+            channels: Number of axes
+        """
+        self.channels = channels
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.lag_budget = lag_budget
+        self._floor = min_cutoff
+        self._update_floor()
+
+        # State - allocated once, updated in place every tick
+        self.value = [0.0] * channels
+        self.speed = [0.0] * channels
+        self.cutoff = [self._floor] * channels
+        self.primed = False
+
+    def _update_floor(self):
+        """Effective minimum cutoff: min_cutoff, raised to meet the lag budget"""
+        floor = self.min_cutoff
+        if self.lag_budget:
+            floor = max(floor, 1.0 / (TWO_PI * self.lag_budget))
+        self._floor = floor
+
+    def get_parameters(self):
+        """Return dict of the tunable parameters"""
+        return {
+            "min_cutoff": self.min_cutoff,
+            "beta": self.beta,
+            "d_cutoff": self.d_cutoff,
+            "lag_budget": self.lag_budget,
+        }
+
+    def set_parameters(self, parameters):
+        """
+        Update tunable parameters (unknown keys are ignored); state is kept
+
+        Args:
+            parameters: Dict as returned by get_parameters()
+        """
+        for name in ("min_cutoff", "beta", "d_cutoff"):
+            if name in parameters:
+                setattr(self, name, float(parameters[name]))
+        if "lag_budget" in parameters:
+            budget = parameters["lag_budget"]
+            self.lag_budget = float(budget) if budget else None
+        self._update_floor()
+
+    def reset(self):
+        """Forget the history; the next sample passes through unfiltered"""
+        for i in range(self.channels):
+            self.value[i] = 0.0
+            self.speed[i] = 0.0
+            self.cutoff[i] = self._floor
+        self.primed = False
+
+    def apply(self, x, y, dt):
+        """
+        Filter one stick sample
+
+        Args:
+            x, y: Normalized stick values after the deadzone
+            dt: Time since the previous sample (s)
+
+        Returns:
+            Tuple of filtered (x, y)
+        """
+        return self._step(0, x, dt), self._step(1, y, dt)
+
+    def step(self, values, dt):
+        """
+        Filter one sample of every channel
+
+        Args:
+            values: Sequence of channel values
+            dt: Time since the previous sample (s)
+
+        Returns:
+            List of filtered values
+        """
+        return [self._step(i, value, dt) for i, value in enumerate(values)]
+
+    def _step(self, i, raw, dt):
+        """Advance one channel"""
+        if not self.primed:
+            if i == self.channels - 1:
+                self.primed = True
+            self.value[i] = raw
+            return raw
+
+        dt = max(dt, MIN_DT)
+        previous = self.value[i]
+        speed = self.speed[i]
+        speed += smoothing_factor(self.d_cutoff, dt) * ((raw - previous) / dt - speed)
+        cutoff = self._floor + self.beta * abs(speed)
+        value = previous + smoothing_factor(cutoff, dt) * (raw - previous)
+        if raw == 0.0 and abs(value) < SNAP_THRESHOLD:
+            value = 0.0  # Centered stick - settle exactly so rate mode stops drifting
+
+        self.speed[i] = speed
+        self.cutoff[i] = cutoff
+        self.value[i] = value
+        return value
+
+    def lag(self):
+        """
+        Delay the filter currently adds, per channel
+
+        Returns:
+            List of lags in seconds (1 / (2 pi cutoff) of a first-order low-pass)
+        """
+        return [1.0 / (TWO_PI * cutoff) for cutoff in self.cutoff]
+
+    def max_lag(self):
+        """Largest lag the filter can add (a still stick), in seconds"""
+        return 1.0 / (TWO_PI * self._floor)
+
+
+def filter_batch(samples, dt, min_cutoff=DEFAULT_FILTER_MIN_CUTOFF, beta=DEFAULT_FILTER_BETA,
+                 d_cutoff=DEFAULT_FILTER_D_CUTOFF, lag_budget=DEFAULT_FILTER_LAG_BUDGET):
+    """
+    Run the filter over a whole recording
+
+    The recursion is sequential in time, so the work is vectorized across
+    channels instead: every time step is a handful of numpy operations on
+    all channels at once. Parameters broadcast against the channel shape,
+    so one call can try many settings on the same input - e.g. samples of
+    shape (T, 1) with min_cutoff of shape (K,) filters K variants.
+
+    Args:
+        samples: (T, ...) array of stick values
+        dt: Scalar time step or (T,) array of steps (dt[0] is unused; steps
+            below MIN_DT, e.g. duplicate timestamps, count as MIN_DT)
+        min_cutoff, beta, d_cutoff, lag_budget: As for OneEuroFilter (scalars or arrays;
+            a lag_budget of 0 or None means no limit)
+
+    Returns:
+        Tuple of (filtered, lag) arrays of shape (T, ...broadcast channel shape);
+        lag is in seconds
+    """
+    samples = np.asarray(samples, dtype=float)
+    count = len(samples)
+    dts = np.maximum(np.broadcast_to(np.asarray(dt, dtype=float), (count,)), MIN_DT)
+    floor = np.asarray(min_cutoff, dtype=float)
+    if lag_budget is not None:
+        # A zero budget means no limit, as in OneEuroFilter
+        budget = np.asarray(lag_budget, dtype=float)
+        with np.errstate(divide='ignore'):
+            floor = np.where(budget > 0, np.maximum(floor, 1.0 / (TWO_PI * budget)), floor)
+    beta = np.asarray(beta, dtype=float)
+    shape = np.broadcast_shapes(samples.shape[1:], floor.shape, beta.shape)
+
+    filtered = np.empty((count,) + shape)
+    lag = np.empty((count,) + shape)
+    if count == 0:
+        return filtered, lag
+    value = np.broadcast_to(samples[0], shape).copy()
+    speed = np.zeros(shape)
+    cutoff = np.broadcast_to(floor, shape).copy()
+    filtered[0] = value
+    lag[0] = 1.0 / (TWO_PI * cutoff)
+    for t in range(1, count):
+        step = dts[t]
+        raw = samples[t]
+        speed += smoothing_factor(d_cutoff, step) * ((raw - value) / step - speed)
+        cutoff = floor + beta * np.abs(speed)
+        value += smoothing_factor(cutoff, step) * (raw - value)
+        value = np.where((raw == 0.0) & (np.abs(value) < SNAP_THRESHOLD), 0.0, value)
+        filtered[t] = value
+        lag[t] = 1.0 / (TWO_PI * cutoff)
+    return filtered, lag
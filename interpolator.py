@@ -0,0 +1,284 @@
+"""
+Reference model of the firmware target interpolator (protocol 3)
+
+servo_control.ino and multi_servo_control.ino accept timed targets
+(<roll,pitch@ms>\\n, {a1,...,an@ms}\\n): each frame starts a linear glide
+from wherever the servos are to the new angles, arriving ms milliseconds
+after the frame was received, and the servos are rewritten every
+SERVO_REFRESH_MS. TargetInterpolator follows the sketches step by step
+(same millis() arithmetic, same glide limit, same frame parsing via
+frame_parser.py), so host-side changes to the timed protocol can be
+checked without hardware.
+
+self_check() holds the model to the protocol (glide end points, the
+MAX_GLIDE_MS cap, jumps for frames without @ms, the largest step per
+servo refresh); running the module runs it before the comparison of
+streaming every frame against sparse timed targets, and exits with 1
+if a check fails:
+
+    python interpolator.py
+    python interpolator.py --stream-rate 50 --target-rate 5 --seconds 20
+"""
+
+import argparse
+import math
+import sys
+
+from frame_parser import parse_frame
+from output_sinks import add_arrival_time, encode_command
+
+
+SERVO_REFRESH_MS = 20  # Must match the sketches
+MAX_GLIDE_MS = 2000
+
+
+class TargetInterpolator:
+    """Mirror of the sketches' glide and refresh logic"""
+
+    def __init__(self, channels=2, refresh_ms=SERVO_REFRESH_MS, max_glide_ms=MAX_GLIDE_MS):
+        """
+        Args:
+            channels: Angles per frame (2 for roll/pitch, NUM_SERVOS otherwise)
+            refresh_ms: Servo refresh period
+            max_glide_ms: Longest glide a frame may ask for
+        """
+        self.channels = channels
+        self.refresh_ms = refresh_ms
+        self.max_glide_ms = max_glide_ms
+        self.start = [0.0] * channels
+        self.target = [0.0] * channels
+        self.now = [0.0] * channels
+        self.glide_start = 0
+        self.glide_duration = 0
+        self.last_refresh = 0
+
+    def receive(self, data, now_ms):
+        """
+        Handle one frame arriving at now_ms (a target frame starts a glide)
+
+        Args:
+            data: Frame bytes (see frame_parser.parse_frame())
+            now_ms: millis() when the frame completed
+
+        Returns:
+            True if the frame set a new target
+        """
+        line = data.rstrip(b"\r\n")
+        brackets = (b"{", b"}") if line.startswith(b"{") else (b"<", b">")
+        parsed = parse_frame(line, self.channels, *brackets)
+        if parsed is None:
+            return False
+        angles, duration = parsed
+        for i in range(self.channels):
+            self.start[i] = self.now[i]
+            self.target[i] = angles[i]
+        self.glide_start = now_ms
+        self.glide_duration = min(duration, self.max_glide_ms)
+        self.last_refresh = now_ms
+        self.refresh(now_ms)
+        return True
+
+    def refresh(self, now_ms):
+        """Move every channel to its interpolated position for now_ms"""
+        elapsed = now_ms - self.glide_start
+        if elapsed >= self.glide_duration:
+            self.now = list(self.target)
+        else:
+            fraction = elapsed / self.glide_duration
+            self.now = [start + (target - start) * fraction for start, target in zip(self.start, self.target)]
+        return self.now
+
+    def update(self, now_ms):
+        """
+        One pass of the sketch's loop() without serial input
+
+        Returns:
+            The servo positions if this pass refreshed them, else None
+        """
+        if now_ms - self.last_refresh >= self.refresh_ms:
+            self.last_refresh = now_ms
+            return self.refresh(now_ms)
+        return None
+
+
+def replay(frames, duration_ms, channels=2):
+    """
+    Feed timestamped frames through the interpolator
+
+    Args:
+        frames: (arrival ms, frame bytes) pairs in arrival order
+        duration_ms: How long to run the model for
+        channels: Angles per frame
+
+    Returns:
+        List of (ms, positions) for every servo write
+    """
+    model = TargetInterpolator(channels)
+    writes = []
+    index = 0
+    for ms in range(duration_ms + 1):
+        positions = model.update(ms)
+        if positions is not None:
+            writes.append((ms, positions))
+        while index < len(frames) and frames[index][0] <= ms:
+            model.receive(frames[index][1], ms)
+            writes.append((ms, model.now))
+            index += 1
+    return writes
+
+
+def demo_path(ms):
+    """Roll/pitch the comparison follows: slow swings plus a quick correction"""
+    t = ms / 1000.0
+    roll = 20.0 * math.sin(2 * math.pi * 0.3 * t) + 5.0 * math.sin(2 * math.pi * 1.1 * t)
+    pitch = 15.0 * math.sin(2 * math.pi * 0.2 * t)
+    return round(roll, 1), round(pitch, 1)
+
+
+def host_frames(rate, duration_ms, timed):
+    """Frames the host would send at a given rate (timed targets or jumps)"""
+    interval = 1000.0 / rate
+    frames = []
+    last = None
+    k = 0
+    while k * interval <= duration_ms:
+        ms = int(k * interval)
+        data = encode_command(*demo_path(ms))
+        if timed:
+            if data != last:
+                frames.append((ms, add_arrival_time(data, int(round(interval)))))
+            last = data
+        else:
+            frames.append((ms, data))
+        k += 1
+    return frames
+
+
+def compare(label, frames, duration_ms):
+    """Summarize one host strategy: traffic, smoothness, tracking"""
+    writes = replay(frames, duration_ms)
+    seconds = duration_ms / 1000.0
+    steps = [max(abs(b - a) for a, b in zip(prev[1], cur[1])) for prev, cur in zip(writes, writes[1:])]
+    errors = [max(abs(p - d) for p, d in zip(positions, demo_path(ms))) for ms, positions in writes]
+    rms = math.sqrt(sum(e * e for e in errors) / len(errors))
+    print(f"{label:<24}{len(frames) / seconds:>8.1f}{sum(len(f) for _, f in frames) / seconds:>9.0f}"
+          f"{max(steps):>10.2f}{rms:>10.2f}")
+
+
+def _glide_steps(model, until_ms):
+    """Largest per-refresh position change from the glide's start until until_ms"""
+    previous = list(model.start)
+    largest = 0.0
+    for ms in range(model.last_refresh + 1, until_ms + 1):
+        positions = model.update(ms)
+        if positions is not None:
+            largest = max(largest, max(abs(b - a) for a, b in zip(previous, positions)))
+            previous = list(positions)
+    return largest
+
+
+def self_check():
+    """
+    Check the model against the timed-target protocol
+
+    Returns:
+        Number of failures
+    """
+    failures = 0
+
+    def report(name, ok, detail=""):
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name}" + ("" if ok else f": {detail}"))
+
+    def close(a, b):
+        return all(abs(x - y) < 1e-9 for x, y in zip(a, b))
+
+    # A timed frame glides from the current position and arrives on time
+    model = TargetInterpolator()
+    model.receive(b"<10.0,-20.0@200>\n", 100)
+    start = list(model.now)
+    middle = model.update(200)
+    model.update(280)
+    end = model.update(300)
+    report("glide starts where the servos are", close(start, [0.0, 0.0]), start)
+    report("glide is halfway at half time", middle is not None and close(middle, [5.0, -10.0]), middle)
+    report("glide arrives at its deadline", end is not None and close(end, [10.0, -20.0]), end)
+
+    # A new target mid-glide starts from the current position, not the old target
+    model = TargetInterpolator()
+    model.receive(b"<40.0,0.0@400>\n", 0)
+    for ms in range(1, 201):
+        model.update(ms)
+    model.receive(b"<0.0,0.0@200>\n", 200)
+    report("retarget starts mid-glide", close(model.start, [20.0, 0.0]), model.start)
+
+    # Servo frames glide every channel
+    model = TargetInterpolator(channels=3)
+    model.receive(b"{30.0,-30.0,6.0@100}\n", 0)
+    for ms in range(1, 101):
+        model.update(ms)
+    report("servo frame arrives on every channel", close(model.now, [30.0, -30.0, 6.0]), model.now)
+
+    # Longer glides are cut to MAX_GLIDE_MS
+    model = TargetInterpolator()
+    model.receive(b"<90.0,0.0@60000>\n", 0)
+    step = _glide_steps(model, MAX_GLIDE_MS - model.refresh_ms)
+    before = list(model.now)
+    _glide_steps(model, MAX_GLIDE_MS)
+    report(f"glides are capped at {MAX_GLIDE_MS} ms", model.glide_duration == MAX_GLIDE_MS
+           and before[0] < 90.0 and close(model.now, [90.0, 0.0]), f"{before} -> {model.now}")
+    limit = 90.0 * model.refresh_ms / MAX_GLIDE_MS
+    report("capped glide step stays within its share", step <= limit + 1e-9, f"{step:.3f} > {limit:.3f}")
+
+    # Frames without @ms jump straight to the new angles
+    model = TargetInterpolator()
+    model.receive(b"<10.0,-20.0@500>\n", 0)
+    model.receive(b"<25.0,5.0>\n", 100)
+    report("plain frame jumps", close(model.now, [25.0, 5.0]) and model.glide_duration == 0, model.now)
+
+    # Per refresh, a glide moves at most its distance * refresh_ms / duration
+    model = TargetInterpolator()
+    model.receive(b"<40.0,-40.0@1000>\n", 0)
+    step = _glide_steps(model, 1000)
+    limit = 40.0 * model.refresh_ms / 1000
+    report("step per refresh is bounded", step <= limit + 1e-9, f"{step:.3f} > {limit:.3f}")
+
+    # Timed targets at 5 Hz move in steps a tenth of the 5 Hz jumps (200 ms / 20 ms refresh)
+    duration_ms = 5000
+    jumps = host_frames(5.0, duration_ms, False)
+    writes = replay(host_frames(5.0, duration_ms, True), duration_ms)
+    step = max(max(abs(b - a) for a, b in zip(prev[1], cur[1])) for prev, cur in zip(writes, writes[1:]))
+    largest_jump = max(max(abs(b - a) for a, b in zip(parse_frame(prev[1].rstrip(b"\n"), 2)[0],
+                                                      parse_frame(cur[1].rstrip(b"\n"), 2)[0]))
+                       for prev, cur in zip(jumps, jumps[1:]))
+    limit = largest_jump * SERVO_REFRESH_MS / 200
+    report("timed targets smooth the stream", step <= limit + 1e-9, f"{step:.3f} > {limit:.3f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streamed frames with interpolated timed targets")
+    parser.add_argument("--stream-rate", type=float, default=50.0, help="Frames/s when streaming jumps")
+    parser.add_argument("--target-rate", type=float, default=5.0, help="Timed targets/s")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    failed = self_check()
+    print()
+
+    duration_ms = int(args.seconds * 1000)
+    print(f"{'Host strategy':<24}{'frames/s':>8}{'bytes/s':>9}{'max step':>10}{'rms err':>10}")
+    compare(f"jump @ {args.stream_rate:g} Hz", host_frames(args.stream_rate, duration_ms, False), duration_ms)
+    compare(f"jump @ {args.target_rate:g} Hz", host_frames(args.target_rate, duration_ms, False), duration_ms)
+    compare(f"timed @ {args.target_rate:g} Hz", host_frames(args.target_rate, duration_ms, True), duration_ms)
+    print("\nmax step: largest change between servo writes (degrees); rms err: distance "
+          "from the commanded path (timed targets lag by one interval)")
+    if failed:
+        print(f"\n{failed} check(s) failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Inverse kinematics for multi-servo platforms
+
+The basic rig drives roll and pitch with one servo each, so the command
+angles are the servo angles. Platforms carried by several rotary servos
+(3-servo tilt tables, 6-servo Stewart platforms) need each servo angle
+computed from the platform pose instead.
+
+Every actuator is a servo horn of length `horn_length` rotating in a
+vertical plane at angle `beta` around its base point, joined to the
+platform by a rod of length `rod_length`. For a pose (roll, pitch,
+heave, yaw) the leg vector is l = T + R p - b and the horn angle is
+
+    L = |l|^2 - (rod^2 - horn^2)
+    M = 2 horn l_z
+    N = 2 horn (cos(beta) l_x + sin(beta) l_y)
+    alpha = asin(L / sqrt(M^2 + N^2)) - atan2(N, M)
+
+Everything that only depends on geometry is computed once; per frame
+only the rotation and the few array operations above remain.
+"""
+
+import math
+
+import numpy as np
+
+from output_sinks import encode_servo_frame
+
+
+class RotaryPlatform:
+    """Platform moved by rotary servos through horn-and-rod linkages"""
+
+    def __init__(self, base_points, platform_points, horn_angles, horn_length, rod_length,
+                 directions=None, servo_limit=60.0):
+        """
+        Args:
+            base_points: (n, 3) servo shaft positions in the base frame (mm)
+            platform_points: (n, 3) rod joints in the platform frame (mm)
+            horn_angles: (n,) direction of each horn's rotation plane (radians)
+            horn_length: Servo horn length (mm)
+            rod_length: Pushrod length (mm)
+            directions: (n,) +1/-1 per servo for mirrored mounting (default all +1)
+            servo_limit: Largest servo deflection from neutral (degrees)
+        """
+        self.base_points = np.asarray(base_points, dtype=float)
+        self.platform_points = np.asarray(platform_points, dtype=float)
+        self.count = len(self.base_points)
+        self.horn_length = horn_length
+        self.rod_length = rod_length
+        self.servo_limit = servo_limit
+
+        horn_angles = np.asarray(horn_angles, dtype=float)
+        self.directions = np.ones(self.count) if directions is None else np.asarray(directions, dtype=float)
+        self._cos_beta = np.cos(horn_angles)
+        self._sin_beta = np.sin(horn_angles)
+        self._two_a = 2.0 * horn_length
+        self._k = rod_length ** 2 - horn_length ** 2
+
+        # Neutral height: horns level, rods straight up to the platform joints
+        offset = self.platform_points[0] - self.base_points[0]
+        horn_x = horn_length * self._cos_beta[0]
+        horn_y = horn_length * self._sin_beta[0]
+        squared = rod_length ** 2 - (offset[0] - horn_x) ** 2 - (offset[1] - horn_y) ** 2
+        if squared <= 0:
+            raise ValueError("Rods are too short to reach the platform")
+        self.home_height = math.sqrt(squared) - offset[2]
+        self._home = np.array([0.0, 0.0, self.home_height])
+
+    def solve(self, roll, pitch, heave=0.0, yaw=0.0):
+        """
+        Servo angles for one pose
+
+        Args:
+            roll: Rotation about the X axis (degrees)
+            pitch: Rotation about the Y axis (degrees)
+            heave: Vertical offset from the neutral height (mm)
+            yaw: Rotation about the Z axis (degrees)
+
+        Returns:
+            (n,) servo angles from neutral in degrees; NaN where the pose is
+            out of reach
+        """
+        cr, sr = math.cos(math.radians(roll)), math.sin(math.radians(roll))
+        cp, sp = math.cos(math.radians(pitch)), math.sin(math.radians(pitch))
+        cy, sy = math.cos(math.radians(yaw)), math.sin(math.radians(yaw))
+        # R = Rz(yaw) @ Ry(pitch) @ Rx(roll)
+        rotation = np.array([
+            [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+            [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+            [-sp, cp * sr, cp * cr],
+        ])
+        legs = self.platform_points @ rotation.T - self.base_points
+        legs[:, 2] += self.home_height + heave
+        return self._horn_angles(legs)
+
+    def solve_batch(self, roll, pitch, heave=None, yaw=None):
+        """
+        Servo angles for a whole trajectory
+
+        Args:
+            roll, pitch: (m,) angles in degrees
+            heave: Optional (m,) vertical offsets (mm)
+            yaw: Optional (m,) angles in degrees
+
+        Returns:
+            (m, n) servo angles in degrees, NaN where out of reach
+        """
+        roll = np.radians(np.asarray(roll, dtype=float))
+        pitch = np.radians(np.asarray(pitch, dtype=float))
+        yaw = np.zeros_like(roll) if yaw is None else np.radians(np.asarray(yaw, dtype=float))
+        cr, sr = np.cos(roll), np.sin(roll)
+        cp, sp = np.cos(pitch), np.sin(pitch)
+        cy, sy = np.cos(yaw), np.sin(yaw)
+
+        rotation = np.empty((len(roll), 3, 3))
+        rotation[:, 0, 0] = cy * cp
+        rotation[:, 0, 1] = cy * sp * sr - sy * cr
+        rotation[:, 0, 2] = cy * sp * cr + sy * sr
+        rotation[:, 1, 0] = sy * cp
+        rotation[:, 1, 1] = sy * sp * sr + cy * cr
+        rotation[:, 1, 2] = sy * sp * cr - cy * sr
+        rotation[:, 2, 0] = -sp
+        rotation[:, 2, 1] = cp * sr
+        rotation[:, 2, 2] = cp * cr
+
+        legs = np.einsum('mij,nj->mni', rotation, self.platform_points) - self.base_points
+        legs[:, :, 2] += self.home_height
+        if heave is not None:
+            legs[:, :, 2] += np.asarray(heave, dtype=float)[:, None]
+        return self._horn_angles(legs)
+
+    def _horn_angles(self, legs):
+        """Horn angle formula on (..., n, 3) leg vectors"""
+        lx, ly, lz = legs[..., 0], legs[..., 1], legs[..., 2]
+        big_l = lx * lx + ly * ly + lz * lz - self._k
+        big_m = self._two_a * lz
+        big_n = self._two_a * (self._cos_beta * lx + self._sin_beta * ly)
+        with np.errstate(invalid='ignore'):
+            alpha = np.arcsin(big_l / np.hypot(big_m, big_n)) - np.arctan2(big_n, big_m)
+        return np.degrees(alpha) * self.directions
+
+    def validate(self, roll, pitch, heave=None, yaw=None):
+        """
+        Check a trajectory against reach and servo limits
+
+        Returns:
+            Tuple of (angles, ok) - (m, n) servo angles and an (m,) bool
+            array that is True where every servo is reachable and in range
+        """
+        angles = self.solve_batch(roll, pitch, heave, yaw)
+        ok = np.all(np.isfinite(angles) & (np.abs(angles) <= self.servo_limit), axis=1)
+        return angles, ok
+
+
+def three_servo_platform(base_radius=60.0, platform_radius=60.0, horn_length=20.0, rod_length=80.0,
+                         servo_limit=60.0):
+    """
+    Three servos 120 degrees apart with horns pointing outward
+
+    Returns:
+        RotaryPlatform
+    """
+    angles = np.radians([90.0, 210.0, 330.0])
+    ring = np.stack([np.cos(angles), np.sin(angles), np.zeros(3)], axis=1)
+    return RotaryPlatform(ring * base_radius, ring * platform_radius, angles,
+                          horn_length, rod_length, servo_limit=servo_limit)
+
+
+def stewart_platform(base_radius=70.0, platform_radius=50.0, base_spread=30.0, platform_spread=100.0,
+                     horn_length=20.0, rod_length=120.0, servo_limit=60.0):
+    """
+    Six-servo Stewart platform: servos in three pairs, horns pointing away
+    from each pair's center, every other servo mounted mirrored
+
+    Args:
+        base_spread: Angle between the two servos of a pair (degrees)
+        platform_spread: Angle between the two joints a pair drives (degrees)
+
+    Returns:
+        RotaryPlatform
+    """
+    centers = np.repeat(np.radians([90.0, 210.0, 330.0]), 2)
+    side = np.tile([-1.0, 1.0], 3)
+    base_angles = centers + side * math.radians(base_spread) / 2
+    platform_angles = centers + side * math.radians(platform_spread) / 2
+
+    def ring(angles, radius):
+        return np.stack([np.cos(angles), np.sin(angles), np.zeros(len(angles))], axis=1) * radius
+
+    horn_angles = base_angles + side * math.pi / 2
+    return RotaryPlatform(ring(base_angles, base_radius), ring(platform_angles, platform_radius),
+                          horn_angles, horn_length, rod_length, directions=side, servo_limit=servo_limit)
+
+
+PLATFORMS = {
+    "3servo": three_servo_platform,
+    "stewart": stewart_platform,
+}
+
+
+class KinematicOutput:
+    """
+    Converts roll/pitch commands into servo frames for an output
+
+    Wraps a FanOut (or a single sink) so the rest of the app keeps sending
+    roll/pitch. Poses out of reach repeat the last good frame.
+    """
+
+    def __init__(self, output, platform):
+        """
+        Args:
+            output: FanOut or OutputSink that receives the servo frames
+            platform: RotaryPlatform
+        """
+        self.output = output
+        self.platform = platform
+        self.last_angles = np.zeros(platform.count)
+        self.unreachable = 0  # Commands that fell back to the last good frame
+
+    def send_command(self, roll, pitch):
+        """
+        Solve the pose and send one servo frame
+
+        Returns:
+            True if the output accepted the frame
+        """
+        angles = self.platform.solve(roll, pitch)
+        if np.isfinite(angles).all():
+            limit = self.platform.servo_limit
+            self.last_angles = np.clip(angles, -limit, limit)
+        else:
+            self.unreachable += 1
+        return self.output.write(encode_servo_frame(self.last_angles))
+
+    def write(self, data):
+        """Pass an already-encoded frame through"""
+        return self.output.write(data)
+
+    def close(self):
+        self.output.close()
@@ -1,19 +1,72 @@
 """
 Xbox Controller to Arduino Platform Mapper
 Main application entry point
+
+Startup only imports what every run needs: Tk and the GUI, telemetry,
+metrics, kinematics and calibration are imported when they are used,
+and controller and port discovery run on background threads. Run
+startup_benchmark.py to check the time to the first control tick.
 """
 
-import tkinter as tk
+import time
+
+LAUNCH_TIME = time.perf_counter()  # Taken before the other imports so they are counted
+
+import argparse
 import threading
 import sys
 from controller_mapper import ControllerMapper
 from serial_output import SerialOutput
-from platform_gui import PlatformGUI
+from output_sinks import BinaryLogSink, FanOut, TcpSink, UdpSink
+from profiling import StartupTimer
 from config import *
 
 
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Xbox Controller to Arduino Platform Mapper")
+    parser.add_argument("--profile", help="Settings profile to load at startup (e.g. from autotune.py)")
+    parser.add_argument("--udp", action="append", default=[], metavar="HOST:PORT",
+                        help="Also send commands as UDP datagrams (repeatable)")
+    parser.add_argument("--tcp", action="append", default=[], metavar="HOST:PORT",
+                        help="Also send commands over TCP (repeatable)")
+    parser.add_argument("--auto-connect", action="store_true",
+                        help="Probe serial ports for platform firmware and connect at startup")
+    parser.add_argument("--platform", choices=["tilt", "3servo", "stewart"], default="tilt",
+                        help="Rig type: tilt sends roll/pitch, 3servo/stewart send per-servo angles")
+    parser.add_argument("--calibration", metavar="PATH",
+                        help="Correct servo linkage nonlinearity with a calibration.json (tilt rigs only)")
+    parser.add_argument("--target-rate", type=float, default=SERIAL_TARGET_RATE, metavar="HZ",
+                        help="Send timed targets at HZ to firmware that interpolates (protocol 3)")
+    parser.add_argument("--log", metavar="PATH", help="Append every command frame to a binary log")
+    parser.add_argument("--telemetry", metavar="DIR", help="Record every control tick to telemetry files in DIR")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--split-gui", action="store_true",
+                        help="Run the GUI as a separate viewer process so redraws never delay control")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print how long each startup phase took, up to the first control tick")
+    parser.add_argument("--startup-exit", action="store_true",
+                        help="Exit right after the first control tick (used by startup_benchmark.py)")
+    args = parser.parse_args()
+    if args.calibration and args.platform != "tilt":
+        parser.error("--calibration applies to tilt rigs; kinematics already model multi-servo linkages")
+    return args
+
+
+def parse_address(text):
+    """Split HOST:PORT into a (host, port) tuple"""
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
 def main():
     """Main application entry point"""
+    args = parse_args()
+    startup = StartupTimer(LAUNCH_TIME, report=args.startup_report or args.startup_exit,
+                           exit_after=args.startup_exit)
+    startup.mark("imports")
+
     print("Xbox Controller to Arduino Platform Mapper")
     print("=" * 50)
     print("Initializing...")
@@ -33,18 +86,79 @@ def main():
         )
         controller_thread.start()
         print("Controller thread started")
+        startup.mark("controller")
 
         # Initialize serial output
         print("Setting up serial communication...")
-        serial_output = SerialOutput(baudrate=SERIAL_BAUDRATE)
+        serial_output = SerialOutput(baudrate=SERIAL_BAUDRATE, max_baudrate=SERIAL_MAX_BAUDRATE,
+                                     target_rate=args.target_rate)
+        serial_sink = serial_output
+        if args.calibration:
+            # Only the servos get corrected angles; mirrors and logs keep roll/pitch
+            from calibration import CalibratedOutput, load_calibration
+            serial_sink = CalibratedOutput(serial_output, load_calibration(args.calibration))
+            print(f"Applying linkage calibration from {args.calibration}")
+        output = FanOut([serial_sink])
+        for address in args.udp:
+            output.add_sink(UdpSink(*parse_address(address)))
+            print(f"Mirroring commands to UDP {address}")
+        for address in args.tcp:
+            output.add_sink(TcpSink(*parse_address(address)))
+            print(f"Mirroring commands to TCP {address}")
+        if args.log:
+            output.add_sink(BinaryLogSink(args.log))
+            print(f"Logging commands to {args.log}")
+        if args.platform != "tilt":
+            from kinematics import PLATFORMS, KinematicOutput
+            output = KinematicOutput(output, PLATFORMS[args.platform]())
+            print(f"Sending per-servo frames for a {args.platform} platform")
         print("Serial interface ready")
+        startup.mark("outputs")
+
+        telemetry = None
+        if args.telemetry:
+            from telemetry import TelemetryRecorder
+            telemetry = TelemetryRecorder(args.telemetry)
+            telemetry.start()
+            print(f"Recording telemetry to {args.telemetry}")
+
+        metrics = None
+        if args.metrics_port:
+            from metrics import Metrics, MetricsServer
+            metrics = Metrics(CONTROL_LOOP_RATE if args.split_gui else GUI_UPDATE_RATE)
+            controller.metrics = metrics.controller
+            serial_output.metrics = metrics.serial
+            metrics_server = MetricsServer(metrics, args.metrics_port)
+            metrics_server.start()
+            print(f"Metrics at http://127.0.0.1:{args.metrics_port}/metrics")
+
+        if args.split_gui:
+            from control_process import run_split
+            startup.mark("split imports")
+            if not startup.exit_after:
+                print("Starting GUI viewer process...")
+                print("Ready! Close the window or press Ctrl+C to exit\n")
+            run_split(controller, serial_output, output, telemetry, metrics, args.profile, args.auto_connect,
+                      startup)
+            controller.stop()
+            return
 
         # Create GUI
         print("Creating GUI...")
+        import tkinter as tk
+        from platform_gui import PlatformGUI
+        startup.mark("gui imports")
         root = tk.Tk()
+        startup.mark("tk")
+        gui = PlatformGUI(root, controller, serial_output, output, telemetry, metrics, startup=startup)
+
+        if args.profile:
+            from profiles import load_profile
+            gui.apply_profile(load_profile(args.profile))
+            print(f"Loaded profile {args.profile}")
 
-        # Initialize GUI with controller and serial
-        gui = PlatformGUI(root, controller, serial_output)
+        if args.auto_connect:
+            gui.start_auto_detect()
 
         # Setup cleanup on window close
         def on_closing():
@@ -55,6 +169,10 @@ def main():
 
         root.protocol("WM_DELETE_WINDOW", on_closing)
 
+        if startup.exit_after:
+            on_closing()  # The first tick ran inside PlatformGUI()
+            return
+
         print("Ready!")
         print("\nGUI Controls:")
         print("- Use right stick on Xbox controller")
@@ -0,0 +1,254 @@
+"""
+Stand-in marble position publisher for auto balance mode
+
+Feeds balance.PositionFeed without a camera. By default it simulates a
+marble on the plate: the app mirrors its commands to this script over
+UDP (main.py --udp), the simulated servos follow them, and the marble
+rolls under gravity. With --replay it sends recorded positions instead.
+Jitter and loss can be added to check the late and out-of-order
+handling.
+
+    python main.py --udp 127.0.0.1:5006            # app: mirror commands here
+    python marble_feed.py                           # simulate, publish at 50 Hz
+    python marble_feed.py --jitter 40 --loss 0.05   # bad network
+    python marble_feed.py --replay positions.csv    # CSV with t,x,y (s, plate units)
+"""
+
+import argparse
+import csv
+import heapq
+import math
+import random
+import socket
+import sys
+import time
+
+from config import *
+from autotune import ServoPlant
+from balance import encode_position
+from frame_parser import parse_frame
+from scheduler import FrameScheduler
+
+
+COMMAND_PORT = 5006  # Where the app mirrors its command frames (--udp)
+MARBLE_ACCELERATION = 7.0  # m/s^2 per unit of sin(tilt) - a rolling ball gets 5/7 g
+
+
+class MarbleSimulator:
+    """A ball rolling on a tilting plate driven by servo models"""
+
+    def __init__(self, half_width=0.15, friction=0.5, restitution=0.3, start=(0.6, -0.4)):
+        """
+        Args:
+            half_width: Plate center-to-edge distance in meters (1 position unit)
+            friction: Velocity damping in 1/s
+            restitution: Share of speed kept when bouncing off an edge
+            start: Initial position in plate units
+        """
+        self.half_width = half_width
+        self.friction = friction
+        self.restitution = restitution
+        self.position = list(start)
+        self.velocity = [0.0, 0.0]
+        self.plants = [ServoPlant(), ServoPlant()]
+
+    def step(self, roll, pitch, dt):
+        """
+        Advance the servos towards (roll, pitch) and roll the marble
+
+        Returns:
+            Tuple of the marble (x, y) in plate units
+        """
+        for i, command in enumerate((roll, pitch)):
+            angle = self.plants[i].step(command, dt)
+            # Positive tilt (times the axis sign) rolls the marble towards -x / -y
+            acceleration = (-BALANCE_AXIS_SIGNS[i] * MARBLE_ACCELERATION * math.sin(math.radians(angle))
+                            / self.half_width - self.friction * self.velocity[i])
+            self.velocity[i] += acceleration * dt
+            self.position[i] += self.velocity[i] * dt
+            if abs(self.position[i]) > 1.0:
+                self.position[i] = math.copysign(1.0, self.position[i])
+                self.velocity[i] = -self.velocity[i] * self.restitution
+        return self.position[0], self.position[1]
+
+    def push(self, rng, strength=1.0):
+        """Give the marble a random shove (plate units per second)"""
+        for i in range(2):
+            self.velocity[i] += rng.uniform(-strength, strength)
+
+
+def load_positions(path):
+    """
+    Load a position recording
+
+    Args:
+        path: CSV file with a header row including t, x and y
+
+    Returns:
+        List of (t, x, y) tuples
+
+    Raises:
+        ValueError: If a column is missing
+    """
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [name for name in ("t", "x", "y") if name not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+        return [(float(row["t"]), float(row["x"]), float(row["y"])) for row in reader]
+
+
+class Publisher:
+    """Sends position datagrams, optionally delayed, reordered or lost"""
+
+    def __init__(self, address, jitter=0.0, loss=0.0, seed=0):
+        """
+        Args:
+            address: (host, port) of the position feed
+            jitter: Largest random extra delay per datagram in seconds
+            loss: Probability of dropping a datagram
+            seed: Random seed for the jitter and loss
+        """
+        self.address = address
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.pending = []  # Heap of (send time, sequence, datagram)
+        self.sequence = 0
+        self.sent = 0
+        self.lost = 0
+
+    def publish(self, x, y):
+        """Stamp and queue one position, then send everything that is due"""
+        self.sequence += 1
+        now = time.time()
+        data = encode_position(self.sequence, now, x, y)
+        if self.rng.random() < self.loss:
+            self.lost += 1
+        else:
+            heapq.heappush(self.pending, (now + self.rng.uniform(0.0, self.jitter), self.sequence, data))
+        self.flush(now)
+
+    def flush(self, now):
+        """Send the datagrams whose delay has passed"""
+        while self.pending and self.pending[0][0] <= now:
+            data = heapq.heappop(self.pending)[2]
+            try:
+                self.sock.sendto(data, self.address)
+                self.sent += 1
+            except OSError:
+                self.lost += 1
+
+    def close(self):
+        self.sock.close()
+
+
+def run_simulation(publisher, rate, command_port, push_interval, seed):
+    """Simulate the marble on the tilt the app mirrors to command_port"""
+    commands = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    commands.bind(("127.0.0.1", command_port))
+    commands.setblocking(False)
+    simulator = MarbleSimulator()
+    rng = random.Random(seed)
+    scheduler = FrameScheduler(rate)
+    roll = pitch = 0.0
+    last = time.perf_counter()
+    next_push = last + push_interval if push_interval else None
+    next_report = last + 1.0
+    frames = 0
+    print(f"Simulating a marble at {rate:g} Hz - listening for commands on UDP {command_port} "
+          f"(run main.py --udp 127.0.0.1:{command_port})")
+    try:
+        while True:
+            now = time.perf_counter()
+            scheduler.start_frame(now)
+            dt = now - last
+            last = now
+            while True:
+                try:
+                    data = commands.recv(256)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    break
+                parsed = parse_frame(data.rstrip(b"\r\n"), 2)
+                if parsed is not None:
+                    roll, pitch = parsed[0]
+                    frames += 1
+            if next_push is not None and now >= next_push:
+                simulator.push(rng)
+                next_push = now + push_interval
+            x, y = simulator.step(roll, pitch, dt)
+            publisher.publish(x, y)
+            if now >= next_report:
+                print(f"\rMarble ({x:+.2f}, {y:+.2f})  tilt ({roll:+.1f}, {pitch:+.1f})  "
+                      f"commands {frames}/s  sent {publisher.sent}  lost {publisher.lost}   ", end="")
+                frames = 0
+                next_report = now + 1.0
+            time.sleep(scheduler.next_delay() / 1000.0)
+    finally:
+        commands.close()
+
+
+def run_replay(publisher, positions, loop):
+    """Send recorded positions on their timestamps"""
+    if not positions:
+        return
+    start_time = positions[0][0]
+    duration = positions[-1][0] - start_time
+    print(f"Replaying {len(positions)} positions ({duration:.1f} s{', looping' if loop else ''})")
+    epoch = time.perf_counter()
+    while True:
+        for t, x, y in positions:
+            delay = epoch + (t - start_time) - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            publisher.publish(x, y)
+        if not loop:
+            break
+        epoch += duration + (duration / max(1, len(positions) - 1))
+    # Let delayed datagrams go out
+    while publisher.pending:
+        time.sleep(0.005)
+        publisher.flush(time.time())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish marble positions for auto balance mode")
+    parser.add_argument("--host", default=BALANCE_FEED_HOST, help="Position feed host")
+    parser.add_argument("--port", type=int, default=BALANCE_FEED_PORT, help="Position feed UDP port")
+    parser.add_argument("--rate", type=float, default=50.0, help="Positions per second (simulation)")
+    parser.add_argument("--command-port", type=int, default=COMMAND_PORT,
+                        help="UDP port the app mirrors commands to (simulation)")
+    parser.add_argument("--push", type=float, default=5.0, metavar="SECONDS",
+                        help="Shove the simulated marble this often (0 = never)")
+    parser.add_argument("--replay", metavar="PATH", help="Send recorded positions (CSV with t,x,y) instead")
+    parser.add_argument("--loop", action="store_true", help="Repeat the replay until Ctrl+C")
+    parser.add_argument("--jitter", type=float, default=0.0, metavar="MS",
+                        help="Random extra delay per datagram, up to MS (reorders and makes some late)")
+    parser.add_argument("--loss", type=float, default=0.0, help="Probability of dropping a datagram")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    publisher = Publisher((args.host, args.port), jitter=args.jitter / 1000.0, loss=args.loss, seed=args.seed)
+    try:
+        if args.replay:
+            try:
+                positions = load_positions(args.replay)
+            except (OSError, ValueError) as e:
+                print(f"Cannot load positions: {e}")
+                return 1
+            run_replay(publisher, positions, args.loop)
+        else:
+            run_simulation(publisher, args.rate, args.command_port, args.push, args.seed)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+    print(f"\nSent {publisher.sent} positions, dropped {publisher.lost}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
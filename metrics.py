@@ -0,0 +1,231 @@
+"""
+Metrics - loop, serial and controller health in Prometheus text format
+
+Each stats object has a single writer thread: LoopStats is updated by
+the control loop, SerialStats by whichever thread writes to the port,
+ControllerStats by the controller reader. Writers only assign plain
+attributes, and the HTTP server thread reads them without taking a
+lock, so a scrape can never stall the control path.
+
+Enable with `python main.py --metrics-port 9108`, then:
+
+    curl http://127.0.0.1:9108/metrics
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LoopStats:
+    """Control loop rate, period jitter and overruns"""
+
+    def __init__(self, target_rate, smoothing=0.1):
+        """
+        Args:
+            target_rate: Intended loop rate in Hz
+            smoothing: Weight of the newest sample in the moving averages
+        """
+        self.target_period = 1.0 / target_rate
+        self.smoothing = smoothing
+        self.ticks = 0
+        self.overruns = 0
+        self.period = self.target_period  # Smoothed tick period (s)
+        self.jitter = 0.0  # Smoothed |period - target| (s)
+        self.max_jitter = 0.0
+        self.work_time = 0.0  # Smoothed time spent inside the tick (s)
+        self._last_tick = None
+
+    def tick(self, now):
+        """Record the start of a tick (perf_counter seconds)"""
+        last = self._last_tick
+        self._last_tick = now
+        self.ticks += 1
+        if last is None:
+            return
+        period = now - last
+        deviation = abs(period - self.target_period)
+        a = self.smoothing
+        self.period += a * (period - self.period)
+        self.jitter += a * (deviation - self.jitter)
+        if deviation > self.max_jitter:
+            self.max_jitter = deviation
+
+    def work_done(self, elapsed):
+        """Record how long the tick's work took (seconds)"""
+        self.work_time += self.smoothing * (elapsed - self.work_time)
+        if elapsed > self.target_period:
+            self.overruns += 1
+
+
+class SerialStats:
+    """Serial throughput, write latency and connection events"""
+
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.bytes_sent = 0
+        self.writes = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.write_latency = 0.0  # Smoothed seconds per write
+        self.baudrate = 0  # Negotiated line rate
+        self.utilization = 0.0  # Fraction of the line rate in use
+        self.max_write_latency = 0.0
+
+    def record_write(self, nbytes, latency):
+        self.bytes_sent += nbytes
+        self.writes += 1
+        self.write_latency += self.smoothing * (latency - self.write_latency)
+        if latency > self.max_write_latency:
+            self.max_write_latency = latency
+
+
+class ControllerStats:
+    """Controller event counts and reader supervision"""
+
+    def __init__(self):
+        self.events = 0
+        self.restarts = 0
+        self.connected = False
+        self.reconnect_latency = 0.0  # Last fault-to-first-event time (s)
+
+
+class Metrics:
+    """All stats exposed by the metrics endpoint"""
+
+    def __init__(self, loop_rate):
+        self.loop = LoopStats(loop_rate)
+        self.serial = SerialStats()
+        self.controller = ControllerStats()
+        self.roll = 0.0
+        self.pitch = 0.0
+        self.input_filter_lag = 0.0  # Lag added by the stick filter (s)
+        self.started = time.time()
+
+
+class _RateTracker:
+    """Turns counters into per-second rates between scrapes"""
+
+    def __init__(self):
+        self._last = {}
+        self._lock = threading.Lock()  # Scrapes may arrive concurrently
+
+    def rate(self, name, value, now):
+        with self._lock:
+            last = self._last.get(name)
+            self._last[name] = (now, value)
+        if last is None or now <= last[0]:
+            return 0.0
+        return (value - last[1]) / (now - last[0])
+
+
+def render_metrics(metrics, rates, now=None):
+    """
+    Render metrics in Prometheus text exposition format
+
+    Args:
+        metrics: Metrics instance
+        rates: _RateTracker used for per-second rates
+        now: Current monotonic time (defaults to time.monotonic())
+
+    Returns:
+        Text body for the /metrics endpoint
+    """
+    now = time.monotonic() if now is None else now
+    loop = metrics.loop
+    serial = metrics.serial
+    controller = metrics.controller
+
+    samples = [
+        ("platform_loop_rate_hz", "gauge", "Control loop ticks per second",
+         1.0 / loop.period if loop.period > 0 else 0.0),
+        ("platform_loop_period_jitter_seconds", "gauge", "Smoothed deviation of tick period from target",
+         loop.jitter),
+        ("platform_loop_period_jitter_max_seconds", "gauge", "Largest tick period deviation", loop.max_jitter),
+        ("platform_loop_work_seconds", "gauge", "Smoothed time spent inside a tick", loop.work_time),
+        ("platform_loop_ticks_total", "counter", "Control loop ticks", loop.ticks),
+        ("platform_loop_overruns_total", "counter", "Ticks whose work exceeded the frame budget",
+         loop.overruns),
+        ("platform_serial_bytes_total", "counter", "Bytes written to the serial port", serial.bytes_sent),
+        ("platform_serial_bytes_per_second", "gauge", "Serial throughput since the last scrape",
+         rates.rate("serial_bytes", serial.bytes_sent, now)),
+        ("platform_serial_writes_total", "counter", "Serial writes", serial.writes),
+        ("platform_serial_errors_total", "counter", "Serial write errors", serial.errors),
+        ("platform_serial_write_latency_seconds", "gauge", "Smoothed serial write latency",
+         serial.write_latency),
+        ("platform_serial_write_latency_max_seconds", "gauge", "Largest serial write latency",
+         serial.max_write_latency),
+        ("platform_serial_reconnects_total", "counter", "Serial (re)connections", serial.reconnects),
+        ("platform_serial_baud", "gauge", "Negotiated serial baud rate", serial.baudrate),
+        ("platform_serial_link_utilization_ratio", "gauge", "Fraction of the serial line rate in use",
+         serial.utilization),
+        ("platform_controller_events_total", "counter", "Controller input events", controller.events),
+        ("platform_controller_events_per_second", "gauge", "Controller events since the last scrape",
+         rates.rate("controller_events", controller.events, now)),
+        ("platform_controller_restarts_total", "counter", "Controller reader restarts", controller.restarts),
+        ("platform_controller_connected", "gauge", "1 while controller input is live",
+         1 if controller.connected else 0),
+        ("platform_controller_reconnect_latency_seconds", "gauge", "Last controller fault-to-recovery time",
+         controller.reconnect_latency),
+        ("platform_input_filter_lag_seconds", "gauge", "Lag the stick filter currently adds (0 when off)",
+         metrics.input_filter_lag),
+        ("platform_roll_degrees", "gauge", "Current commanded roll", metrics.roll),
+        ("platform_pitch_degrees", "gauge", "Current commanded pitch", metrics.pitch),
+        ("platform_uptime_seconds", "gauge", "Seconds since start", time.time() - metrics.started),
+    ]
+
+    lines = []
+    for name, kind, help_text, value in samples:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves /metrics from a background thread"""
+
+    def __init__(self, metrics, port=9108, host="127.0.0.1"):
+        """
+        Args:
+            metrics: Metrics instance to expose
+            port: TCP port
+            host: Bind address (localhost only by default)
+        """
+        self.metrics = metrics
+        self.address = (host, port)
+        self.rates = _RateTracker()
+        self.httpd = None
+        self._thread = None
+
+    def start(self):
+        """Bind the port and start serving in a daemon thread"""
+        metrics = self.metrics
+        rates = self.rates
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_metrics(metrics, rates).encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep the console quiet
+
+        self.httpd = ThreadingHTTPServer(self.address, Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving"""
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
@@ -0,0 +1,424 @@
+"""
+Output sinks - destinations for roll/pitch command frames
+
+Every sink accepts already-encoded frames through write(). FanOut
+encodes each command once and hands the same bytes object to every
+sink, so adding a UDP mirror or a log never reformats the command.
+
+Sinks:
+    SerialOutput   - Arduino over pyserial (serial_output.py)
+    UdpSink        - Datagrams to a Wi-Fi microcontroller
+    TcpSink        - Stream socket to a Wi-Fi microcontroller
+    BinaryLogSink  - Timestamped frames appended to a file
+    MemorySink     - Frames kept in memory (testing, live inspection)
+
+Check the network sinks over loopback:
+
+    python output_sinks.py
+"""
+
+import collections
+import errno
+import os
+import select
+import socket
+import struct
+import sys
+import time
+
+
+# connect_ex() results that mean "in progress" (10035 is WSAEWOULDBLOCK on Windows)
+CONNECT_PENDING = (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035)
+
+
+def encode_command(roll, pitch):
+    """
+    Encode a roll/pitch command frame
+
+    Format: <roll,pitch>\\n
+    Example: <12.5,-8.3>\\n
+    """
+    return f"<{roll:.1f},{pitch:.1f}>\n".encode('utf-8')
+
+
+def encode_servo_frame(angles):
+    """
+    Encode a multi-servo frame (see kinematics.py)
+
+    Format: {a1,a2,...,an}\n - servo angles from neutral in degrees
+    Example: {12.5,-8.3,4.0}\n
+    """
+    return ("{" + ",".join(f"{angle:.1f}" for angle in angles) + "}\n").encode('utf-8')
+
+
+def add_arrival_time(data, arrival_ms):
+    """
+    Turn a frame into a timed target for interpolating firmware (protocol 3)
+
+    The sketch glides from wherever the servos are to the frame's angles,
+    arriving arrival_ms after it receives the frame.
+
+    Format: <roll,pitch@ms>\n or {a1,...,an@ms}\n
+    Example: <12.5,-8.3@100>\n
+    """
+    return data[:-2] + b"@%d" % arrival_ms + data[-2:]
+
+
+class OutputSink:
+    """Base class for command frame destinations"""
+
+    name = "sink"
+
+    def write(self, data):
+        """
+        Write one encoded frame
+
+        Args:
+            data: Frame bytes from encode_command()
+
+        Returns:
+            True if the frame was handed off, False otherwise
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the sink's resources"""
+        pass
+
+
+class UdpSink(OutputSink):
+    """Sends each frame as one UDP datagram"""
+
+    name = "udp"
+
+    def __init__(self, host, port):
+        """
+        Args:
+            host: Destination host name or IP
+            port: Destination UDP port
+        """
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def write(self, data):
+        try:
+            self.sock.sendto(data, self.address)
+            return True
+        except OSError:
+            # Buffer full or host unreachable - drop this frame, the next one supersedes it
+            return False
+
+    def close(self):
+        self.sock.close()
+
+
+class TcpSink(OutputSink):
+    """
+    Sends frames over a TCP connection without ever blocking the caller
+
+    Connecting is non-blocking: write() starts a connect and checks on it
+    at later writes, dropping frames until it completes (and retrying
+    every retry_interval after a failure). A frame the socket only
+    partly accepts keeps its unsent tail, which goes out before anything
+    else; while a tail is pending new frames are dropped, so the stream
+    never carries a truncated frame.
+    """
+
+    name = "tcp"
+
+    def __init__(self, host, port, connect_timeout=0.5):
+        """
+        Args:
+            host: Destination host name or IP (resolved here, not on the control thread)
+            port: Destination TCP port
+            connect_timeout: Seconds a connect may stay pending before it is retried
+        """
+        self.address = (host, port)
+        try:
+            self.resolved = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_STREAM)[0][4]
+        except OSError as e:
+            print(f"TCP sink: cannot resolve {host}: {e}")
+            self.resolved = self.address
+        self.connect_timeout = connect_timeout
+        self.sock = None
+        self.connected = False
+        self.connect_started = 0.0
+        self.pending = b""  # Unsent tail of the last frame
+        self.retry_interval = 1.0
+        self.next_retry = 0.0
+
+    def _connect(self):
+        """Start or check on a non-blocking connect; True once connected"""
+        now = time.monotonic()
+        if self.sock is None:
+            if now < self.next_retry:
+                return False
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            error = sock.connect_ex(self.resolved)
+            if error not in CONNECT_PENDING:
+                sock.close()
+                self._connect_failed(now, os.strerror(error))
+                return False
+            self.sock = sock
+            self.connect_started = now
+
+        _, writable, failed = select.select([], [self.sock], [self.sock], 0)
+        if writable or failed:
+            error = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error or failed:
+                self.close()
+                self._connect_failed(now, os.strerror(error) if error else "connection refused")
+                return False
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connected = True
+            return True
+        if now - self.connect_started > self.connect_timeout:
+            self.close()
+            self._connect_failed(now, "timed out")
+        return False
+
+    def _connect_failed(self, now, reason):
+        print(f"TCP sink: failed to connect to {self.address[0]}:{self.address[1]}: {reason}")
+        self.next_retry = now + self.retry_interval
+
+    def write(self, data):
+        if not self.connected and not self._connect():
+            return False
+        try:
+            if self.pending:
+                sent = self.sock.send(self.pending)
+                self.pending = self.pending[sent:]
+                if self.pending:
+                    return False  # Still finishing the previous frame - drop this one
+            sent = self.sock.send(data)
+            if sent < len(data):
+                self.pending = data[sent:]  # Sent with the next write
+            return True
+        except BlockingIOError:
+            # Peer not keeping up - drop the frame rather than block
+            return False
+        except OSError as e:
+            print(f"TCP sink error: {e}")
+            self.close()
+            return False
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        self.connected = False
+        self.pending = b""
+
+
+class BinaryLogSink(OutputSink):
+    """
+    Appends frames to a binary log file
+
+    Each record is a little-endian header (float64 timestamp, uint16
+    frame length) followed by the frame bytes. Use read_binary_log() to
+    read it back.
+    """
+
+    name = "log"
+    HEADER = struct.Struct('<dH')
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'ab')
+
+    def write(self, data):
+        self.file.write(self.HEADER.pack(time.time(), len(data)))
+        self.file.write(data)
+        return True
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_binary_log(path):
+    """
+    Read frames from a BinaryLogSink file
+
+    Yields:
+        Tuples of (timestamp, frame bytes)
+    """
+    header = BinaryLogSink.HEADER
+    with open(path, 'rb') as f:
+        while True:
+            raw = f.read(header.size)
+            if len(raw) < header.size:
+                return
+            timestamp, length = header.unpack(raw)
+            yield timestamp, f.read(length)
+
+
+class MemorySink(OutputSink):
+    """Keeps the most recent frames in memory"""
+
+    name = "memory"
+
+    def __init__(self, maxlen=1000):
+        """
+        Args:
+            maxlen: Number of frames to keep (None = unbounded)
+        """
+        self.frames = collections.deque(maxlen=maxlen)
+
+    def write(self, data):
+        self.frames.append((time.time(), data))
+        return True
+
+    def clear(self):
+        self.frames.clear()
+
+
+class FanOut:
+    """Encodes each command once and writes it to every sink"""
+
+    def __init__(self, sinks=None):
+        self.sinks = list(sinks or [])
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def send_command(self, roll, pitch):
+        """
+        Send a roll/pitch command to every sink
+
+        Returns:
+            True if at least one sink accepted the frame
+        """
+        return self.write(encode_command(roll, pitch))
+
+    def write(self, data):
+        """Write an encoded frame to every sink"""
+        sent = False
+        for sink in self.sinks:
+            if sink.write(data):
+                sent = True
+        return sent
+
+    def close(self):
+        """Close every sink"""
+        for sink in self.sinks:
+            sink.close()
+
+
+def loopback_check():
+    """
+    Run UdpSink and TcpSink against local sockets
+
+    Returns:
+        Number of failures
+    """
+    failures = 0
+
+    def report(name, ok, detail=""):
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name}" + ("" if ok else f": {detail}"))
+
+    frames = [encode_command(i * 0.5, -i * 0.25) for i in range(50)]
+    known = set(frames)
+
+    # UDP: one datagram per frame
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(1.0)
+    sink = UdpSink("127.0.0.1", receiver.getsockname()[1])
+    accepted = all([sink.write(frame) for frame in frames])
+    try:
+        received = [receiver.recv(64) for _ in frames]
+    except socket.timeout:
+        received = []
+    report("udp frames arrive whole", accepted and received == frames, f"{len(received)} received")
+    sink.close()
+    receiver.close()
+
+    # TCP with nobody listening: writes fail without stalling the caller
+    probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    probe.bind(("127.0.0.1", 0))
+    closed_port = probe.getsockname()[1]
+    probe.close()
+    sink = TcpSink("127.0.0.1", closed_port)
+    start = time.perf_counter()
+    results = [sink.write(frames[0]) for _ in range(20)]
+    elapsed = time.perf_counter() - start
+    report("tcp without a peer never blocks", not any(results) and elapsed < 0.05, f"{elapsed * 1000:.1f} ms")
+    sink.close()
+
+    # TCP: non-blocking connect, then a slow reader with small buffers and
+    # long frames, so the socket takes some of them only in part
+    frames = [encode_servo_frame([i + 0.5] * 400) for i in range(50)]
+    known = set(frames)
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    server.settimeout(1.0)
+    sink = TcpSink("127.0.0.1", server.getsockname()[1])
+    sink.retry_interval = 0.05
+    deadline = time.monotonic() + 1.0
+    while not sink.connected and time.monotonic() < deadline:
+        sink.write(frames[0])
+        time.sleep(0.001)
+    report("tcp connects in the background", sink.connected)
+    if not sink.connected:
+        server.close()
+        return failures
+    connection = server.accept()[0]
+    connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sink.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+    written = sum(sink.write(frame) for frame in frames * 20)
+    stream = bytearray()
+    connection.setblocking(False)
+    deadline = time.monotonic() + 5.0
+    last_data = time.monotonic()
+    while time.monotonic() < deadline:
+        try:
+            chunk = connection.recv(65536)
+        except BlockingIOError:
+            chunk = b""
+        now = time.monotonic()
+        if chunk:
+            stream += chunk
+            last_data = now
+        if sink.pending:
+            sink.write(frames[0])  # Lets the unsent tail go out
+        elif now - last_data > 1.0:  # Zero-window probes can take a few hundred ms
+            break  # Everything the sink accepted has arrived
+        time.sleep(0.001)
+    lines = bytes(stream).split(b"\n")
+    whole = lines[-1] == b"" and all(line + b"\n" in known for line in lines[:-1])
+    report("tcp stream keeps whole frames under backpressure", whole and written < len(frames) * 20,
+           f"{written} accepted, {len(lines) - 1} lines, whole={whole}")
+
+    # TCP: peer goes away and comes back
+    connection.close()
+    deadline = time.monotonic() + 1.0
+    while sink.connected and time.monotonic() < deadline:
+        sink.write(frames[0])
+        time.sleep(0.005)
+    while not sink.connected and time.monotonic() < deadline:
+        sink.write(frames[0])
+        time.sleep(0.005)
+    reconnected = sink.connected
+    if reconnected:
+        server.accept()[0].close()
+    report("tcp reconnects after the peer restarts", reconnected)
+    sink.close()
+    server.close()
+    return failures
+
+
+if __name__ == "__main__":
+    failed = loopback_check()
+    print("\nAll checks passed" if not failed else f"\n{failed} check(s) failed")
+    sys.exit(1 if failed else 0)
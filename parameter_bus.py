@@ -0,0 +1,129 @@
+"""
+Parameter bus - coalesced, versioned settings updates
+
+GUI sliders fire on every motion event. Instead of applying each event
+immediately, callbacks post values to the bus; the control loop polls it
+once per tick and applies only the latest value of each setting. Every
+applied batch bumps the settings version.
+
+Expensive derived artifacts (lookup tables, curve previews) are built by
+registered builder functions on a background thread. Builders always see
+a complete settings snapshot and only the newest version is built, so a
+fast slider drag does not queue up a rebuild per pixel.
+"""
+
+import threading
+from types import MappingProxyType
+
+
+class ParameterBus:
+    """Coalesces setting changes and publishes versioned snapshots"""
+
+    def __init__(self, initial=None):
+        """
+        Initialize parameter bus
+
+        Args:
+            initial: Dict of initial settings (version 0)
+        """
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._values = dict(initial or {})
+        self.version = 0
+        self.settings = MappingProxyType(dict(self._values))
+
+        # Derived artifact builders
+        self._builders = {}
+        self._artifacts = {}
+        self._build_condition = threading.Condition()
+        self._build_request = None  # (version, settings) waiting to be built
+        self._build_thread = None
+        self.running = True
+
+    def set(self, name, value):
+        """
+        Post a new value for a setting (safe from any thread)
+
+        Repeated posts before the next poll() overwrite each other.
+        """
+        with self._lock:
+            self._pending[name] = value
+
+    def poll(self):
+        """
+        Apply pending changes - call once per control tick
+
+        Returns:
+            Dict of settings that changed since the last poll (empty if none)
+        """
+        with self._lock:
+            if not self._pending:
+                return {}
+            pending = self._pending
+            self._pending = {}
+
+        changes = {name: value for name, value in pending.items()
+                   if self._values.get(name) != value}
+        if not changes:
+            return {}
+
+        self._values.update(changes)
+        self.version += 1
+        self.settings = MappingProxyType(dict(self._values))
+        self._request_build()
+        return changes
+
+    def add_builder(self, name, builder):
+        """
+        Register a derived artifact builder
+
+        Args:
+            name: Artifact name for get_artifact()
+            builder: Function taking a settings mapping and returning the
+                     artifact; runs on the bus's background thread
+        """
+        self._builders[name] = builder
+        if self._build_thread is None:
+            self._build_thread = threading.Thread(target=self._build_loop, daemon=True)
+            self._build_thread.start()
+        self._request_build()
+
+    def get_artifact(self, name):
+        """
+        Get the newest built artifact
+
+        Returns:
+            Tuple of (version, artifact), or (None, None) if not built yet
+        """
+        return self._artifacts.get(name, (None, None))
+
+    def _request_build(self):
+        if not self._builders:
+            return
+        with self._build_condition:
+            self._build_request = (self.version, self.settings)
+            self._build_condition.notify()
+
+    def _build_loop(self):
+        """Background thread building artifacts for the newest settings"""
+        while self.running:
+            with self._build_condition:
+                while self._build_request is None and self.running:
+                    self._build_condition.wait()
+                request = self._build_request
+                self._build_request = None
+            if request is None:
+                break
+
+            version, settings = request
+            for name, builder in list(self._builders.items()):
+                try:
+                    self._artifacts[name] = (version, builder(settings))
+                except Exception as e:
+                    print(f"Error building {name}: {e}")
+
+    def stop(self):
+        """Stop the background builder thread"""
+        self.running = False
+        with self._build_condition:
+            self._build_condition.notify()
@@ -5,45 +5,79 @@ Platform GUI - Visual interface for Xbox controller to Arduino mapper
 import tkinter as tk
 from tkinter import ttk
 import math
+import signal
 import time
 from config import *
-from response_curves import create_curve
+from response_curves import MonotoneSplineCurve
+from control_engine import ControlEngine
+from parameter_bus import ParameterBus
+from profiles import curve_from_dict, curve_to_dict
+from output_sinks import FanOut
+from profiling import ProfileCapture, StageProfiler
+from scheduler import FrameScheduler
+from port_watcher import PortWatcher
 
 
 class PlatformGUI:
-    def __init__(self, root, controller_mapper, serial_output):
+    def __init__(self, root, controller_mapper, serial_output, output=None, telemetry=None,
+                 metrics=None, link=None, startup=None):
         """
         Initialize the GUI
 
         Args:
             root: Tkinter root window
             controller_mapper: ControllerMapper instance
-            serial_output: SerialOutput instance
+            serial_output: SerialOutput instance (connection managed by the GUI)
+            output: FanOut that commands are sent to (defaults to serial only)
+            telemetry: Optional started TelemetryRecorder (None = no recording)
+            metrics: Optional metrics.Metrics updated every tick
+            link: control_process.ControlLink when the control loop runs in
+                another process (viewer mode - nothing is sent from here)
+            startup: Optional profiling.StartupTimer, told about the first tick
         """
         self.root = root
         self.controller = controller_mapper
         self.serial = serial_output
+        self.link = link
+        if output is None and link is None:
+            output = FanOut([serial_output])
+        self.output = output
+        self.telemetry = telemetry
+        self.metrics = metrics
+        self.startup = startup
+
+        # Profiling (F9 = stage overlay, F10 = cProfile, F11 = sampling profile)
+        self.stage_profiler = None  # StageProfiler while the overlay is on
+        self.profile_capture = ProfileCapture()
+        self.profile_request = None  # Set by signal handlers, started on the next tick
+
+        # Frame timing (absolute deadlines) and redraw throttling while minimized
+        self.scheduler = FrameScheduler(GUI_UPDATE_RATE)
+        self.window_visible = True
+        self.last_render = 0.0
+
+        # Serial ports are enumerated in the background; the dropdown follows `version`
+        self.port_watcher = PortWatcher()
+        self.port_watcher.start()
+        self.ports_version = 0
+        self.detect_executor = None  # Created on the first auto-detect
+        self.detect_future = None  # Pending auto-detection, polled every tick
+        self.link_state_version = 0  # Last serial link state shown in the status bar
 
         # Current state
         self.roll = 0.0
         self.pitch = 0.0
-        self.current_curve = create_curve("Linear")
-
-        # Velocity control state
-        self.control_mode = "Velocity Control (Rate)"  # Default to velocity mode
-        self.control_speed = DEFAULT_CONTROL_SPEED
         self.last_update_time = None
 
-        # Velocity acceleration state
-        self.roll_hold_time = 0.0  # How long roll has been held in current direction
-        self.pitch_hold_time = 0.0  # How long pitch has been held in current direction
-        self.last_roll_sign = 0  # Track direction changes (0, 1, -1)
-        self.last_pitch_sign = 0
+        # Control math (velocity/position modes, acceleration state)
+        self.engine = ControlEngine(max_angle=self.controller.max_angle)
 
-        # Acceleration parameters (user-adjustable)
-        self.acceleration_rate = DEFAULT_ACCELERATION_RATE
-        self.acceleration_exponent = DEFAULT_ACCELERATION_EXPONENT
-        self.max_multiplier = DEFAULT_MAX_MULTIPLIER
+        # Slider changes are posted here and applied once per tick
+        initial = self.engine.get_settings()
+        initial["deadzone"] = self.controller.deadzone
+        self.curve_settings = curve_to_dict(self.engine.curve)
+        initial["curve"] = self.curve_settings
+        self.params = ParameterBus(initial)
 
         # Setup window
         self.root.title("Platform Controller - Xbox to Arduino")
@@ -52,6 +86,15 @@ class PlatformGUI:
 
         # Build UI
         self._build_ui()
+        self.root.bind("<Map>", self.on_window_map)
+        self.root.bind("<Unmap>", self.on_window_map)
+        self.root.bind("<F9>", lambda event: self.toggle_profiling_overlay())
+        self.root.bind("<F10>", lambda event: self.profile_capture.start_cprofile())
+        self.root.bind("<F11>", lambda event: self.profile_capture.start_sampling())
+        self._install_profile_signals()
+
+        if self.startup is not None:
+            self.startup.mark("widgets")
 
         # Start update loop
         self.update_loop()
@@ -60,7 +103,7 @@ class PlatformGUI:
         """Build the user interface"""
 
         # Main container
-        main_frame = ttk.Frame(self.root, padding="10")
+        self.main_frame = main_frame = ttk.Frame(self.root, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
 
         # ===== CONTROL MODE SELECTOR (MOST IMPORTANT!) =====
@@ -144,8 +187,8 @@ class PlatformGUI:
         self.max_mult_var = tk.DoubleVar(value=DEFAULT_MAX_MULTIPLIER)
         self.max_mult_slider = ttk.Scale(
             self.max_mult_frame,
-            from_=1.0,
-            to=5.0,
+            from_=MIN_MAX_MULTIPLIER,
+            to=MAX_MAX_MULTIPLIER,
             orient=tk.HORIZONTAL,
             variable=self.max_mult_var,
             command=self.on_max_mult_change
@@ -155,6 +198,57 @@ class PlatformGUI:
         self.max_mult_label = ttk.Label(self.max_mult_frame, text=f"{DEFAULT_MAX_MULTIPLIER:.1f}x", width=8)
         self.max_mult_label.pack(side=tk.LEFT)
 
+        # Auto balance gains (only for Auto Balance; packed by on_mode_change)
+        self.balance_frame = ttk.Frame(mode_frame)
+        self.balance_vars = {}
+        self.balance_labels = {}
+        for name, label, default, low, high in (
+            ("kp", "Balance P:", DEFAULT_BALANCE_KP, MIN_BALANCE_KP, MAX_BALANCE_KP),
+            ("ki", "Balance I:", DEFAULT_BALANCE_KI, MIN_BALANCE_KI, MAX_BALANCE_KI),
+            ("kd", "Balance D:", DEFAULT_BALANCE_KD, MIN_BALANCE_KD, MAX_BALANCE_KD),
+        ):
+            row = ttk.Frame(self.balance_frame)
+            row.pack(fill=tk.X, pady=(10, 0))
+            ttk.Label(row, text=label, width=15).pack(side=tk.LEFT)
+            self.balance_vars[name] = tk.DoubleVar(value=default)
+            ttk.Scale(
+                row,
+                from_=low,
+                to=high,
+                orient=tk.HORIZONTAL,
+                variable=self.balance_vars[name],
+                command=self.on_balance_change
+            ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+            self.balance_labels[name] = ttk.Label(row, text=f"{default:.1f}", width=8)
+            self.balance_labels[name].pack(side=tk.LEFT)
+
+        # Stick smoothing (One-Euro filter, all modes) with a lag budget
+        self.filter_frame = ttk.Frame(mode_frame)
+        self.filter_frame.pack(fill=tk.X, pady=(10, 0))
+
+        self.filter_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self.filter_frame,
+            text="Smooth stick",
+            variable=self.filter_var,
+            command=self.on_filter_change,
+            width=14
+        ).pack(side=tk.LEFT)
+
+        self.filter_budget_var = tk.DoubleVar(value=DEFAULT_FILTER_LAG_BUDGET * 1000)
+        self.filter_budget_slider = ttk.Scale(
+            self.filter_frame,
+            from_=MIN_FILTER_LAG_BUDGET * 1000,
+            to=MAX_FILTER_LAG_BUDGET * 1000,
+            orient=tk.HORIZONTAL,
+            variable=self.filter_budget_var,
+            command=self.on_filter_change
+        )
+        self.filter_budget_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        self.filter_lag_label = ttk.Label(self.filter_frame, text="Off", width=16)
+        self.filter_lag_label.pack(side=tk.LEFT)
+
         # ===== Platform Visualization =====
         viz_frame = ttk.LabelFrame(main_frame, text="Platform Visualization", padding="10")
         viz_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -184,9 +278,71 @@ class PlatformGUI:
         )
         self.multiplier_label.pack(side=tk.LEFT, padx=20)
 
+        # Auto balance feed state (packed in Auto Balance mode)
+        self.balance_status_label = ttk.Label(value_frame, text="Feed: -", font=('Courier', 10))
+
         # ===== Response Curve Settings (only for Position Control) =====
-        self.curve_frame = ttk.LabelFrame(main_frame, text="Response Curve Settings (Position Mode Only)", padding="10")
-        # Don't pack it yet - will be shown/hidden based on mode
+        # Built on the first switch to Position Mode (see _build_curve_frame)
+        self.curve_frame = None
+        self.params.add_builder("curve_preview", self._build_curve_preview)
+
+        # ===== Serial Settings =====
+        self.serial_frame = ttk.LabelFrame(main_frame, text="Serial Settings", padding="10")
+        self.serial_frame.pack(fill=tk.X)
+
+        # Port selection
+        port_frame = ttk.Frame(self.serial_frame)
+        port_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(port_frame, text="Port:").pack(side=tk.LEFT, padx=(0, 10))
+
+        self.port_var = tk.StringVar(value="Test Mode")
+
+        # Filled in by update_port_list() once the first background scan finishes
+        self.port_dropdown = ttk.Combobox(
+            port_frame,
+            textvariable=self.port_var,
+            values=["Test Mode"],
+            state="readonly",
+            width=15
+        )
+        self.port_dropdown.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.connect_button = ttk.Button(port_frame, text="Connect", command=self.toggle_serial_connection)
+        self.connect_button.pack(side=tk.LEFT)
+
+        # Refresh ports button
+        self.refresh_button = ttk.Button(port_frame, text="Refresh", command=self.refresh_ports)
+        self.refresh_button.pack(side=tk.LEFT, padx=(10, 0))
+
+        # Probe all ports for platform firmware and connect to the match
+        self.detect_button = ttk.Button(port_frame, text="Detect", command=self.start_auto_detect)
+        self.detect_button.pack(side=tk.LEFT, padx=(10, 0))
+
+        # Status indicator
+        status_frame = ttk.Frame(self.serial_frame)
+        status_frame.pack(fill=tk.X)
+
+        ttk.Label(status_frame, text="Status:").pack(side=tk.LEFT, padx=(0, 10))
+
+        self.status_canvas = tk.Canvas(status_frame, width=20, height=20, highlightthickness=0)
+        self.status_canvas.pack(side=tk.LEFT)
+        self.status_indicator = self.status_canvas.create_oval(2, 2, 18, 18, fill='gray', outline='')
+
+        self.status_label = ttk.Label(status_frame, text="Disconnected")
+        self.status_label.pack(side=tk.LEFT, padx=(5, 0))
+
+        # Hotplug notice for newly attached Arduino-like boards
+        self.detected_label = ttk.Label(self.serial_frame, text="", foreground='#0066cc')
+        self.detected_label.pack(fill=tk.X, pady=(5, 0))
+
+        # Initialize in test mode
+        self.serial.enable_mock_mode()
+        self.update_status_indicator(True)
+
+    def _build_curve_frame(self):
+        """Build the response curve settings panel (hidden until Position Mode)"""
+        self.curve_frame = ttk.LabelFrame(self.main_frame, text="Response Curve Settings (Position Mode Only)", padding="10")
 
         # Curve type selection
         curve_select_frame = ttk.Frame(self.curve_frame)
@@ -205,6 +361,27 @@ class PlatformGUI:
         self.curve_dropdown.pack(side=tk.LEFT)
         self.curve_dropdown.bind("<<ComboboxSelected>>", self.on_curve_change)
 
+        # Curve preview plot (line is re-sampled per settings version, marker moves every frame)
+        self.preview_canvas = tk.Canvas(
+            curve_select_frame,
+            width=CURVE_PREVIEW_WIDTH,
+            height=CURVE_PREVIEW_HEIGHT,
+            bg='#2b2b2b',
+            highlightthickness=0
+        )
+        self.preview_canvas.pack(side=tk.RIGHT)
+        self.preview_canvas.create_line(
+            0, CURVE_PREVIEW_HEIGHT / 2, CURVE_PREVIEW_WIDTH, CURVE_PREVIEW_HEIGHT / 2,
+            fill='#444444', dash=(2, 2)
+        )
+        self.preview_canvas.create_line(
+            CURVE_PREVIEW_WIDTH / 2, 0, CURVE_PREVIEW_WIDTH / 2, CURVE_PREVIEW_HEIGHT,
+            fill='#444444', dash=(2, 2)
+        )
+        self.preview_line = self.preview_canvas.create_line(0, 0, 0, 0, fill='#4a90e2', width=2)
+        self.preview_marker = self.preview_canvas.create_oval(0, 0, 0, 0, fill='red', outline='white')
+        self.preview_version = None
+
         # Max angle slider
         angle_frame = ttk.Frame(self.curve_frame)
         angle_frame.pack(fill=tk.X, pady=5)
@@ -257,54 +434,6 @@ class PlatformGUI:
         self.param_frame = ttk.Frame(self.curve_frame)
         self.param_frame.pack(fill=tk.X, pady=(10, 0))
 
-        # ===== Serial Settings =====
-        self.serial_frame = ttk.LabelFrame(main_frame, text="Serial Settings", padding="10")
-        self.serial_frame.pack(fill=tk.X)
-
-        # Port selection
-        port_frame = ttk.Frame(self.serial_frame)
-        port_frame.pack(fill=tk.X, pady=(0, 10))
-
-        ttk.Label(port_frame, text="Port:").pack(side=tk.LEFT, padx=(0, 10))
-
-        self.port_var = tk.StringVar(value="Test Mode")
-        available_ports = self.serial.get_available_ports()
-        if not available_ports:
-            available_ports = ["No ports found"]
-
-        self.port_dropdown = ttk.Combobox(
-            port_frame,
-            textvariable=self.port_var,
-            values=["Test Mode"] + available_ports,
-            state="readonly",
-            width=15
-        )
-        self.port_dropdown.pack(side=tk.LEFT, padx=(0, 10))
-
-        self.connect_button = ttk.Button(port_frame, text="Connect", command=self.toggle_serial_connection)
-        self.connect_button.pack(side=tk.LEFT)
-
-        # Refresh ports button
-        self.refresh_button = ttk.Button(port_frame, text="Refresh", command=self.refresh_ports)
-        self.refresh_button.pack(side=tk.LEFT, padx=(10, 0))
-
-        # Status indicator
-        status_frame = ttk.Frame(self.serial_frame)
-        status_frame.pack(fill=tk.X)
-
-        ttk.Label(status_frame, text="Status:").pack(side=tk.LEFT, padx=(0, 10))
-
-        self.status_canvas = tk.Canvas(status_frame, width=20, height=20, highlightthickness=0)
-        self.status_canvas.pack(side=tk.LEFT)
-        self.status_indicator = self.status_canvas.create_oval(2, 2, 18, 18, fill='gray', outline='')
-
-        self.status_label = ttk.Label(status_frame, text="Disconnected")
-        self.status_label.pack(side=tk.LEFT, padx=(5, 0))
-
-        # Initialize in test mode
-        self.serial.enable_mock_mode()
-        self.update_status_indicator(True)
-
     def _build_curve_parameters(self):
         """Build parameter controls for current curve type"""
         # Clear existing widgets
@@ -399,37 +528,122 @@ class PlatformGUI:
             self.bias_label = ttk.Label(frame2, text="0.5", width=6)
             self.bias_label.pack(side=tk.LEFT)
 
+        elif curve_type == "Spline":
+            # One slider per interior control point (output at that input)
+            self.point_vars = []
+            self.point_labels = []
+            for index, (x, y) in enumerate(MonotoneSplineCurve.DEFAULT_POINTS[1:-1], 1):
+                frame = ttk.Frame(self.param_frame)
+                frame.pack(fill=tk.X, pady=2)
+
+                ttk.Label(frame, text=f"Output @ {x:.2f}:", width=14).pack(side=tk.LEFT)
+
+                point_var = tk.DoubleVar(value=y)
+                point_slider = ttk.Scale(
+                    frame,
+                    from_=0.0,
+                    to=1.0,
+                    orient=tk.HORIZONTAL,
+                    variable=point_var,
+                    command=lambda v, i=index: self.on_curve_param_change(f'point_{i}', float(v))
+                )
+                point_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+                point_label = ttk.Label(frame, text=f"{y:.2f}", width=6)
+                point_label.pack(side=tk.LEFT)
+
+                self.point_vars.append(point_var)
+                self.point_labels.append(point_label)
+
         elif curve_type in ["Ease-In", "Ease-Out", "Ease-In-Out"]:
             # No parameters for these
             ttk.Label(self.param_frame, text="No adjustable parameters", font=('', 9, 'italic')).pack()
 
+    def _build_curve_preview(self, settings):
+        """
+        Sample the configured curve into preview canvas coordinates
+
+        Runs on the parameter bus builder thread, so it works on a fresh
+        curve instance and never touches Tk.
+        """
+        curve = curve_from_dict(settings["curve"])
+        coords = []
+        for value, output in curve.sample(CURVE_PREVIEW_SAMPLES):
+            coords.append(self._preview_x(value))
+            coords.append(self._preview_y(output))
+        return coords
+
+    def _preview_x(self, value):
+        """Map a normalized input to preview canvas X"""
+        return (value + 1.0) / 2.0 * (CURVE_PREVIEW_WIDTH - 8) + 4
+
+    def _preview_y(self, value):
+        """Map a normalized output to preview canvas Y"""
+        return (1.0 - value) / 2.0 * (CURVE_PREVIEW_HEIGHT - 8) + 4
+
+    def update_curve_preview(self, x, output):
+        """
+        Update the curve preview plot
+
+        Args:
+            x: Current stick input in range [-1, 1]
+            output: Current curve output in range [-1, 1]
+        """
+        version, coords = self.params.get_artifact("curve_preview")
+        if coords and version != self.preview_version:
+            self.preview_canvas.coords(self.preview_line, *coords)
+            self.preview_version = version
+
+        mx = self._preview_x(x)
+        my = self._preview_y(output)
+        self.preview_canvas.coords(self.preview_marker, mx - 3, my - 3, mx + 3, my + 3)
+
     def on_mode_change(self, event=None):
         """Handle control mode change"""
-        self.control_mode = self.mode_var.get()
+        control_mode = self.mode_var.get()
+        self.params.set("control_mode", control_mode)
 
-        if self.control_mode == "Velocity Control (Rate)":
+        if control_mode == "Velocity Control (Rate)":
             # Hide curve settings, show velocity controls
-            self.curve_frame.pack_forget()
-            self.speed_frame.pack(fill=tk.X, pady=(10, 0))
-            self.accel_rate_frame.pack(fill=tk.X, pady=(10, 0))
-            self.max_mult_frame.pack(fill=tk.X, pady=(10, 0))
+            if self.curve_frame is not None:
+                self.curve_frame.pack_forget()
+            self.balance_frame.pack_forget()
+            self.balance_status_label.pack_forget()
+            self.speed_frame.pack(fill=tk.X, pady=(10, 0), before=self.filter_frame)
+            self.accel_rate_frame.pack(fill=tk.X, pady=(10, 0), before=self.filter_frame)
+            self.max_mult_frame.pack(fill=tk.X, pady=(10, 0), before=self.filter_frame)
             self.multiplier_label.pack(side=tk.LEFT, padx=20)
             self.mode_help_label.config(
                 text="🎯 VELOCITY MODE: Joystick controls RATE of change. Hold stick to tilt gradually. Perfect for marble balancing!",
                 foreground='#00aa00'
             )
-            # Reset acceleration state
-            self.roll_hold_time = 0.0
-            self.pitch_hold_time = 0.0
-            self.last_roll_sign = 0
-            self.last_pitch_sign = 0
+        elif control_mode == "Auto Balance (Position Feed)":
+            # Show balance gains and feed state, hide curve and velocity controls
+            if self.curve_frame is not None:
+                self.curve_frame.pack_forget()
+            self.speed_frame.pack_forget()
+            self.accel_rate_frame.pack_forget()
+            self.max_mult_frame.pack_forget()
+            self.multiplier_label.pack_forget()
+            self.balance_frame.pack(fill=tk.X, before=self.filter_frame)
+            self.balance_status_label.pack(side=tk.LEFT, padx=20)
+            self.on_balance_change()
+            self.mode_help_label.config(
+                text=f"🤖 AUTO BALANCE: Centers the marble from positions sent to UDP port "
+                     f"{BALANCE_FEED_PORT}. Push the stick to take over - full deflection = full manual.",
+                foreground='#0066cc'
+            )
         else:
             # Show curve settings, hide velocity controls
+            if self.curve_frame is None:
+                self._build_curve_frame()
             self.curve_frame.pack(fill=tk.X, pady=(0, 10), before=self.serial_frame)
             self.speed_frame.pack_forget()
             self.accel_rate_frame.pack_forget()
             self.max_mult_frame.pack_forget()
             self.multiplier_label.pack_forget()
+            self.balance_frame.pack_forget()
+            self.balance_status_label.pack_forget()
             self.mode_help_label.config(
                 text="📍 POSITION MODE: Joystick position = platform angle directly. More sensitive!",
                 foreground='#aa6600'
@@ -438,30 +652,49 @@ class PlatformGUI:
     def on_control_speed_change(self, value):
         """Handle control speed change"""
         speed = float(value)
-        self.control_speed = speed
+        self.params.set("control_speed", speed)
         self.control_speed_label.config(text=f"{speed:.0f}°/s")
 
     def on_accel_rate_change(self, value):
         """Handle acceleration rate change"""
         value = float(value)
-        self.acceleration_rate = value
+        self.params.set("acceleration_rate", value)
         self.accel_rate_label.config(text=f"{value:.2f}")
 
     def on_max_mult_change(self, value):
         """Handle max multiplier change"""
         value = float(value)
-        self.max_multiplier = value
+        self.params.set("max_multiplier", value)
         self.max_mult_label.config(text=f"{value:.1f}x")
 
+    def on_filter_change(self, value=None):
+        """Handle stick smoothing toggle or lag budget change"""
+        budget = self.filter_budget_var.get() / 1000.0
+        if self.filter_var.get():
+            self.params.set("input_filter", {"lag_budget": budget})
+        else:
+            self.params.set("input_filter", None)
+            self.filter_lag_label.config(text="Off")
+
+    def on_balance_change(self, value=None):
+        """Handle auto balance gain change"""
+        gains = {name: var.get() for name, var in self.balance_vars.items()}
+        self.params.set("balance", gains)
+        for name, gain in gains.items():
+            self.balance_labels[name].config(text=f"{gain:.1f}")
+
     def on_curve_change(self, event=None):
         """Handle curve type change"""
         curve_type = self.curve_var.get()
-        self.current_curve = create_curve(curve_type)
+        self.curve_settings = {"type": curve_type, "parameters": {}}
+        self.params.set("curve", self.curve_settings)
         self._build_curve_parameters()
 
     def on_curve_param_change(self, param_name, value):
         """Handle curve parameter change"""
-        self.current_curve.set_parameter(param_name, value)
+        parameters = dict(self.curve_settings["parameters"], **{param_name: value})
+        self.curve_settings = {"type": self.curve_settings["type"], "parameters": parameters}
+        self.params.set("curve", self.curve_settings)
 
         # Update label
         if param_name == 'exponent':
@@ -472,25 +705,112 @@ class PlatformGUI:
             self.strength_label.config(text=f"{value:.1f}")
         elif param_name == 'center_bias':
             self.bias_label.config(text=f"{value:.2f}")
+        elif param_name.startswith('point_'):
+            self.point_labels[int(param_name[len('point_'):]) - 1].config(text=f"{value:.2f}")
 
     def on_max_angle_change(self, value):
         """Handle max angle change"""
         angle = float(value)
-        self.controller.set_max_angle(angle)
+        self.params.set("max_angle", angle)
         self.max_angle_label.config(text=f"{angle:.0f}°")
 
     def on_deadzone_change(self, value):
         """Handle deadzone change"""
         deadzone = float(value)
-        self.controller.set_deadzone(deadzone)
+        self.params.set("deadzone", deadzone)
         self.deadzone_label.config(text=f"{deadzone:.2f}")
 
+    def apply_profile(self, profile):
+        """
+        Apply a settings profile to the controls
+
+        Args:
+            profile: Profile dict as returned by profiles.load_profile()
+        """
+        if self.curve_frame is None:
+            self._build_curve_frame()  # Max angle, deadzone and curve controls live there
+        control = profile.get("control", {})
+        if control.get("control_mode") in CONTROL_MODES:
+            self.mode_var.set(control["control_mode"])
+            self.on_mode_change()
+
+        sliders = [
+            ("control_speed", self.control_speed_var, self.on_control_speed_change),
+            ("acceleration_rate", self.accel_rate_var, self.on_accel_rate_change),
+            ("max_multiplier", self.max_mult_var, self.on_max_mult_change),
+            ("max_angle", self.max_angle_var, self.on_max_angle_change),
+        ]
+        for name, var, handler in sliders:
+            if name in control:
+                var.set(control[name])
+                handler(control[name])
+        if "acceleration_exponent" in control:
+            # No slider for this one
+            self.params.set("acceleration_exponent", float(control["acceleration_exponent"]))
+        if control.get("balance"):
+            for name, var in self.balance_vars.items():
+                if name in control["balance"]:
+                    var.set(control["balance"][name])
+            self.on_balance_change()
+        if "input_filter" in control:
+            input_filter = control["input_filter"]
+            self.filter_var.set(bool(input_filter))
+            if input_filter and input_filter.get("lag_budget"):
+                self.filter_budget_var.set(input_filter["lag_budget"] * 1000)
+            self.params.set("input_filter", input_filter)  # Keeps every tuned parameter
+
+        if "deadzone" in profile:
+            self.deadzone_var.set(profile["deadzone"])
+            self.on_deadzone_change(profile["deadzone"])
+
+        curve = profile.get("curve")
+        if curve and curve.get("type") in CURVE_TYPES:
+            self.curve_var.set(curve["type"])
+            self.on_curve_change()
+            param_vars = {
+                'exponent': 'exp_var',
+                'max_velocity': 'vel_var',
+                'curve_strength': 'strength_var',
+                'center_bias': 'bias_var',
+            }
+            for name, value in curve.get("parameters", {}).items():
+                if name in param_vars:
+                    getattr(self, param_vars[name]).set(value)
+                    self.on_curve_param_change(name, float(value))
+                elif name == "points":
+                    # Spline control points - sliders only cover the default layout.
+                    # Checked here: a bad set must not reach the control loop.
+                    try:
+                        MonotoneSplineCurve(points=value)
+                    except (TypeError, ValueError) as e:
+                        print(f"Ignoring the profile's spline points: {e}")
+                        continue
+                    self.on_curve_param_change(name, value)
+                    if len(value) == len(self.point_vars) + 2:
+                        for point_var, (_, y) in zip(self.point_vars, value[1:-1]):
+                            point_var.set(y)
+
+    def apply_settings(self, changes):
+        """
+        Apply settings changes from the parameter bus
+
+        Args:
+            changes: Dict of changed settings as returned by ParameterBus.poll()
+        """
+        self.engine.apply_settings(changes)
+        if "max_angle" in changes:
+            self.controller.set_max_angle(changes["max_angle"])
+        if "deadzone" in changes:
+            self.controller.set_deadzone(changes["deadzone"])
+        if "curve" in changes:
+            self.engine.apply_curve_settings(changes["curve"])
+
     def toggle_serial_connection(self):
         """Connect or disconnect from serial port"""
         port = self.port_var.get()
 
-        if self.serial.is_connected:
-            # Disconnect
+        if self.serial.link_state != "disconnected":
+            # Disconnect (also cancels a background handshake or reconnect)
             self.serial.disconnect()
             self.serial.disable_mock_mode()
             self.connect_button.config(text="Connect")
@@ -510,26 +830,105 @@ class PlatformGUI:
                     self.update_status_indicator(False)
 
     def refresh_ports(self):
-        """Refresh available COM ports"""
-        available_ports = self.serial.get_available_ports()
+        """Refresh available COM ports (the scan runs on the watcher thread)"""
+        self.port_watcher.rescan()
+
+    def start_auto_detect(self):
+        """Start probing ports for platform firmware in the background"""
+        if self.detect_future is not None:
+            return
+        candidates = [port.device for port in self.port_watcher.ports] or None
+        if self.detect_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.detect_executor = ThreadPoolExecutor(max_workers=1)
+        self.detect_future = self.detect_executor.submit(
+            self.serial.detect_device, candidates, SERIAL_DETECT_TIMEOUT
+        )
+        self.detect_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Detecting...")
+
+    def finish_auto_detect(self):
+        """Connect to the device found by start_auto_detect()"""
+        future = self.detect_future
+        self.detect_future = None
+        self.detect_button.config(state=tk.NORMAL)
+        try:
+            device = future.result()
+        except Exception as e:
+            print(f"Auto-detect failed: {e}")
+            device = None
+
+        if device is None:
+            self.update_status_indicator(self.serial.is_connected)
+            self.status_label.config(text="No platform firmware found")
+            return
+
+        self.serial.adopt(device)
+        values = list(self.port_dropdown['values'])
+        if device.port not in values:
+            self.port_dropdown['values'] = values + [device.port]
+        self.port_var.set(device.port)
+        self.connect_button.config(text="Disconnect")
+        self.update_status_indicator(True)
+
+    def update_port_list(self):
+        """Copy the watcher's cached port list into the dropdown"""
+        watcher = self.port_watcher
+        self.ports_version = watcher.version
+        ports = watcher.ports
+        available_ports = [port.device for port in ports]
         if not available_ports:
             available_ports = ["No ports found"]
-
         self.port_dropdown['values'] = ["Test Mode"] + available_ports
 
+        boards = [port for port in ports if port.board]
+        new_boards = watcher.new_boards
+        if new_boards:
+            board = new_boards[0]
+            self.detected_label.config(text=f"{board.board} detected on {board.device}")
+            # Preselect it unless a real port is already in use
+            if not self.serial.is_connected or self.serial.mock_mode:
+                if self.port_var.get() in ("Test Mode", "No ports found"):
+                    self.port_var.set(board.device)
+        elif boards:
+            self.detected_label.config(text="Arduino-like: " + ", ".join(port.device for port in boards))
+        else:
+            self.detected_label.config(text="")
+
     def update_status_indicator(self, connected):
         """Update the status indicator light"""
         if connected:
             self.status_canvas.itemconfig(self.status_indicator, fill='#00ff00')
-            port = self.port_var.get()
-            if port == "Test Mode":
+            if self.serial.mock_mode:
                 self.status_label.config(text="Test Mode (No Serial)")
             else:
-                self.status_label.config(text=f"Connected to {port}")
+                self.status_label.config(
+                    text=f"Connected to {self.serial.port} @ {self.serial.link_baudrate} baud "
+                         f"(max {self.serial.max_send_rate:.0f} Hz)"
+                )
         else:
             self.status_canvas.itemconfig(self.status_indicator, fill='gray')
             self.status_label.config(text="Disconnected")
 
+    def update_link_state(self):
+        """Show serial link state changes published by SerialOutput"""
+        self.link_state_version = self.serial.state_version
+        state = self.serial.link_state
+        if state == "reconnecting":
+            self.status_canvas.itemconfig(self.status_indicator, fill='#ff9900')
+            self.status_label.config(
+                text=f"Reconnecting to {self.serial.port} (attempt {self.serial.reconnect_attempts})..."
+            )
+            self.connect_button.config(text="Disconnect")
+        elif state == "handshake":
+            self.status_canvas.itemconfig(self.status_indicator, fill='#ccaa00')
+            self.status_label.config(text=f"Connecting to {self.serial.port}...")
+            self.connect_button.config(text="Disconnect")
+        else:
+            connected = state == "connected"
+            self.update_status_indicator(connected)
+            self.connect_button.config(text="Disconnect" if connected else "Connect")
+
     def draw_platform(self, roll, pitch):
         """
         Draw the tilted platform visualization
@@ -608,8 +1007,60 @@ class PlatformGUI:
             anchor='nw'
         )
 
+    def on_window_map(self, event):
+        """Track whether the main window is shown (not minimized/withdrawn)"""
+        if event.widget is self.root:
+            self.window_visible = event.type == tk.EventType.Map
+
+    def toggle_profiling_overlay(self):
+        """Turn per-stage timing and its canvas overlay on or off"""
+        if self.stage_profiler is None:
+            self.stage_profiler = StageProfiler()
+        else:
+            self.stage_profiler = None
+
+    def _install_profile_signals(self):
+        """SIGUSR1 = cProfile capture, SIGUSR2 = sampling capture (POSIX only)"""
+        if not hasattr(signal, "SIGUSR1"):
+            return
+
+        def request(kind):
+            def handler(signum, frame):
+                self.profile_request = kind
+            return handler
+
+        signal.signal(signal.SIGUSR1, request("cprofile"))
+        signal.signal(signal.SIGUSR2, request("sampling"))
+
+    def draw_profiling_overlay(self):
+        """Draw rolling per-stage timings on the platform canvas"""
+        text = self.stage_profiler.format_overlay(self.scheduler.period * 1000.0)
+        timing = self.scheduler.stats()
+        if "mean_jitter_ms" in timing:
+            text += (f"\njitter  {timing['mean_jitter_ms']:>7.2f}{timing['max_jitter_ms']:>7.2f}"
+                     f"\nskipped {timing['skipped']:>7d}")
+        self.canvas.create_text(
+            WINDOW_WIDTH - 50, 290,
+            text=text,
+            fill='#00ff88',
+            font=('Courier', 9),
+            anchor='se',
+            justify=tk.LEFT
+        )
+
     def update_loop(self):
         """Main update loop - called every frame"""
+        frame_start = time.perf_counter()
+        self.scheduler.start_frame(frame_start)
+
+        prof = self.stage_profiler
+        if prof is not None:
+            prof.begin()
+
+        if self.metrics is not None:
+            tick_start = time.perf_counter()
+            self.metrics.loop.tick(tick_start)
+
         # Calculate time delta for velocity control
         current_time = time.time()
         if self.last_update_time is None:
@@ -622,118 +1073,160 @@ class PlatformGUI:
         # Clamp dt to reasonable values
         dt = max(0.001, min(0.2, dt))
 
-        # Get normalized values from controller
-        x, y = self.controller.get_normalized_values()
-
-        if self.control_mode == "Velocity Control (Rate)":
-            # VELOCITY CONTROL MODE - Joystick controls rate of change
-            # x and y represent the SPEED at which to change the angle
-
-            # Get stick deflection
-            x_deflection = x  # -1 to 1
-            y_deflection = -y  # Invert Y axis for correct pitch direction
-
-            # Track direction changes for roll
-            current_roll_sign = 1 if x_deflection > 0 else (-1 if x_deflection < 0 else 0)
-            if current_roll_sign != self.last_roll_sign and current_roll_sign != 0:
-                # Direction changed - reset acceleration
-                self.roll_hold_time = 0.0
-            self.last_roll_sign = current_roll_sign
-
-            # Track direction changes for pitch
-            current_pitch_sign = 1 if y_deflection > 0 else (-1 if y_deflection < 0 else 0)
-            if current_pitch_sign != self.last_pitch_sign and current_pitch_sign != 0:
-                self.pitch_hold_time = 0.0
-            self.last_pitch_sign = current_pitch_sign
-
-            # Update hold times if stick is deflected beyond deadzone
-            if abs(x_deflection) > 0.01:  # Small threshold to avoid jitter
-                self.roll_hold_time += dt
-            else:
-                self.roll_hold_time = 0.0  # Reset when centered
-
-            if abs(y_deflection) > 0.01:
-                self.pitch_hold_time += dt
-            else:
-                self.pitch_hold_time = 0.0
-
-            # Calculate acceleration multipliers
-            # Formula: multiplier = 1.0 + (hold_time^exponent * deflection_factor * accel_rate)
-            # deflection_factor: larger stick movements accelerate faster
-
-            roll_deflection_factor = abs(x_deflection)  # 0 to 1
-            pitch_deflection_factor = abs(y_deflection)
-
-            # Exponential time component
-            roll_time_factor = self.roll_hold_time ** self.acceleration_exponent
-            pitch_time_factor = self.pitch_hold_time ** self.acceleration_exponent
-
-            # Calculate multipliers
-            roll_multiplier = 1.0 + (roll_time_factor * roll_deflection_factor * self.acceleration_rate)
-            pitch_multiplier = 1.0 + (pitch_time_factor * pitch_deflection_factor * self.acceleration_rate)
-
-            # Clamp to max multiplier
-            roll_multiplier = min(roll_multiplier, self.max_multiplier)
-            pitch_multiplier = min(pitch_multiplier, self.max_multiplier)
-
-            # Calculate base velocity
-            roll_base_velocity = x_deflection * self.control_speed
-            pitch_base_velocity = y_deflection * self.control_speed
-
-            # Apply acceleration multiplier
-            roll_rate = roll_base_velocity * roll_multiplier
-            pitch_rate = pitch_base_velocity * pitch_multiplier
-
-            # Update angles
-            self.roll += roll_rate * dt
-            self.pitch += pitch_rate * dt
-
-            # Clamp to max angle (GLOBAL LIMIT - applies to both modes)
-            max_angle = self.controller.max_angle
-            self.roll = max(-max_angle, min(max_angle, self.roll))
-            self.pitch = max(-max_angle, min(max_angle, self.pitch))
-
-            # Update speed multiplier visual feedback
-            current_multiplier = max(roll_multiplier, pitch_multiplier)
-            self.multiplier_label.config(text=f"Speed: {current_multiplier:.1f}x")
-
-            # Color code: gray=1x, yellow=1-2x, orange=2-3x
-            if current_multiplier < 1.5:
-                color = '#666666'
-            elif current_multiplier < 2.5:
-                color = '#ccaa00'  # Yellow
-            else:
-                color = '#ff6600'  # Orange
-            self.multiplier_label.config(foreground=color)
-
+        if self.detect_future is not None and self.detect_future.done():
+            self.finish_auto_detect()
+
+        # Apply slider changes made since the last tick
+        changes = self.params.poll()
+        if changes:
+            self.apply_settings(changes)
+            if self.link is not None:
+                self.link.send("settings", changes)
+
+        if self.link is not None:
+            # Viewer mode - show what the control process last published
+            state = self.link.read()
+            x, y = state.x, state.y
+            self.roll, self.pitch = state.roll, state.pitch
+            self.engine.multiplier = state.multiplier
+            self.engine.max_angle = state.max_angle
+            filter_lag = state.filter_lag
+            feed_age, override = state.feed_age, state.override
+            if prof is not None:
+                prof.mark("input")
+                prof.mark("control")
         else:
-            # POSITION CONTROL MODE - Joystick position = angle directly
-            # Apply response curve
-            x_curved = self.current_curve.apply(x)
-            y_curved = self.current_curve.apply(-y)  # Invert Y axis for correct pitch direction
-
-            # Convert to angles
-            max_angle = self.controller.max_angle
-            self.roll = x_curved * max_angle
-            self.pitch = y_curved * max_angle
-
-        # Update display labels
-        self.roll_label.config(text=f"Roll: {self.roll:+.1f}°")
-        self.pitch_label.config(text=f"Pitch: {self.pitch:+.1f}°")
-        self.serial_label.config(text=f"Serial: <{self.roll:.1f},{self.pitch:.1f}>")
-
-        # Draw platform
-        self.draw_platform(self.roll, self.pitch)
+            # Get normalized values from controller
+            x, y = self.controller.get_normalized_values()
+            if prof is not None:
+                prof.mark("input")
+
+            # Controller lost - level the platform until the reader is back
+            # (auto balance keeps running on its position feed)
+            if not self.controller.connected:
+                self.engine.controller_lost()
+
+            # Run control math (max angle is a GLOBAL LIMIT - applies to both modes)
+            self.engine.max_angle = self.controller.max_angle
+            self.roll, self.pitch = self.engine.step(x, y, dt)
+            filter_lag = self.engine.filter_lag()
+            feed_age, override = -1.0, 0.0
+            if self.engine.balance is not None:
+                status = self.engine.balance.status()
+                feed_age = status["age"] if status["age"] is not None else -1.0
+                override = status["override"]
+            if prof is not None:
+                prof.mark("control")
+
+        # Redraw every frame while visible; only occasionally while minimized
+        render = self.window_visible or frame_start - self.last_render >= 1.0 / GUI_HIDDEN_RENDER_RATE
+        if render:
+            self.last_render = frame_start
+
+            if self.engine.control_mode == "Velocity Control (Rate)":
+                # Update speed multiplier visual feedback
+                current_multiplier = self.engine.multiplier
+                self.multiplier_label.config(text=f"Speed: {current_multiplier:.1f}x")
+
+                # Color code: gray=1x, yellow=1-2x, orange=2-3x
+                if current_multiplier < 1.5:
+                    color = '#666666'
+                elif current_multiplier < 2.5:
+                    color = '#ccaa00'  # Yellow
+                else:
+                    color = '#ff6600'  # Orange
+                self.multiplier_label.config(foreground=color)
+            elif self.engine.control_mode == "Auto Balance (Position Feed)":
+                if 0.0 <= feed_age <= BALANCE_STALE_TIMEOUT:
+                    self.balance_status_label.config(
+                        text=f"Feed: {feed_age * 1000:.0f} ms  stick {override:.0%}", foreground='#0066cc')
+                else:
+                    self.balance_status_label.config(text="Feed: none - stick only", foreground='#cc0000')
+            elif self.curve_frame is not None and self.engine.max_angle > 0:
+                self.update_curve_preview(x, self.roll / self.engine.max_angle)
+
+            if self.port_watcher.version != self.ports_version:
+                self.update_port_list()
+            if self.serial.state_version != self.link_state_version:
+                self.update_link_state()
+
+            if self.filter_var.get():
+                self.filter_lag_label.config(
+                    text=f"Lag {filter_lag * 1000:.0f}/{self.filter_budget_var.get():.0f} ms")
+
+            # Update display labels
+            self.roll_label.config(text=f"Roll: {self.roll:+.1f}°")
+            self.pitch_label.config(text=f"Pitch: {self.pitch:+.1f}°")
+            serial_text = f"Serial: <{self.roll:.1f},{self.pitch:.1f}>"
+            if self.serial.is_connected and not self.serial.mock_mode:
+                serial_text += f"  link {self.serial.utilization:.0%}"
+            self.serial_label.config(text=serial_text)
+        if prof is not None:
+            prof.mark("labels")
+
+        if render:
+            # Draw platform
+            self.draw_platform(self.roll, self.pitch)
+            if prof is not None:
+                self.draw_profiling_overlay()
+        if prof is not None:
+            prof.mark("canvas")
+
+        # Send to serial and any other sinks
+        sent = False
+        if self.output is not None:
+            sent = self.output.send_command(self.roll, self.pitch)
+
+        if self.telemetry is not None:
+            engine = self.engine
+            self.telemetry.record(
+                current_time, int(self.controller.right_stick_x), int(self.controller.right_stick_y),
+                x, y, engine.curve_x, engine.curve_y, engine.multiplier,
+                self.roll, self.pitch, sent
+            )
+        if prof is not None:
+            prof.mark("serial")
+            prof.end()
+
+        if self.startup is not None:
+            self.startup.first_tick()
+            self.startup = None
+
+        # On-demand profile captures
+        if self.profile_request is not None:
+            if self.profile_request == "cprofile":
+                self.profile_capture.start_cprofile()
+            else:
+                self.profile_capture.start_sampling()
+            self.profile_request = None
+        if self.profile_capture.active:
+            self.profile_capture.poll()
 
-        # Send to serial
-        self.serial.send_command(self.roll, self.pitch)
+        if self.metrics is not None:
+            self.metrics.roll = self.roll
+            self.metrics.pitch = self.pitch
+            self.metrics.input_filter_lag = filter_lag
+            self.metrics.loop.work_done(time.perf_counter() - tick_start)
 
-        # Schedule next update
-        update_interval = int(1000 / GUI_UPDATE_RATE)  # Convert Hz to ms
-        self.root.after(update_interval, self.update_loop)
+        # Schedule next update at the next absolute deadline (late frames are skipped, not queued)
+        self.root.after(self.scheduler.next_delay(), self.update_loop)
 
     def cleanup(self):
         """Cleanup on exit"""
+        self.params.stop()
+        self.port_watcher.stop()
+        if self.detect_executor is not None:
+            self.detect_executor.shutdown(wait=False)
+
+        if self.link is not None:
+            # The control process sends neutral and closes the outputs
+            self.link.close()
+            return
+
         # Send neutral position
-        self.serial.send_command(0.0, 0.0)
-        self.serial.disconnect()
+        self.output.send_command(0.0, 0.0)
+        self.output.close()
+        self.engine.close()
+
+        if self.telemetry is not None:
+            self.telemetry.stop()
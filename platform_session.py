@@ -0,0 +1,312 @@
+"""
+Platform session - drive the platform from code instead of the stick
+
+Vision trackers, test scripts and other lab tools can command the
+platform directly. A PlatformSession owns the serial link and a sender
+thread that runs at a fixed rate on absolute deadlines; callers never
+wait on the port:
+
+    from platform_session import PlatformSession
+
+    with PlatformSession(port="COM3") as session:
+        session.set_angles(10.0, -5.0)              # Hold one setpoint
+        t = np.arange(0, 5, 1 / session.rate)
+        session.submit(15 * np.sin(t), 15 * np.cos(t))  # Queue a trajectory
+        session.wait()                              # Until it has been sent
+
+Each tick sends the next queued trajectory frame, or else the latest
+setpoint (or stick input run through the normal control math). Every
+command is clamped to max_angle. submit() queues as much of a trajectory
+as fits and returns how many frames it took, and stats() reports queue
+depth, frames the link refused and scheduling lateness, so a producer
+can tell when it is running ahead of the platform.
+
+Without a port (and without auto_connect) the session runs in Test Mode
+and prints frames instead of sending them.
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+
+from config import *
+from control_engine import ControlEngine, clamp_angle
+from output_sinks import FanOut
+from scheduler import FrameScheduler
+from serial_output import SerialOutput
+
+
+class PlatformSession:
+    """Programmatic control of one platform"""
+
+    def __init__(self, port=None, rate=SESSION_RATE, max_angle=DEFAULT_MAX_ANGLE, auto_connect=False,
+                 queue_seconds=SESSION_QUEUE_SECONDS, connect_timeout=10.0, serial_output=None, output=None):
+        """
+        Args:
+            port: Serial port to open (None = Test Mode unless auto_connect)
+            rate: Frames sent per second
+            max_angle: Every command is clamped to +/- this many degrees
+            auto_connect: Probe all ports for platform firmware instead of using `port`
+            queue_seconds: Trajectory queue capacity in seconds at `rate`
+            connect_timeout: Seconds to wait for the board to finish its handshake
+            serial_output: Existing SerialOutput to use (default: a new one)
+            output: FanOut or wrapper (KinematicOutput) that frames go to
+                    (default: the serial output only)
+        """
+        self.port = port
+        self.rate = rate
+        self.max_angle = max_angle
+        self.auto_connect = auto_connect
+        self.connect_timeout = connect_timeout
+        self.serial = serial_output if serial_output is not None else SerialOutput(
+            baudrate=SERIAL_BAUDRATE, max_baudrate=SERIAL_MAX_BAUDRATE)
+        self.output = output if output is not None else FanOut([self.serial])
+        self.scheduler = FrameScheduler(rate)
+
+        # Commands - written by callers, read by the sender thread under _lock
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._chunks = collections.deque()  # [(n, 2) array, next index] trajectory pieces
+        self._queued = 0  # Frames waiting in _chunks
+        self.capacity = max(1, int(queue_seconds * rate))
+        self._setpoint = (0.0, 0.0)
+        self._setpoint_fresh = False
+        self._stick = None  # (x, y) while driven through the control engine
+        self.engine = ControlEngine(max_angle=max_angle)
+
+        # Counters (read with stats())
+        self.frames_sent = 0
+        self.frames_refused = 0  # The output did not take the frame (link budget, reconnecting)
+        self.frames_clamped = 0
+        self.frames_dropped = 0  # Trajectory frames that did not fit in the queue
+        self.setpoints_superseded = 0  # Setpoints replaced before a tick sent them
+
+        self.roll = 0.0  # Last command sent
+        self.pitch = 0.0
+        self.running = False
+        self._thread = None
+        self._last_tick = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def start(self):
+        """
+        Open the link and start sending
+
+        Raises:
+            RuntimeError: If the port cannot be opened, no firmware is found
+                          or the handshake does not finish in connect_timeout
+        """
+        if self.auto_connect:
+            if not self.serial.auto_connect(timeout=SERIAL_DETECT_TIMEOUT):
+                raise RuntimeError("No platform firmware found")
+        elif self.port:
+            if not self.serial.connect(self.port):
+                raise RuntimeError(f"Could not open {self.port}")
+            if not self.serial.wait_connected(self.connect_timeout):
+                self.serial.disconnect()
+                raise RuntimeError(f"{self.port} did not finish its handshake")
+        else:
+            self.serial.enable_mock_mode()
+
+        if self.serial.is_connected and not self.serial.mock_mode and self.rate > self.serial.max_send_rate:
+            print(f"Session rate {self.rate:g} Hz is over the link budget "
+                  f"({self.serial.max_send_rate:.0f} Hz) - expect refused frames")
+
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def set_angles(self, roll, pitch):
+        """
+        Hold a setpoint (replaces any queued trajectory; never blocks)
+
+        Args:
+            roll, pitch: Angles in degrees
+        """
+        with self._lock:
+            self._clear_queue()
+            if self._setpoint_fresh:
+                self.setpoints_superseded += 1
+            self._setpoint = (float(roll), float(pitch))
+            self._setpoint_fresh = True
+            self._stick = None
+
+    def set_stick(self, x, y):
+        """
+        Drive the platform like the stick does (replaces any queued trajectory)
+
+        The values go through the same control math as the controller, so
+        the session's engine settings (control mode, speed, curve, input
+        filter) apply; see ControlEngine.apply_settings().
+
+        Args:
+            x, y: Normalized stick values in [-1, 1]
+        """
+        with self._lock:
+            self._clear_queue()
+            self._stick = (float(x), float(y))
+
+    def submit(self, roll, pitch, rate=None):
+        """
+        Queue a trajectory behind anything already queued (never blocks)
+
+        Args:
+            roll, pitch: Equal-length arrays of angles in degrees
+            rate: Sample rate of the arrays in Hz (default: the session
+                  rate); other rates are resampled to the session rate
+
+        Returns:
+            Number of frames queued (at the session rate). Fewer than
+            submitted means the queue is full - submit the rest later.
+        """
+        frames = np.column_stack([np.asarray(roll, dtype=float), np.asarray(pitch, dtype=float)])
+        if rate is not None and rate != self.rate and len(frames) > 1:
+            duration = (len(frames) - 1) / rate
+            times = np.arange(0.0, duration + 0.5 / self.rate, 1.0 / self.rate)
+            source = np.arange(len(frames)) / rate
+            frames = np.column_stack([np.interp(times, source, frames[:, 0]),
+                                      np.interp(times, source, frames[:, 1])])
+
+        with self._lock:
+            free = self.capacity - self._queued
+            accepted = min(free, len(frames))
+            if accepted < len(frames):
+                self.frames_dropped += len(frames) - accepted
+            if accepted > 0:
+                self._chunks.append([frames[:accepted], 0])
+                self._queued += accepted
+                self._stick = None
+        return accepted
+
+    def cancel(self):
+        """Drop the queued trajectory; the platform holds its last command"""
+        with self._lock:
+            self._clear_queue()
+            self._setpoint = (self.roll, self.pitch)
+
+    def _clear_queue(self):
+        """Empty the trajectory queue (caller holds _lock)"""
+        self._chunks.clear()
+        self._queued = 0
+        self._drained.notify_all()
+
+    @property
+    def queued(self):
+        """Trajectory frames waiting to be sent"""
+        return self._queued
+
+    @property
+    def free(self):
+        """Trajectory frames submit() would accept right now"""
+        return self.capacity - self._queued
+
+    def backlog(self):
+        """Seconds until the queued trajectory has been sent"""
+        return self._queued / self.rate
+
+    def wait(self, timeout=None):
+        """
+        Block until the queued trajectory has been sent
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        with self._lock:
+            return self._drained.wait_for(lambda: self._queued == 0 or not self.running, timeout)
+
+    def set_max_angle(self, max_angle):
+        """Change the clamp limit (applies from the next frame)"""
+        self.max_angle = max(0.0, min(90.0, max_angle))
+        self.engine.max_angle = self.max_angle
+
+    def stats(self):
+        """
+        Backpressure and timing report
+
+        Returns:
+            Dict with frame counters, queue depth and capacity, the link's
+            state, budget and utilization, and the scheduler's lateness
+            statistics (milliseconds)
+        """
+        result = {
+            "frames_sent": self.frames_sent,
+            "frames_refused": self.frames_refused,
+            "frames_clamped": self.frames_clamped,
+            "frames_dropped": self.frames_dropped,
+            "setpoints_superseded": self.setpoints_superseded,
+            "queued": self._queued,
+            "capacity": self.capacity,
+            "backlog_s": self.backlog(),
+            "link_state": self.serial.link_state,
+            "link_budget_hz": self.serial.max_send_rate,
+            "link_utilization": self.serial.utilization,
+        }
+        result.update(self.scheduler.stats())
+        return result
+
+    def _next_command(self, dt):
+        """Pick this tick's roll/pitch (sender thread)"""
+        with self._lock:
+            if self._chunks:
+                chunk = self._chunks[0]
+                roll, pitch = chunk[0][chunk[1]]
+                chunk[1] += 1
+                if chunk[1] == len(chunk[0]):
+                    self._chunks.popleft()
+                self._queued -= 1
+                self._setpoint = (float(roll), float(pitch))  # Hold the last frame afterwards
+                if self._queued == 0:
+                    self._drained.notify_all()
+                return self._setpoint
+            stick = self._stick
+            self._setpoint_fresh = False
+            setpoint = self._setpoint
+        if stick is not None:
+            self.engine.max_angle = self.max_angle
+            return self.engine.step(stick[0], stick[1], dt)
+        return setpoint
+
+    def tick(self):
+        """Send one frame - called by the sender thread every period"""
+        now = time.perf_counter()
+        self.scheduler.start_frame(now)
+        dt = 1.0 / self.rate if self._last_tick is None else max(0.001, min(0.2, now - self._last_tick))
+        self._last_tick = now
+
+        roll, pitch = self._next_command(dt)
+        clamped_roll = clamp_angle(roll, self.max_angle)
+        clamped_pitch = clamp_angle(pitch, self.max_angle)
+        if clamped_roll != roll or clamped_pitch != pitch:
+            self.frames_clamped += 1
+        self.roll, self.pitch = clamped_roll, clamped_pitch
+
+        if self.output.send_command(clamped_roll, clamped_pitch):
+            self.frames_sent += 1
+        else:
+            self.frames_refused += 1
+
+    def _run(self):
+        """Sender thread: one tick per period on absolute deadlines"""
+        while self.running:
+            self.tick()
+            time.sleep(self.scheduler.next_delay() / 1000.0)
+
+    def close(self):
+        """Stop sending, level the platform and close the link"""
+        if self.running:
+            self.running = False
+            with self._lock:
+                self._drained.notify_all()
+            if self._thread is not None:
+                self._thread.join()
+        self.output.send_command(0.0, 0.0)
+        self.output.close()
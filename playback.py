@@ -0,0 +1,363 @@
+"""
+Trajectory playback - stream a precomputed roll/pitch path on exact timestamps
+
+For repeatable rig tests. A trajectory is either
+
+    - a CSV file with a header row "t,roll,pitch" (seconds, degrees), or
+    - a .npy file holding an (n, 3) float array of the same columns.
+
+.npy files are memory-mapped, so a trajectory of any length costs no
+memory up front. A CSV file is converted once into a cache next to it
+(path.csv -> path.csv.npy, so a user's own path.npy is never touched;
+rebuilt when the CSV is newer) and then mapped the same way.
+
+Every frame is sent at an absolute deadline, start + t / time_scale:
+the player sleeps until just before the deadline and spins the rest,
+so errors do not accumulate. The error of every frame (send time -
+deadline) is recorded; frames whose deadline passed while an earlier
+one was still being sent are skipped rather than sent late in a burst.
+Commands are clamped with the same limit as the stick - the max_angle
+of the ControllerMapper (or any object with max_angle) passed in.
+
+    python playback.py path.csv --port COM3
+    python playback.py path.npy --port COM3 --loop --time-scale 0.5
+    python playback.py path.csv --dry-run --timing timing.npy   # host timing only
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+from config import *
+from control_engine import clamp_angle
+
+
+TRAJECTORY_FIELDS = ["t", "roll", "pitch"]
+CONVERT_CHUNK = 65536  # CSV rows converted per chunk
+LATE_THRESHOLD = 0.001  # Frames sent more than this late (s) count as late
+
+
+def save_trajectory(path, t, roll, pitch):
+    """
+    Write a trajectory as .npy (by extension) or CSV
+
+    Args:
+        path: Output path
+        t: Timestamps in seconds (non-decreasing)
+        roll, pitch: Angles in degrees
+    """
+    frames = np.column_stack([np.asarray(t, dtype=float), np.asarray(roll, dtype=float),
+                              np.asarray(pitch, dtype=float)])
+    if path.endswith(".npy"):
+        np.save(path, frames)
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(TRAJECTORY_FIELDS)
+        for row in frames:
+            writer.writerow([f"{row[0]:.6f}", f"{row[1]:.3f}", f"{row[2]:.3f}"])
+
+
+def converted_path(path):
+    """Where the .npy conversion of a CSV trajectory is cached (path.csv -> path.csv.npy)"""
+    return path + ".npy"
+
+
+def convert_csv(path, target=None):
+    """
+    Convert a CSV trajectory into a .npy file, one chunk at a time
+
+    Args:
+        path: CSV with a "t,roll,pitch" header
+        target: Output path (default: converted_path(path))
+
+    Returns:
+        Path of the .npy file
+    """
+    target = target or converted_path(path)
+    with open(path, newline='') as f:
+        rows = sum(1 for _ in f) - 1
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        missing = [name for name in TRAJECTORY_FIELDS if name not in header]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+        columns = [header.index(name) for name in TRAJECTORY_FIELDS]
+
+        frames = np.lib.format.open_memmap(target + ".part", mode='w+', dtype=np.float64, shape=(rows, 3))
+        count = 0
+        chunk = np.empty((CONVERT_CHUNK, 3))
+        filled = 0
+        for row in reader:
+            if not row:
+                continue
+            chunk[filled] = [float(row[column]) for column in columns]
+            filled += 1
+            if filled == CONVERT_CHUNK:
+                frames[count:count + filled] = chunk
+                count += filled
+                filled = 0
+        frames[count:count + filled] = chunk[:filled]
+        count += filled
+        frames.flush()
+        del frames
+    if count != rows:
+        # Blank lines - rewrite with the real length
+        data = np.load(target + ".part", mmap_mode='r')[:count]
+        np.save(target, data)
+        del data
+        os.remove(target + ".part")
+    else:
+        os.replace(target + ".part", target)
+    return target
+
+
+def load_trajectory(path):
+    """
+    Open a trajectory without reading it into memory
+
+    Args:
+        path: .npy (n, 3) array or "t,roll,pitch" CSV
+
+    Returns:
+        Read-only memory-mapped (n, 3) float array of t, roll, pitch
+
+    Raises:
+        ValueError: If the file is not a usable trajectory
+    """
+    if not path.endswith(".npy"):
+        cached = converted_path(path)
+        modified = os.path.getmtime(path)
+        if not os.path.exists(cached) or os.path.getmtime(cached) < modified:
+            print(f"Converting {path} -> {cached}")
+            convert_csv(path, cached)
+        path = cached
+
+    frames = np.load(path, mmap_mode='r')
+    if frames.ndim != 2 or frames.shape[1] != 3 or len(frames) == 0:
+        raise ValueError(f"{path}: expected a non-empty (n, 3) array of t, roll, pitch")
+    for start in range(0, len(frames), CONVERT_CHUNK):
+        times = frames[max(0, start - 1):start + CONVERT_CHUNK, 0]
+        if np.any(np.diff(times) < 0):
+            raise ValueError(f"{path}: timestamps go backwards near frame {start}")
+    return frames
+
+
+class TrajectoryPlayer:
+    """Sends trajectory frames on absolute deadlines and records timing error"""
+
+    def __init__(self, trajectory, output, limits, time_scale=1.0, loop=False,
+                 spin=PLAYBACK_SPIN, clock=time.perf_counter):
+        """
+        Args:
+            trajectory: (n, 3) array of t, roll, pitch (e.g. from load_trajectory())
+            output: FanOut, SerialOutput or wrapper with send_command()
+            limits: Object whose max_angle clamps every frame (ControllerMapper,
+                    PlatformSession) - read per frame, so live changes apply
+            time_scale: Playback speed (2.0 = twice as fast)
+            loop: Start over after the last frame until stop()
+            spin: Seconds before each deadline to stop sleeping and spin
+            clock: Monotonic clock in seconds
+        """
+        if time_scale <= 0:
+            raise ValueError("time_scale must be positive")
+        self.trajectory = trajectory
+        self.output = output
+        self.limits = limits
+        self.time_scale = time_scale
+        self.loop = loop
+        self.spin = spin
+        self.clock = clock
+        self.running = False
+
+        # Pass length: last timestamp plus one average frame interval, so
+        # a loop does not send the last and first frames together
+        count = len(trajectory)
+        start, end = float(trajectory[0, 0]), float(trajectory[count - 1, 0])
+        interval = (end - start) / (count - 1) if count > 1 else 0.0
+        self.start_time = start
+        self.pass_duration = (end - start + interval) / time_scale
+
+        # Timing of the latest pass (NaN = skipped) and running totals
+        self.errors = np.full(count, np.nan)
+        self.passes = 0
+        self.frames_sent = 0
+        self.frames_refused = 0
+        self.frames_skipped = 0
+        self.frames_clamped = 0
+        self.late_frames = 0
+        self.max_error = 0.0
+        self._error_sum = 0.0
+
+    def play(self):
+        """
+        Play the trajectory (looping until stop() if loop is set)
+
+        Returns:
+            Dict from report()
+        """
+        self.running = True
+        trajectory = self.trajectory
+        count = len(trajectory)
+        scale = self.time_scale
+        clock = self.clock
+        epoch = clock()
+        try:
+            while self.running:
+                errors = self.errors
+                errors.fill(np.nan)
+                index = 0
+                while index < count and self.running:
+                    deadline = epoch + (float(trajectory[index, 0]) - self.start_time) / scale
+                    now = clock()
+                    remaining = deadline - now
+                    if remaining > self.spin:
+                        time.sleep(remaining - self.spin)
+                    while clock() < deadline:
+                        pass
+
+                    # Behind schedule: jump to the newest frame that is already due
+                    now = clock()
+                    newest = index
+                    while (newest + 1 < count
+                           and epoch + (float(trajectory[newest + 1, 0]) - self.start_time) / scale <= now):
+                        newest += 1
+                    if newest != index:
+                        self.frames_skipped += newest - index
+                        index = newest
+                        deadline = epoch + (float(trajectory[index, 0]) - self.start_time) / scale
+
+                    self.send(float(trajectory[index, 1]), float(trajectory[index, 2]))
+                    error = clock() - deadline
+                    errors[index] = error
+                    self._error_sum += error
+                    if error > self.max_error:
+                        self.max_error = error
+                    if error > LATE_THRESHOLD:
+                        self.late_frames += 1
+                    index += 1
+                if index == count:
+                    self.passes += 1
+                if not self.loop:
+                    break
+                epoch += self.pass_duration
+        finally:
+            self.running = False
+        return self.report()
+
+    def send(self, roll, pitch):
+        """Clamp one frame to the shared limit and send it"""
+        max_angle = self.limits.max_angle
+        clamped_roll = clamp_angle(roll, max_angle)
+        clamped_pitch = clamp_angle(pitch, max_angle)
+        if clamped_roll != roll or clamped_pitch != pitch:
+            self.frames_clamped += 1
+        if self.output.send_command(clamped_roll, clamped_pitch):
+            self.frames_sent += 1
+        else:
+            self.frames_refused += 1
+
+    def stop(self):
+        """Ask play() to return after the current frame (safe from any thread)"""
+        self.running = False
+
+    def report(self):
+        """
+        Timing and delivery summary
+
+        Returns:
+            Dict with frame counters, completed passes, and the timing error
+            (send time - deadline) mean/max over all frames plus p50/p99 of
+            the latest pass, in milliseconds
+        """
+        timed = self.frames_sent + self.frames_refused
+        result = {
+            "passes": self.passes,
+            "frames_sent": self.frames_sent,
+            "frames_refused": self.frames_refused,
+            "frames_skipped": self.frames_skipped,
+            "frames_clamped": self.frames_clamped,
+            "late_frames": self.late_frames,
+            "mean_error_ms": self._error_sum / timed * 1000 if timed else 0.0,
+            "max_error_ms": self.max_error * 1000,
+        }
+        errors = self.errors[~np.isnan(self.errors)]
+        if len(errors):
+            result["p50_error_ms"] = float(np.percentile(errors, 50)) * 1000
+            result["p99_error_ms"] = float(np.percentile(errors, 99)) * 1000
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a roll/pitch trajectory on exact timestamps")
+    parser.add_argument("path", help="Trajectory: .npy (n, 3) array or CSV with t,roll,pitch")
+    parser.add_argument("--port", help="Serial port (omit for Test Mode)")
+    parser.add_argument("--auto-connect", action="store_true", help="Probe ports for platform firmware")
+    parser.add_argument("--dry-run", action="store_true", help="Send nowhere - measure host timing only")
+    parser.add_argument("--loop", action="store_true", help="Repeat until Ctrl+C")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Playback speed (0.5 = half speed)")
+    parser.add_argument("--max-angle", type=float, default=DEFAULT_MAX_ANGLE, help="Clamp limit in degrees")
+    parser.add_argument("--timing", metavar="PATH", help="Save per-frame timing errors (s, NaN = skipped) as .npy")
+    args = parser.parse_args()
+
+    from controller_mapper import ControllerMapper
+    from output_sinks import FanOut, MemorySink
+    from serial_output import SerialOutput
+
+    try:
+        trajectory = load_trajectory(args.path)
+    except (OSError, ValueError) as e:
+        print(f"Cannot load trajectory: {e}")
+        return 1
+
+    # The stick's limit object, so playback clamps exactly like live control
+    controller = ControllerMapper(max_angle=args.max_angle)
+    serial_output = SerialOutput(baudrate=SERIAL_BAUDRATE, max_baudrate=SERIAL_MAX_BAUDRATE)
+    if args.dry_run:
+        output = FanOut([MemorySink(maxlen=1)])
+    else:
+        output = FanOut([serial_output])
+        if args.auto_connect:
+            if not serial_output.auto_connect(timeout=SERIAL_DETECT_TIMEOUT):
+                return 1
+        elif args.port:
+            if not serial_output.connect(args.port):
+                return 1
+            if not serial_output.wait_connected():
+                serial_output.disconnect()
+                return 1
+        else:
+            print("No --port given - running in test mode")
+            serial_output.enable_mock_mode()
+
+    player = TrajectoryPlayer(trajectory, output, controller, time_scale=args.time_scale, loop=args.loop)
+    duration = player.pass_duration
+    print(f"Playing {len(trajectory)} frames ({duration:.1f} s per pass{', looping' if args.loop else ''})")
+    try:
+        report = player.play()
+    except KeyboardInterrupt:
+        player.stop()
+        report = player.report()
+    finally:
+        output.send_command(0.0, 0.0)
+        output.close()
+
+    print(f"\nPasses {report['passes']}, sent {report['frames_sent']}, refused {report['frames_refused']}, "
+          f"skipped {report['frames_skipped']}, clamped {report['frames_clamped']}")
+    print(f"Timing error: mean {report['mean_error_ms']:.3f} ms, max {report['max_error_ms']:.3f} ms"
+          + (f", p50 {report['p50_error_ms']:.3f} ms, p99 {report['p99_error_ms']:.3f} ms"
+             if "p99_error_ms" in report else "")
+          + f", {report['late_frames']} frame(s) over {LATE_THRESHOLD * 1000:.0f} ms late")
+    if args.timing:
+        np.save(args.timing, player.errors)
+        print(f"Per-frame timing errors saved to {args.timing}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Background serial port discovery with hotplug detection
+
+serial.tools.list_ports.comports() can take hundreds of milliseconds on
+Linux with many tty devices, so it must not run on the Tk thread.
+PortWatcher polls a cheap signature of the attached devices (a sysfs or
+/dev directory listing) from a background thread and only runs the full
+enumeration when that signature changes. Consumers poll `version` and
+read the cached `ports` tuple - no locking needed.
+"""
+
+import collections
+import glob
+import os
+import sys
+import threading
+
+
+PortInfo = collections.namedtuple("PortInfo", "device description vid pid board")
+
+# USB VID/PID of common Arduino boards and USB-serial bridges; pid None = any
+ARDUINO_USB_IDS = {
+    (0x2341, None): "Arduino",
+    (0x2A03, None): "Arduino",
+    (0x1B4F, None): "SparkFun",
+    (0x239A, None): "Adafruit",
+    (0x1A86, 0x7523): "CH340",
+    (0x1A86, 0x55D4): "CH9102",
+    (0x0403, 0x6001): "FTDI",
+    (0x0403, 0x6015): "FTDI",
+    (0x10C4, 0xEA60): "CP210x",
+}
+
+
+def identify_board(vid, pid):
+    """
+    Name the board family for a USB VID/PID
+
+    Returns:
+        Board name, or None if the device does not look like an Arduino
+    """
+    if vid is None:
+        return None
+    return ARDUINO_USB_IDS.get((vid, pid)) or ARDUINO_USB_IDS.get((vid, None))
+
+
+def enumerate_ports():
+    """Full (slow) enumeration via pyserial"""
+    import serial.tools.list_ports
+
+    ports = []
+    for port in serial.tools.list_ports.comports():
+        ports.append(PortInfo(port.device, port.description, port.vid, port.pid,
+                              identify_board(port.vid, port.pid)))
+    return sorted(ports, key=lambda p: p.device)
+
+
+def device_signature():
+    """
+    Cheap fingerprint of attached serial devices
+
+    Returns:
+        Hashable signature, or None where no cheap source exists (the
+        caller then enumerates every poll)
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            # Only entries backed by real hardware have a "device" link
+            return frozenset(name for name in os.listdir("/sys/class/tty")
+                             if os.path.exists(f"/sys/class/tty/{name}/device"))
+        except OSError:
+            return None
+    if sys.platform == "darwin":
+        return frozenset(glob.glob("/dev/cu.*"))
+    return None
+
+
+class PortWatcher:
+    """Polls for serial port changes on a background thread"""
+
+    def __init__(self, interval=1.0, enumerate_func=enumerate_ports, signature_func=device_signature):
+        """
+        Args:
+            interval: Seconds between signature polls
+            enumerate_func: Returns a list of PortInfo (full enumeration)
+            signature_func: Returns a cheap device signature (or None)
+        """
+        self.interval = interval
+        self.enumerate_func = enumerate_func
+        self.signature_func = signature_func
+        self.ports = ()  # Cached PortInfo tuple, replaced atomically
+        self.new_boards = ()  # Arduino-like ports attached in the last change
+        self.version = 0  # Bumped whenever ports change
+        self._signature = None
+        self._force = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching (the first scan runs immediately in the background)"""
+        self._force.set()
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+
+    def rescan(self):
+        """Request a full enumeration on the next poll"""
+        self._force.set()
+
+    def _watch_loop(self):
+        while not self._stop.is_set():
+            forced = self._force.is_set()
+            self._force.clear()
+            try:
+                signature = self.signature_func()
+                if forced or signature is None or signature != self._signature:
+                    self._signature = signature
+                    self._update(self.enumerate_func())
+            except Exception as e:
+                print(f"Port scan failed: {e}")
+            self._force.wait(self.interval)
+
+    def _update(self, ports):
+        ports = tuple(ports)
+        if ports == self.ports and self.version:
+            return
+        known = {port.device for port in self.ports}
+        # The first scan reports everything as "new" only if it is a board
+        self.new_boards = tuple(port for port in ports
+                                if port.board and port.device not in known)
+        self.ports = ports
+        self.version += 1
+
+    def stop(self):
+        """Stop the watcher thread"""
+        self._stop.set()
+        self._force.set()
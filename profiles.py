@@ -0,0 +1,78 @@
+"""
+Settings profiles - save and load tuned controller settings as JSON
+
+A profile looks like:
+
+    {
+        "control": {"control_mode": ..., "control_speed": ..., ...},
+        "curve": {"type": "Exponential", "parameters": {"exponent": 2.0}},
+        "deadzone": 0.08
+    }
+
+Every section is optional; loading applies only what is present.
+"""
+
+import json
+
+from response_curves import create_curve
+
+
+PROFILE_VERSION = 1
+
+
+def make_profile(control=None, curve=None, deadzone=None, **extra):
+    """
+    Build a profile dict
+
+    Args:
+        control: Dict of ControlEngine settings
+        curve: ResponseCurve instance or dict with "type"/"parameters"
+        deadzone: Deadzone threshold
+        extra: Additional top-level entries (e.g. tuning metadata)
+
+    Returns:
+        Profile dict ready for save_profile()
+    """
+    profile = {"version": PROFILE_VERSION}
+    if control:
+        profile["control"] = dict(control)
+    if curve is not None:
+        profile["curve"] = curve if isinstance(curve, dict) else curve_to_dict(curve)
+    if deadzone is not None:
+        profile["deadzone"] = deadzone
+    profile.update(extra)
+    return profile
+
+
+def curve_to_dict(curve):
+    """Serialize a ResponseCurve instance"""
+    return {"type": curve.curve_type, "parameters": curve.get_parameters()}
+
+
+def curve_from_dict(data):
+    """Create a ResponseCurve instance from its serialized form"""
+    curve = create_curve(data.get("type", "Linear"))
+    for name, value in data.get("parameters", {}).items():
+        curve.set_parameter(name, value)
+    return curve
+
+
+def save_profile(path, profile):
+    """Write a profile dict to a JSON file"""
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+        f.write("\n")
+
+
+def load_profile(path):
+    """
+    Load a profile from a JSON file
+
+    Raises:
+        ValueError: If the file is not a profile
+    """
+    with open(path) as f:
+        profile = json.load(f)
+    if not isinstance(profile, dict):
+        raise ValueError(f"{path}: not a settings profile")
+    return profile
@@ -0,0 +1,209 @@
+"""
+Hot-path profiling for the update loop
+
+StageProfiler timestamps each stage of a frame with perf_counter_ns and
+keeps rolling per-stage stats for the on-canvas overlay. ProfileCapture
+records a cProfile or a stack-sampling profile of the GUI thread for a
+few seconds on demand and writes it to disk. StartupTimer splits the
+time from launch to the first control tick into phases.
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+
+
+class StageProfiler:
+    """Rolling per-stage timings for one loop"""
+
+    def __init__(self, window=100):
+        """
+        Args:
+            window: Number of frames kept for the rolling stats
+        """
+        self.window = window
+        self.stages = collections.OrderedDict()  # name -> deque of durations (ns)
+        self.frames = collections.deque(maxlen=window)
+        self._frame_start = 0
+        self._last = 0
+
+    def begin(self):
+        """Mark the start of a frame"""
+        self._frame_start = self._last = time.perf_counter_ns()
+
+    def mark(self, stage):
+        """Close the current stage - time since the previous mark is charged to it"""
+        now = time.perf_counter_ns()
+        samples = self.stages.get(stage)
+        if samples is None:
+            samples = self.stages[stage] = collections.deque(maxlen=self.window)
+        samples.append(now - self._last)
+        self._last = now
+
+    def end(self):
+        """Mark the end of a frame"""
+        self.frames.append(time.perf_counter_ns() - self._frame_start)
+
+    def stats(self):
+        """
+        Rolling stats per stage
+
+        Returns:
+            List of (stage, mean_ms, max_ms) including a final "frame" entry
+        """
+        result = []
+        for name, samples in list(self.stages.items()) + [("frame", self.frames)]:
+            if samples:
+                values = list(samples)
+                result.append((name, sum(values) / len(values) / 1e6, max(values) / 1e6))
+        return result
+
+    def format_overlay(self, budget_ms=None):
+        """Text block for the canvas overlay"""
+        lines = [f"{'stage':<8}{'mean':>7}{'max':>7} ms"]
+        for name, mean_ms, max_ms in self.stats():
+            lines.append(f"{name:<8}{mean_ms:>7.2f}{max_ms:>7.2f}")
+        if budget_ms is not None:
+            lines.append(f"budget  {budget_ms:>7.1f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        self.stages.clear()
+        self.frames.clear()
+
+
+class ProfileCapture:
+    """
+    On-demand profile of the GUI thread
+
+    Two flavours:
+        cprofile - deterministic, exact call counts, slows the loop down
+        sampling - samples the GUI thread's stack from a helper thread every
+                   interval; low overhead, writes collapsed stacks that
+                   flamegraph tools understand
+    """
+
+    def __init__(self, duration=5.0, sample_interval=0.005):
+        self.duration = duration
+        self.sample_interval = sample_interval
+        self.active = None  # "cprofile", "sampling" or None
+        self._profile = None
+        self._deadline = 0.0
+        self._target_thread = None
+
+    def start_cprofile(self):
+        """Start a cProfile capture (call from the thread to profile)"""
+        if self.active:
+            return False
+        import cProfile
+
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self._deadline = time.monotonic() + self.duration
+        self.active = "cprofile"
+        print(f"Profiling update loop with cProfile for {self.duration:.0f}s...")
+        return True
+
+    def start_sampling(self):
+        """Start a sampling capture of the calling thread"""
+        if self.active:
+            return False
+        self.active = "sampling"
+        self._target_thread = threading.get_ident()
+        threading.Thread(target=self._sample_loop, daemon=True).start()
+        print(f"Sampling update loop for {self.duration:.0f}s...")
+        return True
+
+    def poll(self):
+        """Finish a cProfile capture once its time is up - call every frame"""
+        if self.active == "cprofile" and time.monotonic() >= self._deadline:
+            import io
+            import pstats
+
+            self._profile.disable()
+            path = f"profile_{time.strftime('%Y%m%d_%H%M%S')}.prof"
+            self._profile.dump_stats(path)
+
+            summary = io.StringIO()
+            pstats.Stats(self._profile, stream=summary).sort_stats("cumulative").print_stats(15)
+            print(summary.getvalue())
+            print(f"cProfile written to {path} (view with: python -m pstats {path})")
+            self._profile = None
+            self.active = None
+
+    def _sample_loop(self):
+        counts = collections.Counter()
+        deadline = time.monotonic() + self.duration
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self._target_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                counts[";".join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+
+        path = f"profile_{time.strftime('%Y%m%d_%H%M%S')}.folded"
+        with open(path, 'w') as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Sampling profile ({sum(counts.values())} samples) written to {path}")
+        self.active = None
+
+
+class StartupTimer:
+    """
+    Time from launch to the first control tick, split into phases
+
+    main.py creates it before its heavy imports; setup code calls mark()
+    after each phase and the control loop calls first_tick() once.
+    """
+
+    def __init__(self, start=None, report=False, exit_after=False):
+        """
+        Args:
+            start: perf_counter() value at launch (default: now)
+            report: Print the phase breakdown at the first tick
+            exit_after: Ask the app to exit right after the first tick
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.report = report
+        self.exit_after = exit_after
+        self.marks = []  # (phase, perf_counter) in order
+        self.done = False
+
+    def mark(self, phase):
+        """Close a phase - time since the previous mark is charged to it"""
+        self.marks.append((phase, time.perf_counter()))
+
+    def first_tick(self):
+        """Record the first control tick (later calls are ignored)"""
+        if self.done:
+            return
+        self.done = True
+        self.mark("first tick")
+        if self.report:
+            print(self.format_report())
+
+    def total_ms(self):
+        """Launch to the last mark in milliseconds"""
+        if not self.marks:
+            return 0.0
+        return (self.marks[-1][1] - self.start) * 1000.0
+
+    def format_report(self, target_ms=None):
+        """Phase breakdown as text"""
+        lines = ["Startup:"]
+        previous = self.start
+        for phase, when in self.marks:
+            lines.append(f"  {phase:<14}{(when - previous) * 1000.0:>7.1f} ms")
+            previous = when
+        total = f"  {'total':<14}{self.total_ms():>7.1f} ms"
+        if target_ms is not None:
+            total += f"  (target {target_ms:.0f} ms)"
+        lines.append(total)
+        return "\n".join(lines)
@@ -0,0 +1,133 @@
+"""
+Recorded and synthetic stick input sessions for offline analysis
+
+A session is a CSV file with a header row and one row per controller
+sample:
+
+    t,x,y[,target_roll,target_pitch]
+
+t is the timestamp in seconds, x/y are normalized stick values as
+returned by ControllerMapper.get_normalized_values(), and the optional
+target columns hold the angles the operator was trying to reach.
+"""
+
+import csv
+import math
+import random
+
+
+SESSION_FIELDS = ["t", "x", "y", "target_roll", "target_pitch"]
+
+
+def _parse_row(row, has_targets):
+    """Convert one CSV dict row to a sample tuple"""
+    t = float(row["t"])
+    x = float(row["x"])
+    y = float(row["y"])
+    if has_targets and row["target_roll"] and row["target_pitch"]:
+        return t, x, y, float(row["target_roll"]), float(row["target_pitch"])
+    return t, x, y, None, None
+
+
+def iter_session(path):
+    """
+    Iterate over the samples of a recorded session
+
+    Args:
+        path: Path to session CSV file
+
+    Yields:
+        Tuples of (t, x, y, target_roll, target_pitch); targets are None
+        when the recording has no target columns
+    """
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [name for name in ("t", "x", "y") if name not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+        has_targets = "target_roll" in reader.fieldnames and "target_pitch" in reader.fieldnames
+        for row in reader:
+            yield _parse_row(row, has_targets)
+
+
+def iter_session_chunks(path, chunk_size=4096):
+    """
+    Iterate over a recorded session in fixed-size chunks
+
+    Only one chunk is held in memory at a time, so arbitrarily long
+    recordings can be processed with bounded memory.
+
+    Args:
+        path: Path to session CSV file
+        chunk_size: Maximum number of samples per chunk
+
+    Yields:
+        Tuples of (t, x, y) lists, each at most chunk_size long
+    """
+    ts, xs, ys = [], [], []
+    for t, x, y, _, _ in iter_session(path):
+        ts.append(t)
+        xs.append(x)
+        ys.append(y)
+        if len(ts) >= chunk_size:
+            yield ts, xs, ys
+            ts, xs, ys = [], [], []
+    if ts:
+        yield ts, xs, ys
+
+
+def load_session(path):
+    """Load a whole recorded session into a list of sample tuples"""
+    return list(iter_session(path))
+
+
+def save_session(path, samples):
+    """
+    Write samples to a session CSV file
+
+    Args:
+        path: Output path
+        samples: Iterable of (t, x, y, target_roll, target_pitch) tuples
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(SESSION_FIELDS)
+        for t, x, y, target_roll, target_pitch in samples:
+            writer.writerow([f"{t:.4f}", f"{x:.5f}", f"{y:.5f}",
+                             "" if target_roll is None else f"{target_roll:.3f}",
+                             "" if target_pitch is None else f"{target_pitch:.3f}"])
+
+
+def synthetic_session(duration=20.0, rate=60.0, max_angle=20.0, hold_time=2.0, seed=0):
+    """
+    Generate a synthetic tracking session
+
+    The target angles step to a new random setpoint every hold_time
+    seconds with a slow sine drift on top, which exercises both the
+    start-up acceleration and the settling behaviour of a controller.
+    Stick columns are zero - a pilot model is expected to generate them
+    in closed loop.
+
+    Args:
+        duration: Session length in seconds
+        rate: Sample rate in Hz
+        max_angle: Largest target angle in degrees
+        hold_time: Seconds between target steps
+        seed: Random seed (sessions are reproducible)
+
+    Returns:
+        List of (t, x, y, target_roll, target_pitch) tuples
+    """
+    rng = random.Random(seed)
+    samples = []
+    roll_step = pitch_step = 0.0
+    next_step = 0.0
+    for i in range(int(duration * rate)):
+        t = i / rate
+        if t >= next_step:
+            roll_step = rng.uniform(-max_angle, max_angle) * 0.8
+            pitch_step = rng.uniform(-max_angle, max_angle) * 0.8
+            next_step += hold_time
+        drift = 0.2 * max_angle * math.sin(2 * math.pi * 0.1 * t)
+        samples.append((t, 0.0, 0.0, roll_step + drift, pitch_step - drift))
+    return samples
@@ -2,6 +2,7 @@
 Response curve system for transforming controller input
 """
 
+import bisect
 import math
 import time
 
@@ -9,6 +10,8 @@ import time
 class ResponseCurve:
     """Base class for response curves"""
 
+    curve_type = None  # Name used in config.CURVE_TYPES
+
     def apply(self, value):
         """
         Apply the curve transformation to a normalized value
@@ -21,6 +24,41 @@ class ResponseCurve:
         """
         raise NotImplementedError
 
+    def apply_batch(self, values, times=None):
+        """
+        Apply the curve to an array of values in one call
+
+        Subclasses override this with vectorized NumPy forms; the default
+        falls back to calling apply() per value.
+
+        Args:
+            values: Sequence or array of input values in range [-1, 1]
+            times: Optional sample timestamps in seconds (only used by
+                   stateful curves)
+
+        Returns:
+            NumPy array of transformed values
+        """
+        import numpy as np
+
+        return np.array([self.apply(float(v)) for v in values], dtype=float)
+
+    def sample(self, count=65):
+        """
+        Sample the curve shape for plotting
+
+        Args:
+            count: Number of evenly spaced points from -1 to 1
+
+        Returns:
+            List of (input, output) tuples
+        """
+        points = []
+        for i in range(count):
+            value = -1.0 + 2.0 * i / (count - 1)
+            points.append((value, self.apply(value)))
+        return points
+
     def get_parameters(self):
         """Return dict of parameter names and current values"""
         return {}
@@ -37,13 +75,22 @@ class ResponseCurve:
 class LinearCurve(ResponseCurve):
     """Direct linear mapping - no transformation"""
 
+    curve_type = "Linear"
+
     def apply(self, value):
         return value
 
+    def apply_batch(self, values, times=None):
+        import numpy as np
+
+        return np.array(values, dtype=float)
+
 
 class ExponentialCurve(ResponseCurve):
     """Exponential curve for more precise center control"""
 
+    curve_type = "Exponential"
+
     def __init__(self, exponent=2.0):
         self.exponent = exponent
 
@@ -53,6 +100,12 @@ class ExponentialCurve(ResponseCurve):
             return 0
         return math.copysign(abs(value) ** self.exponent, value)
 
+    def apply_batch(self, values, times=None):
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        return np.copysign(np.abs(values) ** self.exponent, values)
+
     def get_parameters(self):
         return {"exponent": self.exponent}
 
@@ -64,26 +117,44 @@ class ExponentialCurve(ResponseCurve):
 class EaseInCurve(ResponseCurve):
     """Ease-in curve - slow start, fast end"""
 
+    curve_type = "Ease-In"
+
     def apply(self, value):
         """Quadratic ease-in"""
         sign = 1 if value >= 0 else -1
         normalized = abs(value)
         return sign * (normalized ** 2)
 
+    def apply_batch(self, values, times=None):
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        return np.sign(values) * values ** 2
+
 
 class EaseOutCurve(ResponseCurve):
     """Ease-out curve - fast start, slow end"""
 
+    curve_type = "Ease-Out"
+
     def apply(self, value):
         """Quadratic ease-out"""
         sign = 1 if value >= 0 else -1
         normalized = abs(value)
         return sign * (1 - (1 - normalized) ** 2)
 
+    def apply_batch(self, values, times=None):
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        return np.sign(values) * (1 - (1 - np.abs(values)) ** 2)
+
 
 class EaseInOutCurve(ResponseCurve):
     """Ease-in-out curve - slow at both ends"""
 
+    curve_type = "Ease-In-Out"
+
     def apply(self, value):
         """Cubic ease-in-out"""
         sign = 1 if value >= 0 else -1
@@ -94,19 +165,32 @@ class EaseInOutCurve(ResponseCurve):
         else:
             return sign * (1 - ((-2 * normalized + 2) ** 3) / 2)
 
+    def apply_batch(self, values, times=None):
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        normalized = np.abs(values)
+        result = np.where(normalized < 0.5,
+                          4 * normalized ** 3,
+                          1 - ((-2 * normalized + 2) ** 3) / 2)
+        return np.sign(values) * result
+
 
 class VelocityBasedCurve(ResponseCurve):
     """Velocity-limited curve with inertia simulation"""
 
-    def __init__(self, max_velocity=100.0, acceleration=200.0):
+    curve_type = "Velocity-Based"
+
+    def __init__(self, max_velocity=100.0, acceleration=200.0, clock=time.time):
         self.max_velocity = max_velocity  # degrees per second
         self.acceleration = acceleration  # degrees per second squared
         self.current_output = 0.0
         self.last_time = None
+        self.clock = clock  # Replaceable for offline simulation
 
     def apply(self, value):
         """Apply velocity limiting"""
-        current_time = time.time()
+        current_time = self.clock()
 
         # Initialize on first call
         if self.last_time is None:
@@ -138,6 +222,34 @@ class VelocityBasedCurve(ResponseCurve):
 
         return self.current_output
 
+    def apply_batch(self, values, times=None):
+        """
+        Apply velocity limiting to a sequence of samples
+
+        The output depends on the previous sample, so this runs the
+        recurrence sample by sample using the supplied timestamps in
+        place of the clock. State carries over between calls, so a long
+        recording can be processed in consecutive chunks.
+        """
+        import numpy as np
+
+        if times is None:
+            return super().apply_batch(values)
+
+        clock = self.clock
+        output = np.empty(len(values), dtype=float)
+        try:
+            for i, (value, t) in enumerate(zip(values, times)):
+                self.clock = lambda t=t: t
+                output[i] = self.apply(float(value))
+        finally:
+            self.clock = clock
+        return output
+
+    def sample(self, count=65):
+        """Steady-state shape - output settles on the input"""
+        return [(v, v) for v in (-1.0 + 2.0 * i / (count - 1) for i in range(count))]
+
     def get_parameters(self):
         return {
             "max_velocity": self.max_velocity,
@@ -159,6 +271,8 @@ class VelocityBasedCurve(ResponseCurve):
 class CustomPowerCurve(ResponseCurve):
     """Custom power curve with adjustable S-curve characteristics"""
 
+    curve_type = "Custom Power"
+
     def __init__(self, curve_strength=1.5, center_bias=0.5):
         self.curve_strength = curve_strength  # 1.0 = linear, higher = more S-curve
         self.center_bias = center_bias  # 0.5 = symmetric, <0.5 = more at start, >0.5 = more at end
@@ -183,6 +297,17 @@ class CustomPowerCurve(ResponseCurve):
 
         return sign * result
 
+    def apply_batch(self, values, times=None):
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        normalized = np.abs(values)
+        bias = self.center_bias
+        lower = bias * (np.minimum(normalized, bias) / bias) ** self.curve_strength
+        upper_t = np.maximum(normalized - bias, 0.0) / (1.0 - bias)
+        upper = bias + (1.0 - bias) * upper_t ** (1.0 / self.curve_strength)
+        return np.sign(values) * np.where(normalized < bias, lower, upper)
+
     def get_parameters(self):
         return {
             "curve_strength": self.curve_strength,
@@ -196,6 +321,201 @@ class CustomPowerCurve(ResponseCurve):
             self.center_bias = max(0.1, min(0.9, value))
 
 
+def _initial_slope(deltas, i):
+    """Fritsch-Carlson starting slope at knot i"""
+    if i == 0:
+        return deltas[0]
+    if i == len(deltas):
+        return deltas[-1]
+    if deltas[i - 1] * deltas[i] <= 0:
+        return 0.0  # Local extremum or flat segment
+    return (deltas[i - 1] + deltas[i]) / 2.0
+
+
+def _segment_scale(deltas, k):
+    """Slope scale that keeps segment k monotone (1.0 = no limiting)"""
+    d = deltas[k]
+    if d == 0:
+        return 1.0
+    a = _initial_slope(deltas, k) / d
+    b = _initial_slope(deltas, k + 1) / d
+    r = a * a + b * b
+    return 3.0 / math.sqrt(r) if r > 9.0 else 1.0
+
+
+def monotone_slope(deltas, i):
+    """
+    Fritsch-Carlson slope at knot i of a monotone cubic
+
+    The slope is limited by its two neighbouring segments only, so it
+    depends on segments i-2..i+1 - a moved knot changes few slopes.
+
+    Args:
+        deltas: Secant slope of every segment
+        i: Knot index (0 .. len(deltas))
+    """
+    scale = 1.0
+    if i > 0:
+        scale = min(scale, _segment_scale(deltas, i - 1))
+    if i < len(deltas):
+        scale = min(scale, _segment_scale(deltas, i))
+    return _initial_slope(deltas, i) * scale
+
+
+class MonotoneSplineCurve(ResponseCurve):
+    """
+    User-defined curve through control points (monotone cubic spline)
+
+    Control points cover the positive half [0, 1] and the curve is
+    mirrored for negative input like the other curves. Interpolation uses
+    Fritsch-Carlson slopes, so the curve never overshoots between points
+    and stays monotone as long as the points rise - set_point() keeps each
+    output between its neighbours' so an edit cannot make more stick give
+    less tilt. Each point's slope is
+    limited by its two neighbouring segments only, which keeps an edit
+    local: moving one point recomputes at most the six segments around it.
+    """
+
+    curve_type = "Spline"
+
+    DEFAULT_POINTS = [(0.0, 0.0), (0.25, 0.1), (0.5, 0.3), (0.75, 0.6), (1.0, 1.0)]
+
+    def __init__(self, points=None):
+        self._set_points(points or self.DEFAULT_POINTS)
+
+    def _set_points(self, points):
+        """
+        Replace all control points and recompute every segment
+
+        Raises:
+            ValueError: If there are fewer than two points, an input is
+                        outside [0, 1] or two points share an input
+        """
+        points = sorted((float(x), float(y)) for x, y in points)
+        if len(points) < 2:
+            raise ValueError("Spline curve needs at least two control points")
+        if points[0][0] < 0.0 or points[-1][0] > 1.0:
+            raise ValueError("Spline control point inputs must be in [0, 1]")
+        for (x0, _), (x1, _) in zip(points, points[1:]):
+            if x1 == x0:
+                raise ValueError(f"Two spline control points at input {x0:g}")
+        # Start at the origin and end at x=1 so the mirrored curve is continuous
+        if points[0][0] > 0.0:
+            points.insert(0, (0.0, 0.0))
+        else:
+            points[0] = (0.0, 0.0)
+        points[-1] = (1.0, points[-1][1])
+        self.xs = [x for x, _ in points]
+        self.ys = [max(0.0, min(1.0, y)) for _, y in points]
+        n = len(self.xs)
+        self.deltas = [0.0] * (n - 1)
+        self.slopes = [0.0] * n
+        self.c2 = [0.0] * (n - 1)
+        self.c3 = [0.0] * (n - 1)
+        self._arrays = None
+        self._update_segments(0, n - 2)
+
+    def _update_segments(self, first, last):
+        """
+        Recompute slopes and coefficients after points first..last+1 changed
+
+        Args:
+            first: Index of the first segment whose end points moved
+            last: Index of the last segment whose end points moved
+        """
+        xs, ys = self.xs, self.ys
+        count = len(xs) - 1  # Number of segments
+        first = max(0, first)
+        last = min(count - 1, last)
+
+        # Secant slopes of the changed segments
+        for k in range(first, last + 1):
+            self.deltas[k] = (ys[k + 1] - ys[k]) / (xs[k + 1] - xs[k])
+
+        # Slopes of points touching a changed segment depend on segments k-2..k+1
+        for i in range(max(0, first - 1), min(count, last + 2) + 1):
+            self.slopes[i] = monotone_slope(self.deltas, i)
+
+        # Coefficients of segments touching a changed slope
+        for k in range(max(0, first - 2), min(count - 1, last + 2) + 1):
+            h = xs[k + 1] - xs[k]
+            m0, m1, d = self.slopes[k], self.slopes[k + 1], self.deltas[k]
+            self.c2[k] = (3 * d - 2 * m0 - m1) / h
+            self.c3[k] = (m0 + m1 - 2 * d) / (h * h)
+
+        self._arrays = None
+
+    def _evaluate(self, normalized):
+        """Evaluate the spline for input in [0, 1]"""
+        k = bisect.bisect_right(self.xs, normalized) - 1
+        k = max(0, min(len(self.xs) - 2, k))
+        t = normalized - self.xs[k]
+        return self.ys[k] + t * (self.slopes[k] + t * (self.c2[k] + t * self.c3[k]))
+
+    def apply(self, value):
+        """Apply spline curve"""
+        if value == 0:
+            return 0
+        result = self._evaluate(min(1.0, abs(value)))
+        return math.copysign(result, value)
+
+    def apply_batch(self, values, times=None):
+        import numpy as np
+
+        if self._arrays is None:
+            self._arrays = tuple(np.array(a, dtype=float)
+                                 for a in (self.xs, self.ys, self.slopes, self.c2, self.c3))
+        xs, ys, slopes, c2, c3 = self._arrays
+
+        values = np.asarray(values, dtype=float)
+        normalized = np.minimum(np.abs(values), 1.0)
+        k = np.clip(np.searchsorted(xs, normalized, side='right') - 1, 0, len(xs) - 2)
+        t = normalized - xs[k]
+        result = ys[k] + t * (slopes[k] + t * (c2[k] + t * c3[k]))
+        return np.sign(values) * result
+
+    def get_points(self):
+        """Return control points as a list of [x, y] pairs"""
+        return [[x, y] for x, y in zip(self.xs, self.ys)]
+
+    def set_point(self, index, x=None, y=None):
+        """
+        Move one control point, recomputing only the affected segments
+
+        Args:
+            index: Point index (the end points can only move vertically,
+                   and the first point is fixed at the origin)
+            x: New input position, kept between the neighbouring points
+            y: New output value in range [0, 1], kept between the
+               neighbouring points' outputs so the curve stays monotone
+        """
+        last = len(self.xs) - 1
+        if not 0 <= index <= last:
+            raise IndexError(f"No control point {index}")
+        if y is not None and index > 0:
+            upper = self.ys[index + 1] if index < last else 1.0
+            self.ys[index] = max(self.ys[index - 1], min(upper, float(y)))
+        if x is not None and 0 < index < last:
+            gap = 1e-3
+            self.xs[index] = max(self.xs[index - 1] + gap, min(self.xs[index + 1] - gap, float(x)))
+        self._update_segments(index - 1, index)
+
+    def get_parameters(self):
+        return {"points": self.get_points()}
+
+    def set_parameter(self, name, value):
+        if name == "points":
+            self._set_points(value)
+        elif name.startswith("point_"):
+            # "point_<i>" sets the output value of one control point
+            try:
+                index = int(name[len("point_"):])
+            except ValueError:
+                return
+            if 0 < index < len(self.xs):
+                self.set_point(index, y=value)
+
+
 def create_curve(curve_type):
     """Factory function to create curve instances"""
     curves = {
@@ -205,7 +525,8 @@ def create_curve(curve_type):
         "Ease-Out": EaseOutCurve,
         "Ease-In-Out": EaseInOutCurve,
         "Velocity-Based": VelocityBasedCurve,
-        "Custom Power": CustomPowerCurve
+        "Custom Power": CustomPowerCurve,
+        "Spline": MonotoneSplineCurve
     }
 
     curve_class = curves.get(curve_type, LinearCurve)
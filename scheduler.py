@@ -0,0 +1,84 @@
+"""
+Drift-free frame scheduling for the Tk update loop
+
+root.after(period) after a frame's work makes the real period
+"period + work time", so the loop drifts. FrameScheduler instead keeps
+absolute deadlines on perf_counter: each frame is re-armed with only the
+time left until its deadline, and if a frame ran so late that deadlines
+were missed, those frames are skipped rather than queued back-to-back.
+"""
+
+import collections
+import math
+import time
+
+
+class FrameScheduler:
+    """Absolute-deadline scheduler with period jitter statistics"""
+
+    def __init__(self, rate, window=200, clock=time.perf_counter):
+        """
+        Args:
+            rate: Frame rate in Hz
+            window: Number of frames kept for jitter percentiles
+            clock: Monotonic clock in seconds
+        """
+        self.period = 1.0 / rate
+        self.clock = clock
+        self.deadline = None  # When the current frame was due
+        self.last_start = None
+        self.frames = 0
+        self.skipped = 0
+        self.lateness = collections.deque(maxlen=window)  # Start time - deadline (s)
+        self.periods = collections.deque(maxlen=window)  # Actual start-to-start (s)
+
+    def set_rate(self, rate):
+        """Change the frame rate from the next frame on"""
+        self.period = 1.0 / rate
+
+    def start_frame(self, now=None):
+        """Record the start of a frame - call first thing in the frame"""
+        now = self.clock() if now is None else now
+        if self.deadline is None:
+            self.deadline = now
+        self.lateness.append(now - self.deadline)
+        if self.last_start is not None:
+            self.periods.append(now - self.last_start)
+        self.last_start = now
+        self.frames += 1
+
+    def next_delay(self, now=None):
+        """
+        Advance to the next deadline - call last thing in the frame
+
+        Returns:
+            Delay in whole milliseconds to pass to root.after()
+        """
+        now = self.clock() if now is None else now
+        self.deadline += self.period
+        if now > self.deadline:
+            # Missed one or more deadlines - skip to the next one still ahead
+            missed = math.floor((now - self.deadline) / self.period) + 1
+            self.deadline += missed * self.period
+            self.skipped += missed
+        return max(0, int((self.deadline - now) * 1000))
+
+    def stats(self):
+        """
+        Jitter statistics over the recent window
+
+        Returns:
+            Dict with frames, skipped, mean/max/p99 lateness and mean/max
+            period deviation, all times in milliseconds
+        """
+        lateness = sorted(self.lateness)
+        deviations = [abs(p - self.period) for p in self.periods]
+        result = {"frames": self.frames, "skipped": self.skipped}
+        if lateness:
+            result["mean_late_ms"] = sum(lateness) / len(lateness) * 1000
+            result["max_late_ms"] = lateness[-1] * 1000
+            result["p99_late_ms"] = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))] * 1000
+        if deviations:
+            result["mean_jitter_ms"] = sum(deviations) / len(deviations) * 1000
+            result["max_jitter_ms"] = max(deviations) * 1000
+        return result
@@ -1,20 +1,139 @@
 """
 Serial communication module for Arduino platform control
+
+A lost link (unplugged cable, board reset) is recovered in the
+background: write() never blocks on reopening the port. While the link
+is down only the latest command is kept, and it is resent as soon as the
+port is back.
+
+Every connection starts at the base baud rate. Once the firmware answers
+the identify request it is asked to switch to the fastest rate both
+sides support, and the send rate is clamped to what the link can carry.
+
+With a target rate set, firmware that speaks protocol 3 is sent timed
+targets instead of every frame: at most target_rate frames per second,
+each carrying the time the servos should arrive, and the sketch
+interpolates between them at its servo refresh rate.
+
+pyserial is imported when a port is first opened, so startup and Test
+Mode never load it. serial.SerialException is an OSError, which is what
+the paths that run on an open connection catch.
 """
 
-import serial
-import serial.tools.list_ports
+import collections
+import random
+import threading
+import time
+
+from output_sinks import OutputSink, add_arrival_time, encode_command, encode_servo_frame
+
+
+# Auto-detection handshake: the host sends IDENTIFY_REQUEST and the sketch
+# answers with a line "PLATFORM,<sketch>,<protocol version>[,<max baud>]"
+IDENTIFY_REQUEST = b"?\n"
+FIRMWARE_SIGNATURE = "PLATFORM"
+IDENTIFY_INTERVAL = 0.25  # Seconds between identify requests while probing
+
+# Baud negotiation: the host sends "B<baud>\n", the sketch answers
+# "BAUD,<baud>" at the old rate and switches. If nothing valid arrives at
+# the new rate within BAUD_REVERT_TIME the sketch falls back on its own.
+BAUD_RATES = (1000000, 250000, 115200)  # Tried fastest first
+BAUD_REVERT_TIME = 1.0
+BITS_PER_BYTE = 10  # 8N1: start + 8 data + stop
+
+INTERPOLATION_PROTOCOL = 3  # First protocol version that accepts <roll,pitch@ms> frames
+
+DetectedDevice = collections.namedtuple("DetectedDevice", "port firmware connection")
+
+
+def link_budget(baudrate, frame_size):
+    """
+    Frames per second a serial link can carry
+
+    Args:
+        baudrate: Line rate in bits per second
+        frame_size: Bytes per command frame
+
+    Returns:
+        Maximum sustained frame rate in Hz
+    """
+    return baudrate / BITS_PER_BYTE / frame_size
+
+
+def parse_identify(line):
+    """
+    Parse a firmware identify reply
+
+    Args:
+        line: One line read from the port (bytes or str)
+
+    Returns:
+        Dict with "sketch", "version" and "max_baud" (None if the sketch
+        cannot change baud rate), or None if not a signature line
+    """
+    if isinstance(line, bytes):
+        line = line.decode('ascii', 'replace')
+    fields = line.strip().split(',')
+    if len(fields) < 3 or fields[0] != FIRMWARE_SIGNATURE:
+        return None
+    max_baud = int(fields[3]) if len(fields) > 3 and fields[3].isdigit() else None
+    return {"sketch": fields[1], "version": fields[2], "max_baud": max_baud}
 
 
-class SerialOutput:
+class SerialOutput(OutputSink):
     """Handles serial communication with Arduino"""
 
-    def __init__(self, port=None, baudrate=9600):
+    name = "serial"
+
+    def __init__(self, port=None, baudrate=9600, max_baudrate=1000000, target_rate=None):
+        """
+        Args:
+            port: Default port name
+            baudrate: Base rate every connection starts at
+            max_baudrate: Upper limit for baud negotiation
+            target_rate: Timed targets per second for interpolating firmware
+                         (None sends every frame as it comes)
+        """
         self.port = port
         self.baudrate = baudrate
+        self.max_baudrate = max_baudrate
         self.serial_connection = None
         self.is_connected = False
         self.mock_mode = False
+        self.metrics = None  # Optional metrics.SerialStats
+
+        # Supervised reconnect
+        self.auto_reconnect = True
+        self.reconnect_delay = 0.25  # First retry delay (s), doubled per failure
+        self.max_reconnect_delay = 5.0
+        self.identify_timeout = 3.0  # Wait for the board to come out of reset (s)
+        self.link_state = "disconnected"  # "connected", "handshake", "reconnecting" or "disconnected"
+        self.state_version = 0  # Bumped on every state change (polled by the GUI)
+        self.reconnect_attempts = 0
+        self._pending = None  # Latest frame not delivered while the link is down
+        self._last_frame = None  # Latest frame given to write() - its format picks the neutral frame
+        self._lock = threading.Lock()  # Serializes reconnect hand-over against disconnect()
+        self._reconnect_stop = threading.Event()
+
+        # Link budget
+        self.link_headroom = 0.8  # Fraction of the line rate commands may use
+        self.frame_size = len(encode_command(-90.0, -90.0))  # Largest frame seen (bytes)
+        self.link_baudrate = baudrate
+        self.max_send_rate = 0.0  # Hz, set by _update_budget()
+        self.utilization = 0.0  # Fraction of the line rate used over the last second
+        self._min_interval = 0.0
+        self._last_write = 0.0
+        self._window_start = 0.0
+        self._window_bytes = 0
+        self._update_budget(baudrate)
+
+        # Timed targets (protocol 3 firmware interpolates between them)
+        self.target_rate = target_rate
+        self.firmware = None  # Dict from parse_identify() for the current link
+        self.timed_frames = False
+        self.arrival_ms = int(round(1000.0 / target_rate)) if target_rate else 0
+        self._target_interval = 1.0 / target_rate if target_rate else 0.0
+        self._last_target = None
 
     def get_available_ports(self):
         """
@@ -23,6 +142,8 @@ class SerialOutput:
         Returns:
             List of port names (e.g., ['COM3', 'COM4'])
         """
+        import serial.tools.list_ports
+
         ports = serial.tools.list_ports.comports()
         return [port.device for port in ports]
 
@@ -34,33 +155,309 @@ class SerialOutput:
             port: COM port name (e.g., 'COM3')
 
         Returns:
-            True if connected successfully, False otherwise
+            True if the port was opened, False otherwise
+
+        The port is opened here; the identify/baud handshake then runs in
+        the background (state "handshake") while write() holds the latest
+        frame, so nothing is lost while the board comes out of reset.
         """
+        import serial
+
         try:
-            if self.is_connected:
+            if self.link_state != "disconnected" and not self.mock_mode:
                 self.disconnect()
 
             self.port = port
-            self.serial_connection = serial.Serial(
+            connection = serial.Serial(
                 port=port,
                 baudrate=self.baudrate,
-                timeout=1.0
+                timeout=IDENTIFY_INTERVAL
             )
-            self.is_connected = True
-            print(f"Connected to {port}")
-            return True
-
         except serial.SerialException as e:
             print(f"Failed to connect to {port}: {e}")
             self.is_connected = False
             return False
 
+        self.mock_mode = False
+        self.is_connected = False
+        self._reconnect_stop = threading.Event()
+        self._set_state("handshake")
+        threading.Thread(target=self._connect_thread, args=(connection, self._reconnect_stop),
+                         daemon=True).start()
+        return True
+
+    def _connect_thread(self, connection, stop):
+        """Finish a connect() in the background"""
+        firmware = self._handshake(connection, stop)
+        self._set_firmware(firmware)
+        if self._commit_link(connection, stop):
+            sketch = f" ({firmware['sketch']} v{firmware['version']})" if firmware else ""
+            if self.timed_frames:
+                sketch += f", timed targets at {self.target_rate} Hz"
+            print(f"Connected to {self.port} at {connection.baudrate} baud{sketch}")
+        elif not stop.is_set():
+            print(f"Lost {self.port} during handshake")
+            self._start_reconnect()
+
+    def detect_device(self, candidates=None, timeout=3.0):
+        """
+        Probe candidate ports concurrently for platform firmware
+
+        Every port is probed on its own thread, so detection takes as long
+        as the slowest single probe. Opening a port resets most Arduinos,
+        so the timeout must cover the bootloader delay (~1.5-2 s).
+
+        Args:
+            candidates: Port names to probe (defaults to all available ports)
+            timeout: Seconds each probe waits for a signature
+
+        Returns:
+            DetectedDevice holding the still-open connection, or None
+        """
+        if candidates is None:
+            candidates = self.get_available_ports()
+        if self.is_connected and not self.mock_mode:
+            candidates = [port for port in candidates if port != self.port]
+        if not candidates:
+            return None
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        found = None
+        stop = threading.Event()  # Set once a match is found so other probes quit early
+        with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+            futures = [pool.submit(self._probe, port, timeout, stop) for port in candidates]
+            for future in as_completed(futures):
+                device = future.result()
+                if device is None:
+                    continue
+                if found is None:
+                    found = device
+                    stop.set()
+                else:
+                    device.connection.close()
+
+        if found is not None:
+            self._negotiate(found.connection, found.firmware)
+        return found
+
+    def _probe(self, port, timeout, stop):
+        """Open one port and wait for a firmware signature"""
+        import serial
+
+        deadline = time.monotonic() + timeout
+        try:
+            connection = serial.Serial(port=port, baudrate=self.baudrate, timeout=IDENTIFY_INTERVAL)
+        except (serial.SerialException, OSError):
+            return None
+
+        firmware = self._identify(connection, deadline, stop)
+        if firmware is not None:
+            return DetectedDevice(port, firmware, connection)
+        connection.close()
+        return None
+
+    def _identify(self, connection, deadline, stop):
+        """
+        Send identify requests until the firmware answers
+
+        Args:
+            connection: Open serial.Serial with a short read timeout
+            deadline: time.monotonic() value to give up at
+            stop: Event that aborts the wait
+
+        Returns:
+            Firmware dict from parse_identify(), or None
+        """
+        # Repeat the request - ones sent during the reset are lost
+        return self._await_reply(connection, IDENTIFY_REQUEST, parse_identify, deadline, stop, repeat=True)
+
+    def _await_reply(self, connection, request, parse, deadline, stop, repeat=False):
+        """
+        Send a request and wait for the first line parse() accepts
+
+        Returns:
+            The first non-None parse() result, or None on timeout/error
+        """
+        buffer = b""
+        next_request = 0.0
+        try:
+            while not stop.is_set() and time.monotonic() < deadline:
+                now = time.monotonic()
+                if now >= next_request:
+                    connection.write(request)
+                    next_request = now + IDENTIFY_INTERVAL if repeat else deadline
+                buffer += connection.read(connection.in_waiting or 1)
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    result = parse(line)
+                    if result is not None:
+                        return result
+        except OSError:
+            pass
+        return None
+
+    def _negotiate(self, connection, firmware):
+        """
+        Switch the link to the fastest baud rate both sides support
+
+        Args:
+            connection: Open connection at the base rate
+            firmware: Dict from parse_identify()
+        """
+        max_baud = min(firmware.get("max_baud") or 0, self.max_baudrate)
+        base = connection.baudrate
+        stop = threading.Event()
+        for baud in BAUD_RATES:
+            if baud > max_baud or baud <= base:
+                continue
+            ack = f"BAUD,{baud}".encode('ascii')
+            try:
+                connection.reset_input_buffer()
+                accepted = self._await_reply(connection, f"B{baud}\n".encode('ascii'),
+                                             lambda line: True if line.strip() == ack else None,
+                                             time.monotonic() + 0.5, stop)
+                if not accepted:
+                    continue
+                connection.baudrate = baud
+                # Confirm both sides hear each other at the new rate
+                if self._identify(connection, time.monotonic() + 0.5, stop) is not None:
+                    return
+                connection.baudrate = base
+                time.sleep(BAUD_REVERT_TIME)  # Let the firmware fall back too
+            except OSError:
+                return
+
+    def _handshake(self, connection, stop):
+        """
+        Wait for the firmware to come out of reset and negotiate the baud rate
+
+        Older sketches never answer, so for them this just waits out the
+        identify timeout and the link stays at the base rate.
+
+        Returns:
+            Firmware dict, or None if the sketch did not answer
+        """
+        firmware = self._identify(connection, time.monotonic() + self.identify_timeout, stop)
+        if firmware is not None and not stop.is_set():
+            self._negotiate(connection, firmware)
+        return firmware
+
+    def _commit_link(self, connection, stop):
+        """
+        Hand a ready connection to write() and resend the held frame
+
+        Returns:
+            True if the link is up, False if cancelled or the resend failed
+        """
+        with self._lock:
+            if stop.is_set():
+                connection.close()
+                return False
+            try:
+                if self._pending is not None:
+                    connection.write(self._pending)
+            except OSError:
+                connection.close()
+                return False
+            self._pending = None
+            self._last_target = None
+            self.serial_connection = connection
+            self.is_connected = True
+            self._update_budget(connection.baudrate)
+            # Flip the state last so write() cannot interleave with the resend
+            self._set_state("connected")
+
+        if self.metrics is not None:
+            self.metrics.reconnects += 1
+        return True
+
+    def _update_budget(self, baudrate):
+        """Recompute the send rate limit for a baud rate and the current frame size"""
+        self.link_baudrate = baudrate
+        self.max_send_rate = link_budget(baudrate, self.frame_size) * self.link_headroom
+        self._min_interval = 1.0 / self.max_send_rate
+        if self.metrics is not None:
+            self.metrics.baudrate = baudrate
+
+    def _set_firmware(self, firmware):
+        """
+        Record the firmware on a new link and pick the frame format
+
+        Args:
+            firmware: Dict from parse_identify(), or None for sketches that
+                      never answered
+        """
+        self.firmware = firmware
+        version = firmware["version"] if firmware else ""
+        self.timed_frames = bool(self.target_rate and version.isdigit()
+                                 and int(version) >= INTERPOLATION_PROTOCOL)
+
+    def adopt(self, device):
+        """
+        Take over the open connection of a detected device
+
+        Args:
+            device: DetectedDevice from detect_device()
+        """
+        if self.link_state != "disconnected" and not self.mock_mode:
+            self.disconnect()
+        self.mock_mode = False
+        self.port = device.port
+        self.serial_connection = device.connection
+        self.is_connected = True
+        self._set_firmware(device.firmware)
+        self._last_target = None
+        self._update_budget(device.connection.baudrate)
+        if self.metrics is not None:
+            self.metrics.reconnects += 1
+        firmware = device.firmware
+        timed = f", timed targets at {self.target_rate} Hz" if self.timed_frames else ""
+        print(f"Connected to {device.port} at {device.connection.baudrate} baud "
+              f"({firmware['sketch']} v{firmware['version']}{timed})")
+        self._set_state("connected")
+
+    def auto_connect(self, candidates=None, timeout=3.0):
+        """
+        Detect the platform firmware and connect to it
+
+        Returns:
+            True if a device was found and connected, False otherwise
+        """
+        device = self.detect_device(candidates, timeout)
+        if device is None:
+            print("No platform firmware found")
+            return False
+        self.adopt(device)
+        return True
+
+    def wait_connected(self, timeout=10.0):
+        """
+        Wait for a connect() to finish its background handshake
+
+        Args:
+            timeout: Seconds to allow for the board reset and handshake
+
+        Returns:
+            True if the link is up, False if the deadline passed first
+        """
+        deadline = time.monotonic() + timeout
+        while self.link_state != "connected" and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self.link_state == "connected":
+            return True
+        print(f"{self.port} did not finish its handshake within {timeout:g} s")
+        return False
+
     def disconnect(self):
-        """Disconnect from serial port"""
+        """Disconnect from serial port (also cancels a pending reconnect)"""
+        with self._lock:
+            self._reconnect_stop.set()
+        self._pending = None
         if self.serial_connection and self.is_connected:
             try:
-                # Send neutral position before disconnecting
-                self.send_command(0.0, 0.0)
+                # Send neutral position before disconnecting (never rate-limited)
+                self._last_write = 0.0
+                self.write(self.neutral_frame())
                 self.serial_connection.close()
                 print(f"Disconnected from {self.port}")
             except Exception as e:
@@ -68,6 +465,24 @@ class SerialOutput:
             finally:
                 self.is_connected = False
                 self.serial_connection = None
+        if self.link_state != "disconnected" and not self.mock_mode:
+            self._set_state("disconnected")
+
+    def neutral_frame(self):
+        """
+        Neutral frame in the format of the latest frame sent
+
+        Per-servo sketches ignore "<roll,pitch>" lines, so after servo frames
+        ({a1,...,an}, see kinematics.py) this is a frame with n zero angles -
+        even when the caller's own neutral frame fell to the rate clamp.
+
+        Returns:
+            Frame bytes
+        """
+        data = self._last_frame
+        if data is not None and data[:1] == b"{":
+            return encode_servo_frame([0.0] * (data.count(b",") + 1))
+        return encode_command(0.0, 0.0)
 
     def send_command(self, roll, pitch):
         """
@@ -80,40 +495,139 @@ class SerialOutput:
         Format: <roll,pitch>\n
         Example: <12.5,-8.3>\n
         """
+        return self.write(encode_command(roll, pitch))
+
+    def write(self, data):
+        """
+        Write an encoded command frame to the serial port
+
+        Args:
+            data: Frame bytes from output_sinks.encode_command()
+
+        Returns:
+            True if written (or printed in mock mode), False otherwise
+        """
+        self._last_frame = data
         if self.mock_mode:
             # Mock mode - just print instead of sending
-            print(f"[MOCK] <{roll:.1f},{pitch:.1f}>")
+            print(f"[MOCK] {data.decode('utf-8').rstrip()}")
             return True
 
+        if self.link_state == "reconnecting" or self.link_state == "handshake":
+            # Keep only the latest frame; the link thread resends it
+            self._pending = data
+            return False
+
         if not self.is_connected or not self.serial_connection:
             return False
 
+        start = time.perf_counter()
+        if start - self._last_write < self._min_interval:
+            return False  # Over the link budget - the next tick sends a newer frame
+        if self.timed_frames:
+            if start - self._last_write < self._target_interval:
+                return False  # The firmware is still gliding to the last target
+            if data == self._last_target:
+                return True  # Already there - nothing new to interpolate toward
+            self._last_target = data
+            data = add_arrival_time(data, self.arrival_ms)
+        if len(data) > self.frame_size:
+            self.frame_size = len(data)
+            self._update_budget(self.link_baudrate)
+
         try:
-            # Format command string
-            command = f"<{roll:.1f},{pitch:.1f}>\n"
+            self.serial_connection.write(data)
+            if self.metrics is not None:
+                self.metrics.record_write(len(data), time.perf_counter() - start)
+            self._last_write = start
 
-            # Send to serial port
-            self.serial_connection.write(command.encode('utf-8'))
+            self._window_bytes += len(data)
+            elapsed = start - self._window_start
+            if elapsed >= 1.0:
+                self.utilization = self._window_bytes * BITS_PER_BYTE / (self.link_baudrate * elapsed)
+                self._window_start = start
+                self._window_bytes = 0
+                if self.metrics is not None:
+                    self.metrics.utilization = self.utilization
             return True
 
-        except serial.SerialException as e:
+        except OSError as e:
             print(f"Serial communication error: {e}")
-            self.is_connected = False
+            if self.metrics is not None:
+                self.metrics.errors += 1
+            self._link_lost(data)
             return False
         except Exception as e:
             print(f"Error sending command: {e}")
             return False
 
+    def _set_state(self, state):
+        """Publish a link state change"""
+        self.link_state = state
+        self.state_version += 1
+
+    def _link_lost(self, data):
+        """Drop the dead connection and start reconnecting in the background"""
+        connection = self.serial_connection
+        self.is_connected = False
+        self.serial_connection = None
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+        if not self.auto_reconnect or not self.port:
+            self._set_state("disconnected")
+            return
+        self._pending = data
+        self._start_reconnect()
+
+    def _start_reconnect(self):
+        """Start the background reconnect thread"""
+        self.reconnect_attempts = 0
+        self._reconnect_stop = threading.Event()
+        self._set_state("reconnecting")
+        threading.Thread(target=self._reconnect_loop, args=(self._reconnect_stop,), daemon=True).start()
+
+    def _reconnect_loop(self, stop):
+        """Reopen the port with exponential backoff and jitter"""
+        import serial
+
+        delay = self.reconnect_delay
+        while not stop.wait(delay * random.uniform(0.5, 1.5)):
+            self.reconnect_attempts += 1
+            self.state_version += 1
+            delay = min(self.max_reconnect_delay, delay * 2)
+            try:
+                connection = serial.Serial(port=self.port, baudrate=self.baudrate, timeout=IDENTIFY_INTERVAL)
+            except (serial.SerialException, OSError):
+                continue
+
+            # Opening resets the board - wait for it and renegotiate the baud rate
+            self._set_firmware(self._handshake(connection, stop))
+            if self._commit_link(connection, stop):
+                print(f"Reconnected to {self.port} at {connection.baudrate} baud "
+                      f"after {self.reconnect_attempts} attempt(s)")
+                return
+            if stop.is_set():
+                return
+
+    def close(self):
+        """Close the port (OutputSink interface)"""
+        self.disconnect()
+
     def enable_mock_mode(self):
         """Enable mock mode for testing without hardware"""
         self.mock_mode = True
         self.is_connected = True  # Pretend we're connected
+        self._set_state("connected")
 
     def disable_mock_mode(self):
         """Disable mock mode"""
         self.mock_mode = False
         if self.is_connected and not self.serial_connection:
             self.is_connected = False
+            self._set_state("disconnected")
 
     def __del__(self):
         """Cleanup on deletion"""
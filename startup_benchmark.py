@@ -0,0 +1,106 @@
+"""
+Startup benchmark - time from launch to the first control tick
+
+Starts main.py repeatedly with --startup-exit (exit right after the first
+tick) and reports the wall time from process launch to the first tick,
+including interpreter startup, plus the app's own phase breakdown:
+
+    python startup_benchmark.py
+    python startup_benchmark.py --runs 10 -- --split-gui
+    python startup_benchmark.py --importtime    # slowest imports too
+
+Exits with status 1 if the median is over the target.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+
+DEFAULT_TARGET_MS = 150.0
+PHASE_LINE = re.compile(r"^\s+(.+?)\s+([\d.]+) ms")
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def run_once(app_args, importtime=False):
+    """
+    Launch main.py once
+
+    Returns:
+        Tuple of (wall ms to first tick or None, {phase: ms}, stderr text)
+    """
+    command = [sys.executable, "-u"]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += [os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py"), "--startup-exit"]
+    command += app_args
+
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    first_tick = None
+    phases = {}
+    for line in process.stdout:
+        match = PHASE_LINE.match(line)
+        if match:
+            phases[match.group(1)] = float(match.group(2))
+            if match.group(1) == "first tick" and first_tick is None:
+                first_tick = (time.perf_counter() - start) * 1000.0
+    stderr = process.stderr.read()
+    process.wait()
+    return first_tick, phases, stderr
+
+
+def slowest_imports(stderr, count=10):
+    """Top-level modules by cumulative import time from -X importtime output"""
+    totals = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) <= 1:  # Only modules imported directly by main or the app
+            totals.append((int(match.group(2)) / 1000.0, match.group(4)))
+    return sorted(totals, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure launch to first control tick")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", type=float, default=DEFAULT_TARGET_MS, help="Target in ms")
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest imports")
+    parser.add_argument("app_args", nargs="*", help="Extra main.py options (after --)")
+    args = parser.parse_args()
+
+    walls = []
+    phase_runs = []
+    stderr = ""
+    for _ in range(args.runs):
+        wall, phases, stderr = run_once(args.app_args, args.importtime)
+        if wall is None:
+            print("main.py exited before the first tick:")
+            print(stderr.strip())
+            return 2
+        walls.append(wall)
+        phase_runs.append(phases)
+
+    print(f"Launch to first tick over {args.runs} runs:")
+    print(f"  median {statistics.median(walls):7.1f} ms   min {min(walls):7.1f} ms   max {max(walls):7.1f} ms")
+    print("\nIn-process phases (median):")
+    for phase in phase_runs[0]:
+        values = [phases[phase] for phases in phase_runs if phase in phases]
+        print(f"  {phase:<14}{statistics.median(values):>7.1f} ms")
+
+    if args.importtime:
+        print("\nSlowest imports (last run, all processes, cumulative):")
+        for ms, module in slowest_imports(stderr):
+            print(f"  {module:<28}{ms:>7.1f} ms")
+
+    median = statistics.median(walls)
+    verdict = "OK" if median <= args.target else "OVER TARGET"
+    print(f"\nTarget {args.target:.0f} ms: {verdict}")
+    return 0 if median <= args.target else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Telemetry recorder - per-tick control data to fixed-record binary files
+
+The control loop packs one fixed-size record per tick into a
+preallocated ring buffer (no allocation, no I/O on the control path).
+A background thread drains the ring into rotating binary files, each a
+16-byte header followed by records, so they can be memory-mapped with
+NumPy for analysis:
+
+    from telemetry import open_telemetry
+    data = open_telemetry("telemetry/telemetry_20250101_120000_0001.tlm")
+    print(data["roll"].mean(), (data["serial_ok"] == 0).sum())
+
+When telemetry is off the GUI holds None and skips recording entirely.
+"""
+
+import glob
+import os
+import struct
+import threading
+import time
+
+
+MAGIC = b'PLTTLM01'
+HEADER = struct.Struct('<8sII')  # magic, record size, reserved
+
+# Record layout - keep RECORD and TELEMETRY_FIELDS in step
+RECORD = struct.Struct('<diifffffffB3x')
+TELEMETRY_FIELDS = [
+    ('timestamp', '<f8'),   # time.time() of the tick
+    ('raw_x', '<i4'),       # Raw stick value (-32768 to 32767)
+    ('raw_y', '<i4'),
+    ('norm_x', '<f4'),      # Normalized stick after deadzone
+    ('norm_y', '<f4'),
+    ('curve_x', '<f4'),     # Curve output (position mode) or deflection (velocity mode)
+    ('curve_y', '<f4'),
+    ('multiplier', '<f4'),  # Velocity-mode speed multiplier
+    ('roll', '<f4'),        # Commanded angles in degrees
+    ('pitch', '<f4'),
+    ('serial_ok', 'u1'),    # 1 if the frame was sent
+    ('_pad', 'V3'),
+]
+
+
+class TelemetryRecorder:
+    """Ring-buffered telemetry with a background file writer"""
+
+    def __init__(self, directory, capacity=4096, records_per_file=100000, max_files=20,
+                 flush_interval=0.5):
+        """
+        Initialize telemetry recorder
+
+        Args:
+            directory: Output directory (created if missing)
+            capacity: Ring buffer size in records
+            records_per_file: Records per file before rotating
+            max_files: Oldest files beyond this count are deleted (0 = keep all)
+            flush_interval: Seconds between background flushes
+        """
+        self.directory = directory
+        self.capacity = capacity
+        self.records_per_file = records_per_file
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+
+        self._buffer = bytearray(capacity * RECORD.size)
+        self._pack_into = RECORD.pack_into
+        self.written = 0  # Records recorded (only the control thread writes this)
+        self.flushed = 0  # Records drained (only the writer thread writes this)
+        self.dropped = 0  # Records overwritten before they could be drained
+
+        self._file = None
+        self._file_records = 0
+        self._file_index = 0
+        self._session = time.strftime("%Y%m%d_%H%M%S")
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Start the background writer thread"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def record(self, timestamp, raw_x, raw_y, norm_x, norm_y, curve_x, curve_y,
+               multiplier, roll, pitch, serial_ok):
+        """Record one control tick (control thread only)"""
+        written = self.written
+        self._pack_into(self._buffer, (written % self.capacity) * RECORD.size,
+                        timestamp, raw_x, raw_y, norm_x, norm_y, curve_x, curve_y,
+                        multiplier, roll, pitch, 1 if serial_ok else 0)
+        self.written = written + 1
+
+    def _writer_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+        self._close_file()
+
+    def flush(self):
+        """Drain recorded records to disk (writer thread, or after stop)"""
+        written = self.written
+        start = self.flushed
+        if written - start > self.capacity:
+            # The control thread lapped us - the oldest records are gone
+            self.dropped += written - start - self.capacity
+            start = written - self.capacity
+
+        while start < written:
+            if self._file is None or self._file_records >= self.records_per_file:
+                self._rotate()
+            slot = start % self.capacity
+            count = min(written - start, self.capacity - slot,
+                        self.records_per_file - self._file_records)
+            begin = slot * RECORD.size
+            self._file.write(self._buffer[begin:begin + count * RECORD.size])
+            self._file_records += count
+            start += count
+
+        if self._file is not None:
+            self._file.flush()
+        self.flushed = start
+
+    def _rotate(self):
+        """Start a new telemetry file and prune old ones"""
+        self._close_file()
+        self._file_index += 1
+        path = os.path.join(self.directory,
+                            f"telemetry_{self._session}_{self._file_index:04d}.tlm")
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, RECORD.size, 0))
+        self._file_records = 0
+
+        if self.max_files:
+            files = list_telemetry_files(self.directory)
+            for old in files[:-self.max_files]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stop(self):
+        """Stop the writer thread after a final flush"""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+
+def list_telemetry_files(directory):
+    """Return telemetry files in a directory, oldest first"""
+    return sorted(glob.glob(os.path.join(directory, "telemetry_*.tlm")))
+
+
+def telemetry_dtype():
+    """NumPy structured dtype matching RECORD"""
+    import numpy as np
+
+    return np.dtype(TELEMETRY_FIELDS)
+
+
+def open_telemetry(path):
+    """
+    Memory-map a telemetry file as a NumPy structured array
+
+    Args:
+        path: Path to a .tlm file
+
+    Returns:
+        Read-only numpy.memmap with one element per record (fields as in
+        TELEMETRY_FIELDS)
+
+    Raises:
+        ValueError: If the file is not a telemetry file
+    """
+    import numpy as np
+
+    dtype = telemetry_dtype()
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: truncated telemetry header")
+    magic, record_size, _ = HEADER.unpack(header)
+    if magic != MAGIC or record_size != dtype.itemsize:
+        raise ValueError(f"{path}: not a telemetry file (or incompatible version)")
+
+    count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(count,))